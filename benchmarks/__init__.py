@@ -0,0 +1 @@
+"""Transfer performance benchmarks"""
@@ -0,0 +1,473 @@
+"""
+Local stand-ins for S3 and the Flow360 web API used by the transfer benchmarks.
+
+FakeS3 is an S3-compatible endpoint storing objects in a local folder. It implements the
+requests made by s3_utils: put/head/get object (ranges, If-Match, CRC32 checksums) and
+multipart uploads with per-part and full object checksums, which it verifies like S3.
+
+FakeWebApi answers the web API calls of a volume mesh upload: mesh creation, file grants
+pointing into the FakeS3 bucket, completeUpload and mesh info.
+
+Both servers run on threads of the calling process, listening on 127.0.0.1.
+"""
+
+import base64
+import email.utils
+import hashlib
+import json
+import os
+import shutil
+import struct
+import threading
+import urllib.parse
+import uuid
+import zlib
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from xml.etree import ElementTree
+
+BUCKET = "flow360-benchmark"
+_READ_SIZE = 1024 * 1024
+_S3_NAMESPACE = "http://s3.amazonaws.com/doc/2006-03-01/"
+
+
+def _encode_crc32(crc: int) -> str:
+    return base64.b64encode(struct.pack(">I", crc)).decode()
+
+
+def _decode_aws_chunked(data: bytes) -> bytes:
+    """payload of an aws-chunked body, trailing checksums are ignored"""
+    payload = bytearray()
+    position = 0
+    while True:
+        end = data.index(b"\r\n", position)
+        size = int(data[position:end].split(b";")[0], 16)
+        position = end + 2
+        if size == 0:
+            return bytes(payload)
+        payload += data[position : position + size]
+        position += size + 2
+
+
+class _ObjectStore:
+    """objects and multipart uploads kept in a folder, metadata in json files next to them"""
+
+    def __init__(self, folder: str):
+        self.folder = folder
+        self.uploads = {}
+        self.lock = threading.Lock()
+
+    def object_path(self, bucket: str, key: str) -> str:
+        """path of the content of an object"""
+        return os.path.join(self.folder, "objects", bucket, key)
+
+    def _meta_path(self, bucket: str, key: str) -> str:
+        return os.path.join(self.folder, "meta", bucket, key + ".json")
+
+    def load_meta(self, bucket: str, key: str):
+        """metadata of an object, None when it does not exist"""
+        try:
+            with open(self._meta_path(bucket, key), encoding="utf-8") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+
+    # pylint: disable=too-many-arguments
+    def save(self, bucket: str, key: str, source: str, e_tag: str, checksum, checksum_type):
+        """move the file source into the store as the content of an object"""
+        path = self.object_path(bucket, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(source, path)
+        meta_path = self._meta_path(bucket, key)
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+        meta = {
+            "ETag": e_tag,
+            "LastModified": email.utils.formatdate(usegmt=True),
+            "ChecksumCRC32": checksum,
+            "ChecksumType": checksum_type,
+        }
+        with open(meta_path, "w", encoding="utf-8") as file:
+            json.dump(meta, file)
+
+    def temporary_path(self) -> str:
+        """a new path for data being received"""
+        os.makedirs(os.path.join(self.folder, "tmp"), exist_ok=True)
+        return os.path.join(self.folder, "tmp", uuid.uuid4().hex)
+
+
+def store_object(folder: str, bucket: str, key: str, file_name: str):
+    """
+    Place a copy of a local file in the store of a FakeS3 serving folder, as if uploaded in
+    a single request with a CRC32 checksum.
+    """
+    store = _ObjectStore(folder)
+    path = store.temporary_path()
+    md5 = hashlib.md5()
+    crc = 0
+    with open(file_name, "rb") as source, open(path, "wb") as target:
+        while True:
+            data = source.read(_READ_SIZE)
+            if not data:
+                break
+            md5.update(data)
+            crc = zlib.crc32(data, crc)
+            target.write(data)
+    store.save(bucket, key, path, f'"{md5.hexdigest()}"', _encode_crc32(crc), "FULL_OBJECT")
+
+
+def _xml(root: str, **fields) -> bytes:
+    body = "".join(f"<{name}>{value}</{name}>" for name, value in fields.items() if value)
+    return (
+        f'<?xml version="1.0" encoding="UTF-8"?>' f'<{root} xmlns="{_S3_NAMESPACE}">{body}</{root}>'
+    ).encode()
+
+
+class _S3Handler(BaseHTTPRequestHandler):
+    """path-style S3 requests, /bucket/key?query"""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "FakeS3"
+
+    @property
+    def store(self) -> _ObjectStore:
+        """store of the server"""
+        return self.server.store
+
+    # pylint: disable=redefined-builtin
+    def log_message(self, format, *args):
+        pass
+
+    def _parse(self):
+        url = urllib.parse.urlsplit(self.path)
+        bucket, _, key = urllib.parse.unquote(url.path).lstrip("/").partition("/")
+        query = urllib.parse.parse_qs(url.query, keep_blank_values=True)
+        return bucket, key, {name: values[0] for name, values in query.items()}
+
+    def _body(self) -> bytes:
+        data = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if "aws-chunked" in self.headers.get("Content-Encoding", ""):
+            data = _decode_aws_chunked(data)
+        return data
+
+    def _respond(self, status: int, body: bytes = b"", headers: dict = None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            if value is not None:
+                self.send_header(name, value)
+        if "Content-Length" not in (headers or {}):
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body and self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _error(self, status: int, code: str, message: str):
+        self._respond(
+            status,
+            _xml("Error", Code=code, Message=message),
+            {"Content-Type": "application/xml"},
+        )
+
+    def _check_checksum(self, data: bytes):
+        """CRC32 of data, None when it does not match the checksum header of the request"""
+        checksum = _encode_crc32(zlib.crc32(data))
+        expected = self.headers.get("x-amz-checksum-crc32")
+        if expected is not None and expected != checksum:
+            self._error(400, "BadDigest", "The CRC32 you specified did not match the calculated")
+            return None
+        return checksum
+
+    def do_PUT(self):  # pylint: disable=invalid-name
+        """put object and upload part"""
+        bucket, key, query = self._parse()
+        data = self._body()
+        checksum = self._check_checksum(data)
+        if checksum is None:
+            return
+        e_tag = f'"{hashlib.md5(data).hexdigest()}"'
+        path = self.store.temporary_path()
+        with open(path, "wb") as file:
+            file.write(data)
+
+        if "uploadId" in query:
+            with self.store.lock:
+                upload = self.store.uploads.get(query["uploadId"])
+                if upload is None:
+                    os.remove(path)
+                    self._error(404, "NoSuchUpload", "The upload does not exist")
+                    return
+                upload["parts"][int(query["partNumber"])] = (path, e_tag, checksum, len(data))
+        else:
+            checksum_type = "FULL_OBJECT" if "x-amz-checksum-crc32" in self.headers else None
+            self.store.save(
+                bucket, key, path, e_tag, checksum if checksum_type else None, checksum_type
+            )
+        self._respond(200, headers={"ETag": e_tag, "x-amz-checksum-crc32": checksum})
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """create and complete multipart uploads"""
+        bucket, key, query = self._parse()
+        data = self._body()
+        if "uploads" in query:
+            upload_id = uuid.uuid4().hex
+            with self.store.lock:
+                self.store.uploads[upload_id] = {
+                    "parts": {},
+                    "checksum_type": (
+                        self.headers.get("x-amz-checksum-type", "COMPOSITE")
+                        if "x-amz-checksum-algorithm" in self.headers
+                        else None
+                    ),
+                }
+            self._respond(
+                200,
+                _xml("InitiateMultipartUploadResult", Bucket=bucket, Key=key, UploadId=upload_id),
+                {"Content-Type": "application/xml"},
+            )
+        elif "uploadId" in query:
+            self._complete(bucket, key, query["uploadId"], data)
+        else:
+            self._error(400, "InvalidRequest", "Unsupported request")
+
+    # pylint: disable=too-many-locals
+    def _complete(self, bucket: str, key: str, upload_id: str, data: bytes):
+        with self.store.lock:
+            upload = self.store.uploads.pop(upload_id, None)
+        if upload is None:
+            self._error(404, "NoSuchUpload", "The upload does not exist")
+            return
+        numbers = [
+            int(element.text)
+            for element in ElementTree.fromstring(data).iter()
+            if element.tag.endswith("PartNumber")
+        ]
+        path = self.store.temporary_path()
+        md5 = hashlib.md5()
+        crc = 0
+        part_crcs = b""
+        with open(path, "wb") as target:
+            for number in numbers:
+                part_path, e_tag, part_checksum, _ = upload["parts"][number]
+                md5.update(bytes.fromhex(e_tag.strip('"')))
+                part_crcs += base64.b64decode(part_checksum)
+                with open(part_path, "rb") as source:
+                    while True:
+                        chunk = source.read(_READ_SIZE)
+                        if not chunk:
+                            break
+                        crc = zlib.crc32(chunk, crc)
+                        target.write(chunk)
+        for part_path, _, _, _ in upload["parts"].values():
+            os.remove(part_path)
+
+        checksum_type = upload["checksum_type"]
+        checksum = None
+        if checksum_type == "FULL_OBJECT":
+            checksum = _encode_crc32(crc)
+            expected = self.headers.get("x-amz-checksum-crc32")
+            if expected is not None and expected != checksum:
+                os.remove(path)
+                self._error(400, "BadDigest", "The full object checksum does not match")
+                return
+        elif checksum_type is not None:
+            checksum = f"{_encode_crc32(zlib.crc32(part_crcs))}-{len(numbers)}"
+        e_tag = f'"{md5.hexdigest()}-{len(numbers)}"'
+        self.store.save(bucket, key, path, e_tag, checksum, checksum_type)
+        self._respond(
+            200,
+            _xml(
+                "CompleteMultipartUploadResult",
+                Bucket=bucket,
+                Key=key,
+                ETag=e_tag.replace('"', "&quot;"),
+                ChecksumCRC32=checksum,
+                ChecksumType=checksum_type,
+            ),
+            {"Content-Type": "application/xml"},
+        )
+
+    def do_DELETE(self):  # pylint: disable=invalid-name
+        """abort multipart upload"""
+        _, _, query = self._parse()
+        with self.store.lock:
+            upload = self.store.uploads.pop(query.get("uploadId"), None)
+        if upload is not None:
+            for part_path, _, _, _ in upload["parts"].values():
+                os.remove(part_path)
+        self._respond(204)
+
+    def do_HEAD(self):  # pylint: disable=invalid-name
+        """head object"""
+        self._get_object(send_body=False)
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """get object, whole or a byte range"""
+        self._get_object(send_body=True)
+
+    # pylint: disable=too-many-locals
+    def _get_object(self, send_body: bool):
+        bucket, key, _ = self._parse()
+        meta = self.store.load_meta(bucket, key)
+        if meta is None:
+            self._error(404, "NoSuchKey", "The specified key does not exist.")
+            return
+        if self.headers.get("If-Match", meta["ETag"]) != meta["ETag"]:
+            self._error(412, "PreconditionFailed", "At least one of the preconditions failed")
+            return
+        path = self.store.object_path(bucket, key)
+        size = os.path.getsize(path)
+        start, end = 0, size - 1
+        status = 200
+        headers = {
+            "ETag": meta["ETag"],
+            "Last-Modified": meta["LastModified"],
+            "Accept-Ranges": "bytes",
+            "Content-Type": "binary/octet-stream",
+        }
+        byte_range = self.headers.get("Range")
+        if byte_range is not None:
+            first, _, last = byte_range.split("=", 1)[1].partition("-")
+            start, end = int(first), min(int(last) if last else size - 1, size - 1)
+            status = 206
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        elif self.headers.get("x-amz-checksum-mode") == "ENABLED" and meta["ChecksumCRC32"]:
+            headers["x-amz-checksum-crc32"] = meta["ChecksumCRC32"]
+            headers["x-amz-checksum-type"] = meta["ChecksumType"]
+        headers["Content-Length"] = str(end - start + 1)
+        self._respond(status, headers=headers)
+        if not send_body:
+            return
+        with open(path, "rb") as file:
+            file.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                data = file.read(min(remaining, _READ_SIZE))
+                self.wfile.write(data)
+                remaining -= len(data)
+
+
+class _WebApiHandler(BaseHTTPRequestHandler):
+    """volume mesh endpoints of the web API"""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "FakeWebApi"
+
+    # pylint: disable=redefined-builtin
+    def log_message(self, format, *args):
+        pass
+
+    def _respond(self, status: int, data):
+        key = "data" if status == 200 else "error"
+        body = json.dumps({key: data}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _parse(self):
+        url = urllib.parse.urlsplit(self.path)
+        query = urllib.parse.parse_qs(url.query, keep_blank_values=True)
+        return url.path.strip("/").split("/"), {name: values[0] for name, values in query.items()}
+
+    def _body(self):
+        data = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        return json.loads(data) if data else {}
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """mesh info and file grants"""
+        path, query = self._parse()
+        if len(path) == 3 and path[0] == "volumemeshes" and path[2] == "file":
+            expiration = datetime.now(timezone.utc) + timedelta(hours=1)
+            self._respond(
+                200,
+                {
+                    "cloudpath": f"s3://{BUCKET}/users/benchmark/{path[1]}/{query['filename']}",
+                    "userCredentials": {
+                        "accessKeyId": "benchmark",
+                        "secretAccessKey": "benchmark",
+                        "sessionToken": "benchmark",
+                        "expiration": expiration.isoformat(),
+                    },
+                },
+            )
+        elif len(path) == 2 and path[0] == "volumemeshes" and path[1] in self.server.meshes:
+            self._respond(200, self.server.meshes[path[1]])
+        else:
+            self._respond(404, f"{self.path} not found")
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """mesh creation and completeUpload"""
+        path, _ = self._parse()
+        request = self._body()
+        if path == ["volumemeshes"]:
+            mesh_id = str(uuid.uuid4())
+            self.server.meshes[mesh_id] = {
+                "meshId": mesh_id,
+                "meshName": request.get("meshName", "mesh"),
+                "meshAddTime": datetime.now(timezone.utc).isoformat(),
+                "meshFormat": request.get("meshFormat"),
+                "meshEndianness": request.get("meshEndianness"),
+                "meshCompression": request.get("meshCompression"),
+                "fileName": request.get("fileName"),
+                "solverVersion": request.get("solverVersion"),
+                "userId": "benchmark",
+                "status": "uploading",
+                "deleted": False,
+                "boundaries": None,
+            }
+            self._respond(200, self.server.meshes[mesh_id])
+        elif len(path) == 3 and path[0] == "volumemeshes" and path[2] == "completeUpload":
+            mesh = self.server.meshes.get(path[1])
+            if mesh is None:
+                self._respond(404, f"{path[1]} not found")
+                return
+            mesh["status"] = "uploaded"
+            self._respond(200, mesh)
+        else:
+            self._respond(404, f"{self.path} not found")
+
+
+class _Server:
+    """HTTP server on 127.0.0.1 serving requests on a daemon thread"""
+
+    def __init__(self, handler):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        """base url of the server"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+
+class FakeS3(_Server):
+    """S3-compatible endpoint keeping its objects in folder"""
+
+    def __init__(self, folder: str):
+        super().__init__(_S3Handler)
+        self._server.store = _ObjectStore(folder)
+        self.folder = folder
+
+    def __exit__(self, *args):
+        super().__exit__(*args)
+        shutil.rmtree(os.path.join(self.folder, "tmp"), ignore_errors=True)
+
+
+# pylint: disable=too-few-public-methods
+class FakeWebApi(_Server):
+    """Flow360 web API serving volume mesh uploads into the FakeS3 bucket"""
+
+    def __init__(self):
+        super().__init__(_WebApiHandler)
+        self._server.meshes = {}
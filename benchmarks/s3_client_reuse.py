@@ -0,0 +1,84 @@
+"""
+Per-part overhead of obtaining an S3 client.
+
+Compares creating a new boto3 client for every uploaded part (previous behaviour of
+_S3STSToken.get_client) with the cached client. upload_part calls are answered by a
+botocore Stubber, so no network access or credentials are needed.
+
+Usage:
+    python -m benchmarks.s3_client_reuse --parts 500
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+import boto3
+from botocore.stub import Stubber
+
+from flow360.cloud.s3_utils import _S3STSToken
+from flow360.environment import Env
+
+BODY = b"x" * 1024
+
+
+def _token():
+    return _S3STSToken.parse_obj(
+        {
+            "cloudpath": "s3://flow360-bucket/users/user-id/mesh-id/mesh.lb8.ugrid.zst",
+            "userCredentials": {
+                "accessKeyId": "benchmark-key",
+                "expiration": datetime.now(tz=timezone.utc) + timedelta(hours=1),
+                "secretAccessKey": "secret",
+                "sessionToken": "token",
+            },
+        }
+    )
+
+
+def _new_client(token):
+    return boto3.client(
+        "s3",
+        region_name=Env.current.aws_region,
+        aws_access_key_id=token.user_credential.access_key_id,
+        aws_secret_access_key=token.user_credential.secret_access_key,
+        aws_session_token=token.user_credential.session_token,
+    )
+
+
+def _upload_part(client, token, part_number):
+    with Stubber(client) as stubber:
+        stubber.add_response("upload_part", {"ETag": '"etag"'})
+        client.upload_part(
+            Bucket=token.get_bucket(),
+            Key=token.get_s3_key(),
+            PartNumber=part_number,
+            UploadId="upload-id",
+            Body=BODY,
+        )
+
+
+def run(parts: int):
+    """time `parts` stubbed upload_part calls with and without client reuse"""
+    token = _token()
+
+    start = time.perf_counter()
+    for part_number in range(1, parts + 1):
+        _upload_part(_new_client(token), token, part_number)
+    per_part_before = (time.perf_counter() - start) / parts
+
+    start = time.perf_counter()
+    for part_number in range(1, parts + 1):
+        _upload_part(token.get_client(), token, part_number)
+    per_part_after = (time.perf_counter() - start) / parts
+
+    print(f"parts:                       {parts}")
+    print(f"new client per part:         {per_part_before * 1e3:8.3f} ms/part")
+    print(f"cached client:               {per_part_after * 1e3:8.3f} ms/part")
+    print(f"speed-up:                    {per_part_before / per_part_after:8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--parts", type=int, default=500)
+    run(parser.parse_args().parts)
@@ -0,0 +1,191 @@
+"""
+Upload and download throughput against a local S3 endpoint and web API.
+
+Starts FakeS3 and FakeWebApi (see benchmarks.fake_cloud) and runs, for every synthetic
+mesh size:
+    submit                      VolumeMeshDraft.submit in every compression mode, zst
+                                compresses with a zstd thread per core and zst-st on
+                                the calling thread
+    compress_and_upload_chunks  bz2 multipart upload to an existing mesh
+    download_file               download of an uncompressed mesh
+Every run happens in a fresh process, which reports the throughput of the uncompressed
+data (MB/s), its peak resident memory and its CPU utilisation (CPU time of all its
+threads over wall time, 100 % is one fully used core). The servers run in the parent
+process and compete for CPU on small machines. Requests go over plain http, so botocore
+signs upload payloads with SHA256, which production uploads over https do not do.
+
+Usage:
+    python -m benchmarks.transfers --sizes-mb 64 256 --modes none bz2 zst zst-st zst-seekable
+"""
+
+import argparse
+import contextlib
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+from flow360.cloud import upload_journal
+from flow360.cloud.s3_utils import S3TransferType
+from flow360.component.compress_upload import compress_and_upload_chunks
+from flow360.component.volume_mesh import (
+    CompressionFormat,
+    UGRIDEndianness,
+    VolumeMeshDraft,
+    VolumeMeshFileFormat,
+)
+from flow360.environment import Env, EnvironmentConfig
+
+from .fake_cloud import BUCKET, FakeS3, FakeWebApi, store_object
+from .zstd_compress import _write_mesh_like_file
+
+# compression method, seekable zstd and number of zstd worker threads of every mode
+MODES = {
+    "none": (CompressionFormat.NONE, False, -1),
+    "bz2": (CompressionFormat.BZ2, False, -1),
+    "zst": (CompressionFormat.ZST, False, -1),
+    "zst-st": (CompressionFormat.ZST, False, 0),
+    "zst-seekable": (CompressionFormat.ZST, True, -1),
+}
+OPERATIONS = ["submit", "compress_and_upload_chunks", "download_file"]
+_MESH_FILE = "mesh.lb8.ugrid"
+# mesh of the download runs, its object is placed in the store before the runs
+_DOWNLOAD_MESH_ID = "00000000-0000-4000-8000-000000000000"
+
+
+def _submit(file_name: str, mode: str, _):
+    compress_method, seekable, threads = MODES[mode]
+    draft = VolumeMeshDraft(file_name=file_name)
+    draft.compress_method = compress_method
+    draft.seekable_zstd = seekable
+    draft.zstd_threads = threads
+    draft.submit()
+
+
+def _compress_and_upload_chunks(file_name: str, *_):
+    draft = VolumeMeshDraft(file_name=file_name)
+    # pylint: disable=protected-access
+    mesh = draft._create_for_upload(
+        _MESH_FILE + ".bz2",
+        VolumeMeshFileFormat.UGRID,
+        UGRIDEndianness.LITTLE,
+        CompressionFormat.BZ2,
+    )
+    upload_id = mesh.create_multipart_upload(_MESH_FILE + ".bz2")
+    compress_and_upload_chunks(file_name, upload_id, mesh, _MESH_FILE + ".bz2")
+
+
+def _download_file(_, __, tmp_dir: str):
+    S3TransferType.VOLUME_MESH.download_file(
+        _DOWNLOAD_MESH_ID,
+        _MESH_FILE,
+        to_file=os.path.join(tmp_dir, "downloaded.ugrid"),
+        use_cache=False,
+    )
+
+
+_RUNS = {
+    "submit": _submit,
+    "compress_and_upload_chunks": _compress_and_upload_chunks,
+    "download_file": _download_file,
+}
+
+
+# pylint: disable=too-many-arguments, too-many-locals
+def _measure(operation, mode, file_name, tmp_dir, urls, verbose, results):
+    """run one operation in this process and put its measurements in results"""
+    web_api_url, s3_url = urls
+    os.environ["FLOW360_APIKEY"] = "benchmark"
+    Env.set_current(
+        EnvironmentConfig(
+            name="benchmark",
+            web_api_endpoint=web_api_url,
+            web_url=web_api_url,
+            portal_web_api_endpoint=web_api_url,
+            aws_region="us-east-1",
+            apikey_profile="default",
+            s3_endpoint_url=s3_url,
+        )
+    )
+    upload_journal.journal_dir = os.path.join(tmp_dir, "uploads")
+
+    with contextlib.ExitStack() as stack:
+        if not verbose:
+            devnull = stack.enter_context(open(os.devnull, "w", encoding="utf-8"))
+            stack.enter_context(contextlib.redirect_stdout(devnull))
+            stack.enter_context(contextlib.redirect_stderr(devnull))
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        start = time.perf_counter()
+        _RUNS[operation](file_name, mode, tmp_dir)
+        wall = time.perf_counter() - start
+        end_usage = resource.getrusage(resource.RUSAGE_SELF)
+
+    cpu = (end_usage.ru_utime - usage.ru_utime) + (end_usage.ru_stime - usage.ru_stime)
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak_rss = end_usage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+    results.put((wall, cpu, peak_rss))
+
+
+def _run_in_process(context, *args):
+    results = context.Queue()
+    process = context.Process(target=_measure, args=(*args, results))
+    process.start()
+    try:
+        measurement = results.get()
+    finally:
+        process.join()
+    if process.exitcode != 0:
+        raise RuntimeError(f"benchmark process failed with exit code {process.exitcode}")
+    return measurement
+
+
+# pylint: disable=too-many-locals
+def run(sizes_mb, modes, operations, verbose: bool = False):
+    """run the operations for every size and print one line per run"""
+    context = multiprocessing.get_context("spawn")
+    print(
+        f"{'operation':28} {'mode':13} {'size MB':>8} {'time s':>8} {'MB/s':>8} "
+        f"{'CPU %':>7} {'peak RSS MB':>12}"
+    )
+    with tempfile.TemporaryDirectory() as tmp_dir, FakeS3(
+        os.path.join(tmp_dir, "s3")
+    ) as fake_s3, FakeWebApi() as fake_web_api:
+        urls = (fake_web_api.url, fake_s3.url)
+        for size_mb in sizes_mb:
+            file_name = os.path.join(tmp_dir, str(size_mb), _MESH_FILE)
+            os.makedirs(os.path.dirname(file_name))
+            _write_mesh_like_file(file_name, size_mb * 1024 * 1024)
+            if "download_file" in operations:
+                store_object(
+                    fake_s3.folder,
+                    BUCKET,
+                    f"users/benchmark/{_DOWNLOAD_MESH_ID}/{_MESH_FILE}",
+                    file_name,
+                )
+            for operation in operations:
+                run_modes = {"submit": modes, "compress_and_upload_chunks": ["bz2"]}.get(
+                    operation, ["none"]
+                )
+                for mode in run_modes:
+                    wall, cpu, peak_rss = _run_in_process(
+                        context, operation, mode, file_name, tmp_dir, urls, verbose
+                    )
+                    print(
+                        f"{operation:28} {mode:13} {size_mb:8} {wall:8.2f} "
+                        f"{size_mb / wall:8.1f} {100 * cpu / wall:7.0f} "
+                        f"{peak_rss / 1024 / 1024:12.0f}"
+                    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--sizes-mb", type=int, nargs="+", default=[64, 256])
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument("--operations", nargs="+", choices=OPERATIONS, default=OPERATIONS)
+    parser.add_argument(
+        "--verbose", action="store_true", help="show the progress bars and logs of the runs"
+    )
+    arguments = parser.parse_args()
+    run(arguments.sizes_mb, arguments.modes, arguments.operations, arguments.verbose)
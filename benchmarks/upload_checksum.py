@@ -0,0 +1,133 @@
+"""
+Overhead of the CRC32 checksums sent with multipart uploads.
+
+Compresses and uploads a synthetic mesh-like file in the seekable zstd format to an
+in-memory resource, once with per-part and whole-object checksums and once without
+(as an upload resumed from a journal started without checksums), and prints the
+difference. A network round trip is simulated for every part.
+
+Also times the two steps outside the upload pipeline: combining the checksums of the
+parts of a large upload into the object checksum when the upload completes, and
+verify_download, which reads a downloaded file a second time to compute its checksum.
+The file was just written, so verify_download reads it from the page cache, as it
+usually does right after a download; its time is compared to the time of the download at
+--download-mbps.
+
+Usage:
+    python -m benchmarks.upload_checksum --size-mb 256 --part-latency 0.05
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from flow360.cloud import upload_journal
+from flow360.cloud.checksum import (
+    combine_checksums,
+    encode_crc32,
+    fileobj_crc32,
+    verify_download,
+)
+from flow360.cloud.upload_journal import UploadJournal
+from flow360.component.compress_upload import seekable_zstd_compress_and_upload_chunks
+
+from .zstd_compress import _write_mesh_like_file
+
+
+class _NullResource:
+    """multipart upload target discarding the data after a fixed delay per part"""
+
+    def __init__(self, part_latency: float):
+        self.part_latency = part_latency
+
+    # pylint: disable=too-many-arguments, unused-argument
+    def upload_part(
+        self, remote_file_name, upload_id, part_number, compressed_chunk, checksum=None
+    ):
+        """simulate the upload of one part"""
+        time.sleep(self.part_latency)
+        result = {"ETag": f"etag-{part_number}", "PartNumber": part_number}
+        if checksum is not None:
+            result["ChecksumCRC32"] = checksum
+        return result
+
+    def complete_multipart_upload(self, remote_file_name, upload_id, uploaded_parts, checksum=None):
+        """nothing to complete"""
+
+
+def _upload(file_name: str, checksums: bool, part_latency: float) -> float:
+    journal = UploadJournal.create("id", "mesh.zst", "upload-id", file_name, 8 * 1024 * 1024)
+    journal.checksums = checksums
+    start = time.perf_counter()
+    seekable_zstd_compress_and_upload_chunks(
+        file_name,
+        "upload-id",
+        _NullResource(part_latency),
+        "mesh.zst",
+        chunk_length=8 * 1024 * 1024,
+        journal=journal,
+    )
+    return time.perf_counter() - start
+
+
+def _combine(parts: int, part_size: int) -> float:
+    checksums = [(encode_crc32(part), part_size) for part in range(parts - 1)]
+    checksums.append((encode_crc32(parts), part_size // 3))
+    start = time.perf_counter()
+    combine_checksums(checksums)
+    return time.perf_counter() - start
+
+
+def _verify(file_name: str) -> float:
+    with open(file_name, "rb") as file:
+        meta_data = {"ChecksumCRC32": fileobj_crc32(file), "ChecksumType": "FULL_OBJECT"}
+    start = time.perf_counter()
+    verify_download(meta_data, file_name, "mesh.lb8.ugrid")
+    return time.perf_counter() - start
+
+
+# pylint: disable=too-many-locals, too-many-arguments
+def run(size_mb: int, part_latency: float, repeat: int, combine_parts: int, download_mbps: float):
+    """upload a size_mb file with and without checksums and print the timings"""
+    size = size_mb * 1024 * 1024
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        upload_journal.journal_dir = os.path.join(tmp_dir, "uploads")
+        file_name = os.path.join(tmp_dir, "mesh.lb8.ugrid")
+        _write_mesh_like_file(file_name, size)
+
+        # alternate the runs so drift in machine load affects both alike
+        timings = {False: [], True: []}
+        for _ in range(repeat):
+            for checksums in (False, True):
+                timings[checksums].append(_upload(file_name, checksums, part_latency))
+        without, with_checksums = min(timings[False]), min(timings[True])
+        verify = min(_verify(file_name) for _ in range(repeat))
+    combine = min(_combine(combine_parts, 25 * 1024 * 1024) for _ in range(repeat))
+
+    print(f"input size:          {size_mb} MB, {part_latency * 1000:.0f} ms per part")
+    print(f"without checksums:   {without:8.2f} s")
+    print(f"with checksums:      {with_checksums:8.2f} s")
+    print(f"overhead:            {100 * (with_checksums - without) / without:8.1f} %")
+    print(f"combine {combine_parts} parts:  {combine:8.3f} s (25 MB parts)")
+    print(
+        f"verify_download:     {verify:8.2f} s, {size_mb / verify:.0f} MB/s, "
+        f"{100 * verify * download_mbps / size_mb:.1f} % of a download at {download_mbps:.0f} MB/s"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--size-mb", type=int, default=256)
+    parser.add_argument("--part-latency", type=float, default=0.05)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--combine-parts", type=int, default=2000)
+    parser.add_argument("--download-mbps", type=float, default=100)
+    arguments = parser.parse_args()
+    run(
+        arguments.size_mb,
+        arguments.part_latency,
+        arguments.repeat,
+        arguments.combine_parts,
+        arguments.download_mbps,
+    )
@@ -0,0 +1,88 @@
+"""
+Throughput of zstd_compress.
+
+Compares the previous implementation (1 KiB reads, single-threaded compressor, one
+progress bar update per read) with the current one (large reads into a reused buffer,
+multi-threaded compressor, throttled progress) on a synthetic mesh-like file.
+
+Usage:
+    python -m benchmarks.zstd_compress --size-mb 512 --level 3
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import zstandard as zstd
+
+from flow360.cloud.utils import _get_progress, _S3Action
+from flow360.component.utils import zstd_compress
+
+
+def _legacy_zstd_compress(file_path, output_file_path, compression_level=3):
+    cctx = zstd.ZstdCompressor(level=compression_level)
+    with open(file_path, "rb") as f_in, open(output_file_path, "wb") as f_out:
+        with cctx.stream_writer(f_out) as compressor, _get_progress(
+            _S3Action.COMPRESSING
+        ) as progress:
+            task_id = progress.add_task(
+                "Compressing file",
+                filename=os.path.basename(file_path),
+                total=os.path.getsize(file_path),
+            )
+            while True:
+                chunk = f_in.read(1024)
+                if not chunk:
+                    break
+                compressor.write(chunk)
+                progress.update(task_id, advance=len(chunk))
+    return output_file_path
+
+
+def _write_mesh_like_file(file_name: str, size: int):
+    """random coordinates interleaved with increasing connectivity indices"""
+    with open(file_name, "wb") as file:
+        written = 0
+        index = 0
+        while written < size:
+            block = os.urandom(256 * 1024) + b"".join(
+                f"{i} {i + 1} {i + 2} {i + 3}\n".encode() for i in range(index, index + 20000)
+            )
+            index += 20000
+            written += file.write(block[: size - written])
+
+
+def _time(function, *args, **kwargs):
+    start = time.perf_counter()
+    function(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def run(size_mb: int, level: int):
+    """compress a size_mb file with both implementations and print the throughput"""
+    size = size_mb * 1024 * 1024
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_name = os.path.join(tmp_dir, "mesh.lb8.ugrid")
+        output = os.path.join(tmp_dir, "mesh.lb8.ugrid.zst")
+        _write_mesh_like_file(file_name, size)
+
+        legacy = _time(_legacy_zstd_compress, file_name, output, level)
+        legacy_ratio = size / os.path.getsize(output)
+        single = _time(zstd_compress, file_name, output, level, threads=0)
+        current = _time(zstd_compress, file_name, output, level)
+        ratio = size / os.path.getsize(output)
+
+    print(f"input size:                  {size_mb} MB, level {level}")
+    print(f"previous (1 KiB reads):      {size / legacy / 1e9:8.3f} GB/s, ratio {legacy_ratio:.2f}")
+    print(f"large reads, 1 thread:       {size / single / 1e9:8.3f} GB/s")
+    print(f"large reads, all cores:      {size / current / 1e9:8.3f} GB/s, ratio {ratio:.2f}")
+    print(f"speed-up:                    {legacy / current:8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--size-mb", type=int, default=512)
+    parser.add_argument("--level", type=int, default=3)
+    arguments = parser.parse_args()
+    run(arguments.size_mb, arguments.level)
@@ -46,7 +46,32 @@ def flow360():
     type=bool,
     help="Toggle beta features support",
 )
-def configure(apikey, profile, dev, suppress_submit_warning, beta_features):
+@click.option(
+    "--cache-size-mb",
+    type=int,
+    help="Size limit of the local cache of downloaded files in MB, 0 disables the cache.",
+)
+@click.option(
+    "--max-bandwidth-mb",
+    type=float,
+    help="Bandwidth cap of all uploads and downloads in MB/s, 0 removes the cap.",
+)
+@click.option(
+    "--metadata-ttl",
+    type=float,
+    help="Seconds the metadata of resources in progress is reused, 0 requests it on every access.",
+)
+# pylint: disable=too-many-arguments
+def configure(
+    apikey,
+    profile,
+    dev,
+    suppress_submit_warning,
+    beta_features,
+    cache_size_mb,
+    max_bandwidth_mb,
+    metadata_ttl,
+):
     """
     Configure flow360.
     """
@@ -74,6 +99,20 @@ def configure(apikey, profile, dev, suppress_submit_warning, beta_features):
         dict_utils.merge_overwrite(config, {"user": {"config": {"beta_features": beta_features}}})
         changed = True
 
+    if cache_size_mb is not None:
+        dict_utils.merge_overwrite(config, {"user": {"config": {"cache_size_mb": cache_size_mb}}})
+        changed = True
+
+    if max_bandwidth_mb is not None:
+        dict_utils.merge_overwrite(
+            config, {"user": {"config": {"max_bandwidth_mb": max_bandwidth_mb}}}
+        )
+        changed = True
+
+    if metadata_ttl is not None:
+        dict_utils.merge_overwrite(config, {"user": {"config": {"metadata_ttl": metadata_ttl}}})
+        changed = True
+
     with open(config_file, "w", encoding="utf-8") as file_handler:
         file_handler.write(toml.dumps(config))
 
@@ -0,0 +1,148 @@
+"""
+CRC32 checksums of uploaded and downloaded objects.
+
+Multipart uploads send the CRC32 of every part and the CRC32 of the whole object, which S3
+verifies and stores with the object as a full object checksum (ChecksumType FULL_OBJECT).
+The checksum of every part is computed from the part data already in memory for upload,
+and the object checksum is combined from the checksums and sizes of the parts, so the file
+is never read a second time. Downloads are checked against the stored checksum.
+
+Checksums are base64 encoded big-endian CRC32 values, as in the S3 API.
+"""
+
+import base64
+import functools
+import os
+import struct
+import zlib
+from typing import Iterable, Optional, Tuple
+
+from ..exceptions import Flow360CloudFileError
+from ..log import log
+
+_CRC32_POLYNOMIAL = 0xEDB88320
+_READ_SIZE = 16 * 1024 * 1024
+
+
+def encode_crc32(crc: int) -> str:
+    """S3 representation of a CRC32 value"""
+    return base64.b64encode(struct.pack(">I", crc)).decode()
+
+
+def decode_crc32(checksum: str) -> int:
+    """CRC32 value of an S3 checksum"""
+    return struct.unpack(">I", base64.b64decode(checksum))[0]
+
+
+def _gf2_matrix_times(matrix, vector: int) -> int:
+    result = 0
+    index = 0
+    while vector:
+        if vector & 1:
+            result ^= matrix[index]
+        vector >>= 1
+        index += 1
+    return result
+
+
+def _gf2_matrix_multiply(first, second):
+    """operator applying second, then first"""
+    return tuple(_gf2_matrix_times(first, column) for column in second)
+
+
+@functools.lru_cache(maxsize=None)
+def _power_operator(power: int):
+    """operator appending 2**power zero bytes to a CRC32"""
+    if power == 0:
+        # one zero bit, squared three times for the eight bits of a byte
+        operator = (_CRC32_POLYNOMIAL,) + tuple(1 << index for index in range(31))
+        for _ in range(3):
+            operator = _gf2_matrix_multiply(operator, operator)
+        return operator
+    previous = _power_operator(power - 1)
+    return _gf2_matrix_multiply(previous, previous)
+
+
+@functools.lru_cache(maxsize=64)
+def _zeros_operator(length: int):
+    """
+    Operator appending length zero bytes to a CRC32. It is built once for every distinct
+    length, all parts of an upload but the last one usually have the same length.
+    """
+    operator = tuple(1 << index for index in range(32))
+    power = 0
+    while length:
+        if length & 1:
+            operator = _gf2_matrix_multiply(_power_operator(power), operator)
+        length >>= 1
+        power += 1
+    return operator
+
+
+def crc32_combine(crc1: int, crc2: int, length2: int) -> int:
+    """
+    CRC32 of the concatenation of two blocks from the CRC32 of each block and the length of
+    the second one, as zlib's crc32_combine.
+    """
+    if length2 <= 0:
+        return crc1
+    return _gf2_matrix_times(_zeros_operator(length2), crc1) ^ crc2
+
+
+def combine_checksums(parts: Iterable[Tuple[str, int]]) -> str:
+    """checksum of an object from the (checksum, size) of its parts in order"""
+    crc = 0
+    for checksum, size in parts:
+        crc = crc32_combine(crc, decode_crc32(checksum), size)
+    return encode_crc32(crc)
+
+
+def fileobj_crc32(fileobj) -> str:
+    """checksum of the rest of a readable binary file object"""
+    crc = 0
+    # read() rather than readinto(), SpooledTemporaryFile has no readinto before Python 3.11
+    while True:
+        data = fileobj.read(_READ_SIZE)
+        if not data:
+            return encode_crc32(crc)
+        crc = zlib.crc32(data, crc)
+
+
+def object_checksum(meta_data: dict) -> Optional[str]:
+    """
+    CRC32 checksum of the whole object from a head_object response made with
+    ChecksumMode="ENABLED", None when the object has no full object CRC32 checksum.
+
+    Only checksums reported with ChecksumType FULL_OBJECT are returned: botocore before
+    1.36 does not parse the type, and composite checksums of multipart uploads ("...-N")
+    are not the CRC32 of the whole content.
+    """
+    checksum = meta_data.get("ChecksumCRC32")
+    if meta_data.get("ChecksumType") != "FULL_OBJECT" or checksum is None or "-" in checksum:
+        return None
+    return checksum
+
+
+def verify_download(meta_data: dict, file, remote_file_name: str):
+    """
+    Check a downloaded file, a file name or a seekable binary file object positioned at the
+    start of the downloaded content, against the checksum of the object.
+
+    Raises Flow360CloudFileError when the content does not match, after removing the file.
+    """
+    expected = object_checksum(meta_data)
+    if expected is None:
+        return
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "rb") as fileobj:
+            checksum = fileobj_crc32(fileobj)
+    else:
+        checksum = fileobj_crc32(file)
+    if checksum != expected:
+        if isinstance(file, (str, os.PathLike)):
+            os.remove(file)
+        raise Flow360CloudFileError(
+            f"Checksum mismatch for {remote_file_name}: expected CRC32 {expected}, "
+            f"downloaded content has {checksum}"
+        )
+    log.debug(f"Verified CRC32 {checksum} of {remote_file_name}")
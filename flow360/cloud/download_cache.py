@@ -0,0 +1,151 @@
+"""
+Persistent local cache of downloaded files.
+
+Files downloaded from the cloud are kept under ~/.flow360/cache, keyed by resource id,
+remote file name, ETag and size of the object. A later download of the same object only
+costs a metadata request and a local copy. Downloaded files are stored as hard links when
+the cache is on the same filesystem, so caching them does not copy any data. The least
+recently used files are evicted when the cache grows above its size limit
+(UserConfig.cache_size_mb).
+"""
+
+import errno
+import hashlib
+import os
+import shutil
+import threading
+
+from ..file_path import flow360_dir
+from ..log import log
+from ..user_config import UserConfig
+
+cache_dir = os.path.join(flow360_dir, "cache")
+
+
+class DownloadCache:
+    """
+    Content-addressed cache of downloaded files with LRU eviction.
+    """
+
+    def __init__(self, max_size: int = None):
+        self._max_size = max_size
+        self._lock = threading.Lock()
+
+    @property
+    def max_size(self) -> int:
+        """size limit of the cache in bytes, 0 disables the cache"""
+        if self._max_size is not None:
+            return self._max_size
+        return UserConfig.cache_size_mb * 1024 * 1024
+
+    @staticmethod
+    def _path(resource_id: str, remote_file_name: str, e_tag: str, size: int) -> str:
+        key = f"{resource_id}:{remote_file_name}:{e_tag}:{size}"
+        return os.path.join(cache_dir, hashlib.sha1(key.encode()).hexdigest())
+
+    # pylint: disable=too-many-arguments
+    def get(self, resource_id: str, remote_file_name: str, e_tag: str, size: int, to_file):
+        """
+        Copy the cached object to to_file, a file name or a writable binary file object.
+
+        Returns True on a cache hit, False when the object is not cached.
+        """
+        if self.max_size <= 0 or e_tag is None:
+            return False
+        path = self._path(resource_id, remote_file_name, e_tag, size)
+        try:
+            if os.path.getsize(path) != size:
+                os.remove(path)
+                return False
+            if isinstance(to_file, str):
+                # to_file may be a hard link of a cache entry, which must not be written into
+                if os.path.lexists(to_file):
+                    os.remove(to_file)
+                shutil.copyfile(path, to_file)
+            else:
+                with open(path, "rb") as file:
+                    shutil.copyfileobj(file, to_file)
+            # modification time orders the entries for eviction
+            os.utime(path)
+        except FileNotFoundError:
+            return False
+        log.debug(f"Loaded {remote_file_name} of {resource_id} from cache {path}")
+        return True
+
+    def open(self, resource_id: str, remote_file_name: str, e_tag: str, size: int):
+        """
+        Open the cached object for reading, returns None when the object is not cached.
+        """
+        if self.max_size <= 0 or e_tag is None:
+            return None
+        path = self._path(resource_id, remote_file_name, e_tag, size)
+        try:
+            if os.path.getsize(path) != size:
+                return None
+            file = open(path, "rb")  # pylint: disable=consider-using-with
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        log.debug(f"Streaming {remote_file_name} of {resource_id} from cache {path}")
+        return file
+
+    # pylint: disable=too-many-arguments
+    def put(self, resource_id: str, remote_file_name: str, e_tag: str, size: int, file_name):
+        """
+        Store a downloaded file in the cache and evict least recently used files if the
+        cache is over its size limit. file_name is a file name or a seekable binary file
+        object, which is read from its beginning. A file name is hard-linked into the cache,
+        it is copied only when the cache is on a different filesystem.
+        """
+        max_size = self.max_size
+        if max_size <= 0 or e_tag is None or size > max_size:
+            return
+        path = self._path(resource_id, remote_file_name, e_tag, size)
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            if isinstance(file_name, str):
+                try:
+                    os.link(file_name, tmp_path)
+                except OSError as error:
+                    if error.errno != errno.EXDEV:
+                        raise
+                    shutil.copyfile(file_name, tmp_path)
+            else:
+                file_name.seek(0)
+                with open(tmp_path, "wb") as file:
+                    shutil.copyfileobj(file_name, file)
+            os.replace(tmp_path, path)
+        except OSError as error:
+            log.debug(f"Could not cache {remote_file_name} of {resource_id}: {error}")
+            return
+        self.evict(max_size)
+
+    def evict(self, max_size: int = None):
+        """remove least recently used files until the cache fits in max_size bytes"""
+        if max_size is None:
+            max_size = self.max_size
+        with self._lock:
+            entries = []
+            with os.scandir(cache_dir) as iterator:
+                for entry in iterator:
+                    if entry.is_file() and not entry.name.endswith(".tmp"):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total_size = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total_size <= max_size:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total_size -= size
+
+    def clear(self):
+        """remove all cached files"""
+        if os.path.exists(cache_dir):
+            shutil.rmtree(cache_dir)
+
+
+download_cache = DownloadCache()
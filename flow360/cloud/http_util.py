@@ -3,9 +3,16 @@ http utils. Example:
 http.get(path)
 """
 
-from functools import wraps
+import asyncio
+import random
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, wraps
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from ..environment import Env
 from ..exceptions import (
@@ -77,13 +84,143 @@ def http_interceptor(func):
     return wrapper
 
 
+# pylint: disable=too-few-public-methods
+class HttpStats:
+    """
+    Counters of the HTTP transport.
+
+    requests: number of requests sent
+    retries: number of retried requests (connection errors, 429 and 5xx responses)
+    pool_waits: number of requests started while all pooled connections were busy
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.pool_waits = 0
+
+    def __repr__(self):
+        return (
+            f"HttpStats(requests={self.requests}, retries={self.retries}, "
+            f"pool_waits={self.pool_waits})"
+        )
+
+
+class _Retry(Retry):
+    """
+    urllib3 Retry with random jitter added to the exponential backoff, counting retries.
+    """
+
+    stats: HttpStats = None
+    backoff_jitter_max: float = 0
+
+    def increment(self, *args, **kwargs):
+        retry = super().increment(*args, **kwargs)
+        if self.stats is not None:
+            self.stats.retries += 1
+        return retry
+
+    def get_backoff_time(self):
+        backoff = super().get_backoff_time()
+        if backoff <= 0:
+            return backoff
+        return backoff + random.uniform(0, self.backoff_jitter_max)
+
+
+# pylint: disable=too-many-instance-attributes
 class Http:
     """
     Http util class.
+
+    Requests go through a pooled session with default timeouts. Idempotent requests (GET,
+    PUT, DELETE) are retried with exponential backoff and jitter on connection errors and
+    on 429/5xx responses, honouring the Retry-After header.
     """
 
-    def __init__(self, session: requests.Session):
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        session: requests.Session,
+        pool_size: int = 32,
+        max_retries: int = 5,
+        backoff_factor: float = 0.5,
+        backoff_jitter: float = 0.5,
+        timeout=(10, 60),
+    ):
         self.session = session
+        self.stats = HttpStats()
+        self._pool_size = pool_size
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self.configure(
+            pool_size=pool_size,
+            max_retries=max_retries,
+            backoff_factor=backoff_factor,
+            backoff_jitter=backoff_jitter,
+            timeout=timeout,
+        )
+
+    # pylint: disable=too-many-arguments
+    def configure(
+        self,
+        pool_size: int = None,
+        max_retries: int = None,
+        backoff_factor: float = None,
+        backoff_jitter: float = None,
+        timeout=None,
+    ):
+        """
+        Configure the transport. Arguments left as None keep their current value.
+
+        :param pool_size: number of pooled connections, match it to the client concurrency
+        :param max_retries: maximum number of retries of a single request
+        :param backoff_factor: base of the exponential backoff between retries, in seconds
+        :param backoff_jitter: maximum random delay added to every backoff, in seconds
+        :param timeout: default (connect, read) timeout in seconds
+        """
+        if pool_size is not None:
+            self._pool_size = pool_size
+        if max_retries is not None:
+            self._max_retries = max_retries
+        if backoff_factor is not None:
+            self._backoff_factor = backoff_factor
+        if backoff_jitter is not None:
+            self._backoff_jitter = backoff_jitter
+        if timeout is not None:
+            self.timeout = timeout
+
+        retry_class = type(
+            "_Retry", (_Retry,), {"stats": self.stats, "backoff_jitter_max": self._backoff_jitter}
+        )
+        retry = retry_class(
+            total=self._max_retries,
+            backoff_factor=self._backoff_factor,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET", "PUT", "DELETE", "HEAD", "OPTIONS"],
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        if isinstance(self.session, requests.Session):
+            adapter = HTTPAdapter(
+                pool_connections=self._pool_size,
+                pool_maxsize=self._pool_size,
+                max_retries=retry,
+                pool_block=True,
+            )
+            self.session.mount("https://", adapter)
+            self.session.mount("http://", adapter)
+
+    def _request(self, method: str, url: str, **kwargs):
+        with self._lock:
+            self.stats.requests += 1
+            if self._in_flight >= self._pool_size:
+                self.stats.pool_waits += 1
+            self._in_flight += 1
+        try:
+            return getattr(self.session, method)(url, timeout=self.timeout, **kwargs)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
 
     @http_interceptor
     def portal_api_get(self, path: str, json=None, params=None):
@@ -93,8 +230,12 @@ class Http:
         :param json:
         :return:
         """
-        return self.session.get(
-            url=Env.current.get_portal_real_url(path), json=json, params=params, auth=api_key_auth
+        return self._request(
+            "get",
+            Env.current.get_portal_real_url(path),
+            json=json,
+            params=params,
+            auth=api_key_auth,
         )
 
     @http_interceptor
@@ -105,8 +246,8 @@ class Http:
         :param json:
         :return:
         """
-        return self.session.get(
-            url=Env.current.get_real_url(path), json=json, params=params, auth=api_key_auth
+        return self._request(
+            "get", Env.current.get_real_url(path), json=json, params=params, auth=api_key_auth
         )
 
     @http_interceptor
@@ -117,7 +258,7 @@ class Http:
         :param json:
         :return:
         """
-        return self.session.post(Env.current.get_real_url(path), json=json, auth=api_key_auth)
+        return self._request("post", Env.current.get_real_url(path), json=json, auth=api_key_auth)
 
     @http_interceptor
     def put(self, path: str, json):
@@ -127,7 +268,7 @@ class Http:
         :param json:
         :return:
         """
-        return self.session.put(Env.current.get_real_url(path), json=json, auth=api_key_auth)
+        return self._request("put", Env.current.get_real_url(path), json=json, auth=api_key_auth)
 
     @http_interceptor
     def delete(self, path: str):
@@ -136,7 +277,103 @@ class Http:
         :param path:
         :return:
         """
-        return self.session.delete(Env.current.get_real_url(path), auth=api_key_auth)
+        return self._request("delete", Env.current.get_real_url(path), auth=api_key_auth)
 
 
 http = Http(requests.Session())
+
+
+class AsyncHttp:
+    """
+    Asyncio mirror of Http.
+
+    Requests are issued through the pooled, retrying transport of an Http instance on a
+    dedicated pool of I/O threads, so callers can await many of them from a single event
+    loop. The number of requests in flight is bounded by max_concurrency.
+    """
+
+    def __init__(self, client: Http = None, max_concurrency: int = 32):
+        self._client = client
+        self.max_concurrency = max_concurrency
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    @property
+    def client(self) -> Http:
+        """synchronous client used for the requests"""
+        return self._client if self._client is not None else http
+
+    def _get_executor(self):
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrency, thread_name_prefix="flow360-http"
+                )
+            return self._executor
+
+    def _get_semaphore(self, loop):
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    async def _call(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        async with self._get_semaphore(loop):
+            return await loop.run_in_executor(self._get_executor(), partial(func, *args, **kwargs))
+
+    async def run(self, func, *args, **kwargs):
+        """
+        Run a blocking function making requests, e.g. through Http or RestApi, on the I/O
+        threads, counted against max_concurrency like the requests of this class.
+        """
+        return await self._call(func, *args, **kwargs)
+
+    async def portal_api_get(self, path: str, json=None, params=None):
+        """
+        Get the resource from the portal API.
+        :param path:
+        :param json:
+        :return:
+        """
+        return await self._call(self.client.portal_api_get, path, json=json, params=params)
+
+    async def get(self, path: str, json=None, params=None):
+        """
+        Get the resource.
+        :param path:
+        :param json:
+        :return:
+        """
+        return await self._call(self.client.get, path, json=json, params=params)
+
+    async def post(self, path: str, json=None):
+        """
+        Create the resource.
+        :param path:
+        :param json:
+        :return:
+        """
+        return await self._call(self.client.post, path, json=json)
+
+    async def put(self, path: str, json):
+        """
+        Update the resource.
+        :param path:
+        :param json:
+        :return:
+        """
+        return await self._call(self.client.put, path, json=json)
+
+    async def delete(self, path: str):
+        """
+        Delete the resource.
+        :param path:
+        :return:
+        """
+        return await self._call(self.client.delete, path)
+
+
+async_http = AsyncHttp()
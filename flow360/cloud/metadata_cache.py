@@ -0,0 +1,120 @@
+"""
+Process-wide cache of resource metadata.
+
+Every resource, identified by its metadata type and id, has a single cache entry shared by
+all objects created for it, e.g. by Case(id), Case.parent or CaseMeta.to_case(). Metadata
+of resources in a final state (completed, error, deleted, ...) is kept indefinitely,
+metadata of resources still in progress, including uploaded resources the web API has yet
+to process, is refreshed when it is older than the TTL (UserConfig.metadata_ttl). Methods
+changing the metadata of a resource, e.g. move_to_folder, invalidate its entry. Concurrent
+requests for the same resource, from any number of objects and threads, wait for a single
+request to the web API.
+"""
+
+import threading
+import time
+from typing import Callable, Hashable
+
+from ..user_config import UserConfig
+
+
+# pylint: disable=too-few-public-methods
+class _Entry:
+    """metadata of one resource, fetched_at is the time its request was sent"""
+
+    def __init__(self):
+        self.info = None
+        self.fetched_at = None
+        self.lock = threading.Lock()
+
+
+# final statuses after which the web API still changes the resource, e.g. an uploaded volume
+# mesh is processed next
+_PROCESSED_AFTER = ("uploaded",)
+
+
+def _is_final(info) -> bool:
+    """metadata of a deleted resource or of a resource in a final status"""
+    if getattr(info, "deleted", False):
+        return True
+    status = getattr(info, "status", None)
+    if getattr(status, "value", None) in _PROCESSED_AFTER:
+        return False
+    return hasattr(status, "is_final") and status.is_final()
+
+
+class MetadataCache:
+    """
+    Identity map of resource metadata keyed by (metadata type, resource id).
+    """
+
+    def __init__(self, ttl: float = None):
+        self._ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @property
+    def ttl(self) -> float:
+        """seconds the metadata of a resource in progress is reused, 0 refreshes it on
+        every access"""
+        if self._ttl is not None:
+            return self._ttl
+        return UserConfig.metadata_ttl
+
+    @ttl.setter
+    def ttl(self, value: float):
+        """set the TTL in seconds, None restores the configured value"""
+        self._ttl = value
+
+    def _entry(self, key: Hashable) -> _Entry:
+        with self._lock:
+            return self._entries.setdefault(key, _Entry())
+
+    def _is_fresh(self, entry: _Entry) -> bool:
+        if entry.info is None:
+            return False
+        if _is_final(entry.info):
+            return True
+        return time.monotonic() - entry.fetched_at < self.ttl
+
+    def cached(self, key: Hashable):
+        """cached metadata of key if it does not need a refresh, None otherwise"""
+        entry = self._entry(key)
+        return entry.info if self._is_fresh(entry) else None
+
+    def get(self, key: Hashable, fetch: Callable, force: bool = False):
+        """
+        Metadata of key, calling fetch() to request it when it is not cached or needs a
+        refresh. With force, the metadata is requested again unless a request sent after
+        this call already completed.
+        """
+        requested = time.monotonic()
+        entry = self._entry(key)
+        with entry.lock:
+            if force:
+                if entry.fetched_at is not None and entry.fetched_at >= requested:
+                    return entry.info
+            elif self._is_fresh(entry):
+                return entry.info
+            fetched_at = time.monotonic()
+            entry.info = fetch()
+            entry.fetched_at = fetched_at
+            return entry.info
+
+    def put(self, key: Hashable, info):
+        """store metadata of key received by other means than get, e.g. in a listing"""
+        entry = self._entry(key)
+        with entry.lock:
+            entry.info = info
+            entry.fetched_at = time.monotonic()
+
+    def invalidate(self, key: Hashable = None):
+        """drop the metadata of key, or of all resources when key is None"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+
+metadata_cache = MetadataCache()
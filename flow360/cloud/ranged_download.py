@@ -0,0 +1,155 @@
+"""
+Parallel byte-range downloads from S3.
+
+An object is split into byte ranges fetched concurrently into a preallocated temporary
+file. Completed ranges are recorded in a sidecar progress file, so an interrupted
+download resumes from the ranges it already has.
+"""
+
+import concurrent.futures
+import json
+import os
+import threading
+
+from ..log import log
+
+_PARTIAL_SUFFIX = ".flow360-download"
+_PROGRESS_SUFFIX = ".flow360-download.json"
+_READ_SIZE = 1024 * 1024
+
+
+class _DownloadProgress:
+    """
+    Sidecar record of the completed ranges of a download.
+    """
+
+    def __init__(self, path: str, e_tag: str, size: int, part_size: int):
+        self.path = path
+        self.e_tag = e_tag
+        self.size = size
+        self.part_size = part_size
+        self.completed = set()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str, e_tag: str, size: int, part_size: int):
+        """load the sidecar if it describes the same object, otherwise start afresh"""
+        progress = cls(path, e_tag, size, part_size)
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as file:
+                    saved = json.load(file)
+                if (saved["e_tag"], saved["size"], saved["part_size"]) == (e_tag, size, part_size):
+                    progress.completed = set(saved["completed"])
+            except (OSError, ValueError, KeyError) as error:
+                log.debug(f"Ignoring download progress file {path}: {error}")
+        return progress
+
+    def mark_completed(self, index: int):
+        """record a completed range and persist the record"""
+        with self._lock:
+            self.completed.add(index)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(
+                    {
+                        "e_tag": self.e_tag,
+                        "size": self.size,
+                        "part_size": self.part_size,
+                        "completed": sorted(self.completed),
+                    },
+                    file,
+                )
+            os.replace(tmp_path, self.path)
+
+
+# pylint: disable=too-many-arguments, too-many-locals
+def download_ranges(
+    client,
+    bucket: str,
+    key: str,
+    to_file: str,
+    size: int,
+    e_tag: str,
+    part_size: int,
+    max_concurrency: int,
+    callback=None,
+    throttle=None,
+):
+    """
+    Download an S3 object by fetching byte ranges concurrently.
+
+    Parameters
+    ----------
+    client :
+        boto3 S3 client.
+    bucket : str
+        Bucket of the object.
+    key : str
+        Key of the object.
+    to_file : str
+        Destination file. It is only replaced once all ranges are downloaded.
+    size : int
+        Size of the object in bytes (ContentLength).
+    e_tag : str
+        ETag of the object. Ranges are requested with If-Match, so the download fails
+        instead of mixing two versions of an object.
+    part_size : int
+        Size of each byte range.
+    max_concurrency : int
+        Number of ranges downloaded at the same time.
+    callback : callable, optional
+        Called with the number of bytes received, possibly from several threads.
+    throttle : callable, optional
+        Called with the number of bytes received from the network before they are written,
+        may block to limit the download rate.
+    """
+
+    partial_file = to_file + _PARTIAL_SUFFIX
+    progress = _DownloadProgress.load(to_file + _PROGRESS_SUFFIX, e_tag, size, part_size)
+    if not os.path.exists(partial_file):
+        progress.completed = set()
+    with open(partial_file, "r+b" if os.path.exists(partial_file) else "wb") as file:
+        file.truncate(size)
+
+    ranges = [
+        (index, start, min(start + part_size, size) - 1)
+        for index, start in enumerate(range(0, size, part_size))
+    ]
+    if progress.completed:
+        log.info(f"Resuming download of {key}: {len(progress.completed)}/{len(ranges)} parts")
+
+    def fetch(index, start, end):
+        response = client.get_object(
+            Bucket=bucket, Key=key, Range=f"bytes={start}-{end}", IfMatch=e_tag
+        )
+        with open(partial_file, "r+b") as file:
+            file.seek(start)
+            for data in response["Body"].iter_chunks(_READ_SIZE):
+                if throttle is not None:
+                    throttle(len(data))
+                file.write(data)
+                if callback is not None:
+                    callback(len(data))
+        progress.mark_completed(index)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        futures = []
+        for index, start, end in ranges:
+            if index in progress.completed:
+                if callback is not None:
+                    callback(end - start + 1)
+                continue
+            futures.append(executor.submit(fetch, index, start, end))
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                future.result()
+        except BaseException:
+            # completed ranges stay recorded in the sidecar for the next attempt
+            for future in futures:
+                future.cancel()
+            raise
+
+    os.replace(partial_file, to_file)
+    if os.path.exists(progress.path):
+        os.remove(progress.path)
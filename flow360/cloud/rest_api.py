@@ -3,7 +3,7 @@ RestApi
 """
 
 from ..component.utils import is_valid_uuid
-from .http_util import http
+from .http_util import async_http, http
 
 
 class RestApi:
@@ -48,3 +48,34 @@ class RestApi:
         Resource delete
         """
         return http.delete(path or self._url(method))
+
+
+# pylint: disable=invalid-overridden-method
+class AsyncRestApi(RestApi):
+    """
+    Asyncio mirror of RestApi
+    """
+
+    async def get(self, path=None, method=None, json=None, params=None):
+        """
+        Resource get
+        """
+        return await async_http.get(path or self._url(method), json=json, params=params)
+
+    async def post(self, json, path=None, method=None):
+        """
+        Resource post
+        """
+        return await async_http.post(path or self._url(method), json=json)
+
+    async def put(self, json, path=None, method=None):
+        """
+        Resource put
+        """
+        return await async_http.put(path or self._url(method), json=json)
+
+    async def delete(self, path=None, method=None):
+        """
+        Resource delete
+        """
+        return await async_http.delete(path or self._url(method))
@@ -3,22 +3,31 @@ s3 util file for material uploading and downloading.
 """
 
 import os
+import threading
+import time
 import urllib
 from abc import ABCMeta, abstractmethod
 from datetime import datetime
 from enum import Enum
+from typing import Optional, Union
 
 import boto3
 from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 
 # pylint: disable=unused-import
 from botocore.exceptions import ClientError as CloudFileNotFoundError
 from pydantic import BaseModel, Field
 
 from ..environment import Env
-from ..exceptions import Flow360ValueError
+from ..exceptions import Flow360CloudFileError, Flow360ValueError
 from ..log import log
+from .checksum import verify_download
+from .download_cache import download_cache
 from .http_util import http
+from .ranged_download import download_ranges
+from .transfer_policy import DEFAULT_PART_SIZE, transfer_config
+from .transfer_scheduler import TransferPriority, transfer_scheduler
 from .utils import _get_progress, _S3Action
 
 
@@ -38,10 +47,38 @@ class ProgressCallbackInterface(metaclass=ABCMeta):
         pass
 
 
+# per-part CRC32 checksums of files uploaded by boto3, verified by S3
+_CHECKSUM_ARGS = {"ChecksumAlgorithm": "CRC32"}
+
+
+def _supports_full_object_checksums(client) -> bool:
+    """
+    True when the client knows the ChecksumType parameter of multipart uploads (botocore
+    1.36 or later). With older clients, multipart uploads get only per-part checksums.
+    """
+    operation = client.meta.service_model.operation_model("CreateMultipartUpload")
+    return "ChecksumType" in operation.input_shape.members
+
+
+def _seekable(fileobj) -> bool:
+    """seekable() of a file object, SpooledTemporaryFile has no seekable() before Python 3.11"""
+    if hasattr(fileobj, "seekable"):
+        return fileobj.seekable()
+    return hasattr(fileobj, "seek") and hasattr(fileobj, "tell")
+
+
 _s3_config = TransferConfig(
-    multipart_threshold=1024 * 25,
+    multipart_threshold=DEFAULT_PART_SIZE,
     max_concurrency=50,
-    multipart_chunksize=1024 * 25,
+    multipart_chunksize=DEFAULT_PART_SIZE,
+    use_threads=True,
+)
+
+# objects larger than multipart_threshold are downloaded as concurrent, resumable byte ranges
+_s3_download_config = TransferConfig(
+    multipart_threshold=64 * 1024 * 1024,
+    max_concurrency=16,
+    multipart_chunksize=16 * 1024 * 1024,
     use_threads=True,
 )
 
@@ -99,6 +136,51 @@ def get_local_filename_and_create_folders(
     return to_file
 
 
+OVERWRITE_IF_CHANGED = "if-changed"
+
+
+class _DownloadedObject(BaseModel):
+    """
+    Sidecar record of the remote object a local file was downloaded from. It is stored as a
+    hidden file next to the downloaded file and used by overwrite="if-changed".
+    """
+
+    e_tag: Optional[str]
+    last_modified: Optional[datetime]
+    size: int
+
+    @staticmethod
+    def path(file_name: str) -> str:
+        """path of the sidecar record of file_name"""
+        dirname, basename = os.path.split(file_name)
+        return os.path.join(dirname, f".{basename}.flow360.json")
+
+    @classmethod
+    def from_head(cls, meta_data: dict):
+        """record of the object described by a head_object response"""
+        return cls(
+            e_tag=meta_data.get("ETag"),
+            last_modified=meta_data.get("LastModified"),
+            size=meta_data.get("ContentLength", 0),
+        )
+
+    def matches(self, file_name: str) -> bool:
+        """True when file_name was downloaded from this object and was not modified since"""
+        path = self.path(file_name)
+        if not os.path.exists(path) or os.path.getsize(file_name) != self.size:
+            return False
+        try:
+            saved = _DownloadedObject.parse_file(path)
+        except ValueError:
+            return False
+        return saved == self
+
+    def save(self, file_name: str):
+        """store the record next to file_name"""
+        with open(self.path(file_name), "w", encoding="utf-8") as file:
+            file.write(self.json())
+
+
 class _UserCredential(BaseModel):
     access_key_id: str = Field(alias="accessKeyId")
     expiration: datetime
@@ -109,6 +191,8 @@ class _UserCredential(BaseModel):
 class _S3STSToken(BaseModel):
     cloud_path: str = Field(alias="cloudpath")
     user_credential: _UserCredential = Field(alias="userCredentials")
+    # True when the credential was granted for another file of the same resource
+    shared: bool = False
 
     def get_bucket(self):
         """
@@ -129,15 +213,36 @@ class _S3STSToken(BaseModel):
     def get_client(self):
         """
         Get s3 client.
+
+        Clients are cached per credential, region and endpoint and shared between threads, so
+        repeated calls (for example one per uploaded part) do not create new clients.
         :return:
         """
-        return boto3.client(
-            "s3",
-            region_name=Env.current.aws_region,
-            aws_access_key_id=self.user_credential.access_key_id,
-            aws_secret_access_key=self.user_credential.secret_access_key,
-            aws_session_token=self.user_credential.session_token,
+        key = (
+            self.user_credential.access_key_id,
+            self.user_credential.session_token,
+            Env.current.aws_region,
+            Env.current.s3_endpoint_url,
         )
+        with _s3_clients_lock:
+            cached = _s3_clients.get(key)
+            if cached is not None and not self.is_expired():
+                return cached[0]
+            for cached_key, (_, cached_token) in list(_s3_clients.items()):
+                if cached_token.is_expired():
+                    del _s3_clients[cached_key]
+            # boto3 sessions are not thread safe, create the client under the lock
+            client = boto3.session.Session().client(
+                "s3",
+                region_name=Env.current.aws_region,
+                endpoint_url=Env.current.s3_endpoint_url,
+                aws_access_key_id=self.user_credential.access_key_id,
+                aws_secret_access_key=self.user_credential.secret_access_key,
+                aws_session_token=self.user_credential.session_token,
+                config=Config(max_pool_connections=_s3_config.max_concurrency),
+            )
+            _s3_clients[key] = (client, self)
+        return client
 
     def is_expired(self):
         """
@@ -150,6 +255,106 @@ class _S3STSToken(BaseModel):
         ).total_seconds() < 300
 
 
+class _S3CredentialManager:
+    """
+    Cache of STS grants used by S3 transfers.
+
+    Grants are cached per file. A grant for one file of a resource is also shared with the
+    other files of that resource when its cloud path is the resource prefix followed by the
+    file name, so downloading many result files of one case needs a single grant request.
+    Cached grants used recently are refreshed on a background thread before they expire.
+    """
+
+    refresh_margin = 600
+    refresh_interval = 60
+    keep_alive = 3600
+
+    def __init__(self):
+        self._tokens = {}
+        self._last_used = {}
+        self._shared = {}
+        self._not_shareable = set()
+        self._lock = threading.Lock()
+        self._refresh_thread = None
+
+    # pylint: disable=protected-access
+    def _grant(self, transfer_type, resource_id: str, file_name: str) -> _S3STSToken:
+        resp = http.get(transfer_type._get_grant_url(resource_id, file_name))
+        token = _S3STSToken.parse_obj(resp)
+        resource_key = (transfer_type, resource_id)
+        with self._lock:
+            self._tokens[(transfer_type, resource_id, file_name)] = token
+            if token.cloud_path.endswith(f"/{file_name}"):
+                prefix = token.cloud_path[: -len(file_name)]
+                self._shared[resource_key] = (prefix, token.user_credential)
+        return token
+
+    def get_token(
+        self, transfer_type, resource_id: str, file_name: str, shared: bool = True
+    ) -> _S3STSToken:
+        """
+        Get a token for a file, granting a new one only when no valid credential is cached.
+
+        When shared is True, a credential granted for another file of the same resource
+        may be reused.
+        """
+        key = (transfer_type, resource_id, file_name)
+        with self._lock:
+            self._last_used[key] = time.time()
+            token = self._tokens.get(key)
+            if token is not None and not token.is_expired():
+                return token
+            resource_key = (transfer_type, resource_id)
+            if shared and resource_key in self._shared and resource_key not in self._not_shareable:
+                prefix, credential = self._shared[resource_key]
+                token = _S3STSToken(
+                    cloudpath=f"{prefix}{file_name}", userCredentials=credential, shared=True
+                )
+                if not token.is_expired():
+                    return token
+        self._start_refresh_thread()
+        return self._grant(transfer_type, resource_id, file_name)
+
+    def disable_sharing(self, transfer_type, resource_id: str):
+        """stop sharing credentials between files of a resource"""
+        with self._lock:
+            self._not_shareable.add((transfer_type, resource_id))
+
+    def refresh_expiring(self):
+        """re-grant cached tokens that are still in use and close to expiration"""
+        now = time.time()
+        with self._lock:
+            expiring = [
+                key
+                for key, token in self._tokens.items()
+                if now - self._last_used.get(key, 0) < self.keep_alive
+                and (
+                    token.user_credential.expiration
+                    - datetime.now(tz=token.user_credential.expiration.tzinfo)
+                ).total_seconds()
+                < self.refresh_margin
+            ]
+        for key in expiring:
+            try:
+                self._grant(*key)
+            # pylint: disable=broad-exception-caught
+            except Exception as error:
+                log.debug(f"Failed to refresh S3 credentials for {key}: {error}")
+
+    def _refresh_loop(self):
+        while True:
+            time.sleep(self.refresh_interval)
+            self.refresh_expiring()
+
+    def _start_refresh_thread(self):
+        with self._lock:
+            if self._refresh_thread is None:
+                self._refresh_thread = threading.Thread(
+                    target=self._refresh_loop, name="flow360-s3-credentials", daemon=True
+                )
+                self._refresh_thread.start()
+
+
 class S3TransferType(Enum):
     """
     Enum for s3 transfer type
@@ -187,14 +392,22 @@ class S3TransferType(Enum):
             resource_id (str): The ID of the resource.
             remote_file_name (str): The name of the remote file.
 
+        The upload expects a CRC32 checksum for every part and, when the installed botocore
+        supports full object checksums, for the whole object, which S3 stores with the object.
+
         Returns:
             str: The upload ID of the multipart upload.
         """
         token = self._get_s3_sts_token(resource_id, remote_file_name)
         client = token.get_client()
+        extra_args = {}
+        if _supports_full_object_checksums(client):
+            extra_args = {"ChecksumType": "FULL_OBJECT"}
         return client.create_multipart_upload(
             Bucket=token.get_bucket(),
             Key=token.get_s3_key(),
+            ChecksumAlgorithm="CRC32",
+            **extra_args,
         )["UploadId"]
 
     # pylint: disable=too-many-arguments
@@ -205,6 +418,7 @@ class S3TransferType(Enum):
         upload_id: str,
         part_number: int,
         compressed_chunk,
+        checksum: str = None,
     ):
         """
         Uploads a part of the file as part of a multipart upload.
@@ -215,25 +429,41 @@ class S3TransferType(Enum):
             upload_id (str): The ID of the multipart upload.
             part_number (int): The part number of the upload.
             compressed_chunk: The compressed chunk data to upload.
+            checksum (str, optional): The CRC32 checksum of the data, S3 rejects the part
+            when the received data does not match it.
 
         Returns:
-            dict: A dictionary containing the e_tag and part_number of the uploaded part.
+            dict: A dictionary containing the e_tag and part_number of the uploaded part, and
+            its checksum when given.
         """
         token = self._get_s3_sts_token(resource_id, remote_file_name)
         client = token.get_client()
+        extra_args = {}
+        if checksum is not None:
+            extra_args = {"ChecksumAlgorithm": "CRC32", "ChecksumCRC32": checksum}
         response = client.upload_part(
             Bucket=token.get_bucket(),
             Key=token.get_s3_key(),
             PartNumber=part_number,
             UploadId=upload_id,
-            Body=compressed_chunk,
+            Body=transfer_scheduler.body(compressed_chunk, TransferPriority.BULK),
+            **extra_args,
         )
 
         # Return the e_tag of the uploaded part
-        return {"ETag": response["ETag"], "PartNumber": part_number}
+        result = {"ETag": response["ETag"], "PartNumber": part_number}
+        if checksum is not None:
+            result["ChecksumCRC32"] = checksum
+        return result
 
+    # pylint: disable=too-many-arguments
     def complete_multipart_upload(
-        self, resource_id: str, remote_file_name: str, upload_id: str, uploaded_parts: dict
+        self,
+        resource_id: str,
+        remote_file_name: str,
+        upload_id: str,
+        uploaded_parts: dict,
+        checksum: str = None,
     ):
         """
         Completes a multipart upload for the specified resource ID, remote file name, upload ID, e_tag, and part number.
@@ -244,18 +474,32 @@ class S3TransferType(Enum):
             upload_id (str): The ID of the multipart upload.
             e_tag (str): The e_tag of the uploaded part.
             part_number (int): The part number of the completed upload.
+            checksum (str, optional): The CRC32 checksum of the whole object, S3 verifies it
+            against the uploaded parts and stores it with the object. It is not sent when the
+            installed botocore does not support full object checksums.
 
         Returns:
             None
         """
         token = self._get_s3_sts_token(resource_id, remote_file_name)
         client = token.get_client()
-        client.complete_multipart_upload(
+        extra_args = {}
+        if checksum is not None and not _supports_full_object_checksums(client):
+            checksum = None
+        if checksum is not None:
+            extra_args = {"ChecksumCRC32": checksum, "ChecksumType": "FULL_OBJECT"}
+        response = client.complete_multipart_upload(
             Bucket=token.get_bucket(),
             Key=token.get_s3_key(),
             UploadId=upload_id,
             MultipartUpload={"Parts": uploaded_parts},
+            **extra_args,
         )
+        if checksum is not None and response.get("ChecksumCRC32", checksum) != checksum:
+            raise Flow360CloudFileError(
+                f"Checksum mismatch for {remote_file_name}: uploaded CRC32 {checksum}, "
+                f"stored object has {response['ChecksumCRC32']}"
+            )
 
     def upload_file(
         self, resource_id: str, remote_file_name: str, file_name: str, progress_callback=None
@@ -272,14 +516,19 @@ class S3TransferType(Enum):
 
         token = self._get_s3_sts_token(resource_id, remote_file_name)
         client = token.get_client()
+        # part size follows the file size, so large files stay under the S3 part limit
+        config = transfer_config(os.path.getsize(file_name))
         if progress_callback:
             progress_callback.total = float(os.path.getsize(file_name))
             client.upload_file(
                 Bucket=token.get_bucket(),
                 Filename=file_name,
                 Key=token.get_s3_key(),
-                Callback=progress_callback,
-                Config=_s3_config,
+                Callback=transfer_scheduler.throttled_callback(
+                    progress_callback, TransferPriority.BULK
+                ),
+                Config=config,
+                ExtraArgs=_CHECKSUM_ARGS,
             )
         else:
             with _get_progress(_S3Action.UPLOADING) as progress:
@@ -295,20 +544,55 @@ class S3TransferType(Enum):
                     Bucket=token.get_bucket(),
                     Filename=file_name,
                     Key=token.get_s3_key(),
-                    Callback=_call_back,
-                    Config=_s3_config,
+                    Callback=transfer_scheduler.throttled_callback(
+                        _call_back, TransferPriority.BULK
+                    ),
+                    Config=config,
+                    ExtraArgs=_CHECKSUM_ARGS,
                 )
 
-    # pylint: disable=too-many-arguments
+    def _head_object(self, resource_id: str, remote_file_name: str, log_error: bool = True):
+        """
+        Get the token and the head_object metadata of a file, preferring the credential
+        shared by the resource.
+        """
+        token = self._get_s3_sts_token(resource_id, remote_file_name, shared=True)
+        try:
+            try:
+                meta_data = token.get_client().head_object(
+                    Bucket=token.get_bucket(), Key=token.get_s3_key(), ChecksumMode="ENABLED"
+                )
+            except CloudFileNotFoundError as error:
+                if not token.shared or error.response["Error"]["Code"] not in [
+                    "403",
+                    "AccessDenied",
+                ]:
+                    raise
+                # the resource credential does not cover this file, ask for a dedicated grant
+                token = self._get_s3_sts_token(resource_id, remote_file_name)
+                meta_data = token.get_client().head_object(
+                    Bucket=token.get_bucket(), Key=token.get_s3_key(), ChecksumMode="ENABLED"
+                )
+                _s3_credentials.disable_sharing(self, resource_id)
+        except CloudFileNotFoundError:
+            if log_error:
+                log.error(f"{remote_file_name} not found. id={resource_id}")
+            raise
+        return token, meta_data
+
+    # pylint: disable=too-many-arguments, too-many-locals
     def download_file(
         self,
         resource_id: str,
         remote_file_name: str,
         to_file: str = None,
         to_folder: str = ".",
-        overwrite: bool = True,
+        overwrite: Union[bool, str] = True,
         progress_callback=None,
         log_error=True,
+        max_concurrency: int = None,
+        use_cache: bool = True,
+        priority: TransferPriority = None,
     ):
         """
         Download a file from s3.
@@ -316,62 +600,191 @@ class S3TransferType(Enum):
         :param remote_file_name: file name with path in s3
         :param to_file: local file name or local folder name.
         in the same folder as the file on cloud. Only works when to_file is a folder name.
-        :param overwrite: if True overwrite if file exists, otherwise don't download
+        :param overwrite: if True overwrite if file exists, otherwise don't download.
+        "if-changed" downloads only when the remote object (ETag, LastModified, size) differs
+        from the one the local file was downloaded from
         :param progress_callback: provide custom callback for progress
+        :param max_concurrency: number of byte ranges downloaded concurrently for large files
+        :param priority: priority class of the download in the transfer scheduler, by default
+        interactive for files up to transfer_scheduler.INTERACTIVE_SIZE, bulk otherwise
+        :param use_cache: if True copy the file from the local download cache when the cached
+        copy has the same ETag and size, and store downloaded files in the cache
         :return:
+        The downloaded file is checked against the CRC32 checksum of the object, when it has
+        one, and removed if it does not match.
         """
 
+        if overwrite not in (True, False, OVERWRITE_IF_CHANGED):
+            raise Flow360ValueError(
+                f'overwrite must be True, False or "{OVERWRITE_IF_CHANGED}", got {overwrite}'
+            )
         to_file = get_local_filename_and_create_folders(remote_file_name, to_file, to_folder)
         if os.path.exists(to_file) and not overwrite:
             log.info(f"Skipping {remote_file_name}, file exists.")
             return to_file
 
-        token = self._get_s3_sts_token(resource_id, remote_file_name)
+        token, meta_data = self._head_object(resource_id, remote_file_name, log_error)
         client = token.get_client()
-        try:
-            meta_data = client.head_object(Bucket=token.get_bucket(), Key=token.get_s3_key())
-        except CloudFileNotFoundError:
-            if log_error:
-                log.error(f"{remote_file_name} not found. id={resource_id}")
-            raise
+
+        size = meta_data.get("ContentLength", 0)
+        e_tag = meta_data.get("ETag")
+        downloaded_object = _DownloadedObject.from_head(meta_data)
+        if overwrite == OVERWRITE_IF_CHANGED:
+            if os.path.exists(to_file) and downloaded_object.matches(to_file):
+                log.info(f"Skipping {remote_file_name}, file is up to date.")
+                return to_file
+        # keep an existing sidecar record in sync with the file
+        record_object = overwrite == OVERWRITE_IF_CHANGED or os.path.exists(
+            _DownloadedObject.path(to_file)
+        )
+        if use_cache and download_cache.get(resource_id, remote_file_name, e_tag, size, to_file):
+            if record_object:
+                downloaded_object.save(to_file)
+            if progress_callback:
+                progress_callback.total = size
+                progress_callback(size)
+            log.info(f"Saved to {to_file} (from cache)")
+            return to_file
+
+        if priority is None:
+            priority = TransferPriority.for_size(size)
+
+        def _download(callback):
+            if size > _s3_download_config.multipart_threshold:
+                download_ranges(
+                    client,
+                    token.get_bucket(),
+                    token.get_s3_key(),
+                    to_file,
+                    size=size,
+                    e_tag=e_tag,
+                    part_size=_s3_download_config.multipart_chunksize,
+                    max_concurrency=max_concurrency or _s3_download_config.max_concurrency,
+                    callback=callback,
+                    throttle=lambda received: transfer_scheduler.throttle(received, priority),
+                )
+            else:
+                client.download_file(
+                    Bucket=token.get_bucket(),
+                    Filename=to_file,
+                    Key=token.get_s3_key(),
+                    Callback=transfer_scheduler.throttled_callback(callback, priority),
+                    Config=_s3_config,
+                )
 
         if progress_callback:
-            progress_callback.total = meta_data.get("ContentLength", 0)
-            client.download_file(
-                Bucket=token.get_bucket(),
-                Filename=to_file,
-                Key=token.get_s3_key(),
-                Callback=progress_callback,
-            )
+            progress_callback.total = size
+            with transfer_scheduler.transfer(priority):
+                _download(progress_callback)
         else:
             with _get_progress(_S3Action.DOWNLOADING) as progress:
                 progress.start()
                 task_id = progress.add_task(
                     "download",
                     filename=os.path.basename(remote_file_name),
-                    total=meta_data.get("ContentLength", 0),
+                    total=size,
                 )
 
                 def _call_back(bytes_in_chunk):
                     progress.update(task_id, advance=bytes_in_chunk)
 
-                client.download_file(
-                    Bucket=token.get_bucket(),
-                    Filename=to_file,
-                    Key=token.get_s3_key(),
-                    Callback=_call_back,
-                )
+                with transfer_scheduler.transfer(priority):
+                    _download(_call_back)
+        verify_download(meta_data, to_file, remote_file_name)
+        if use_cache:
+            download_cache.put(resource_id, remote_file_name, e_tag, size, to_file)
+        if record_object:
+            downloaded_object.save(to_file)
         log.info(f"Saved to {to_file}")
         return to_file
 
-    def _get_s3_sts_token(self, resource_id: str, file_name: str) -> _S3STSToken:
-        session_key = f"{resource_id}:{self.value}:{file_name}"
-        if session_key not in _s3_sts_tokens or _s3_sts_tokens[session_key].is_expired():
-            path = self._get_grant_url(resource_id, file_name)
-            resp = http.get(path)
-            token = _S3STSToken.parse_obj(resp)
-            _s3_sts_tokens[session_key] = token
-        return _s3_sts_tokens[session_key]
+    # pylint: disable=too-many-arguments
+    def download_fileobj(
+        self,
+        resource_id: str,
+        remote_file_name: str,
+        fileobj,
+        log_error=True,
+        use_cache: bool = True,
+        priority: TransferPriority = None,
+    ):
+        """
+        Download a file from s3 into a writable binary file object, e.g. io.BytesIO, without
+        writing a local file. Meant for small files, no progress bar is shown.
+        :param resource_id:
+        :param remote_file_name: file name with path in s3
+        :param fileobj: writable binary file object, seekable when use_cache is True. The
+        content of a seekable file object is checked against the checksum of the object
+        :param use_cache: if True read the file from the local download cache when the cached
+        copy has the same ETag and size, and store the downloaded file in the cache
+        :param priority: priority class of the download in the transfer scheduler, by default
+        interactive for small files
+        :return:
+        """
+
+        token, meta_data = self._head_object(resource_id, remote_file_name, log_error)
+        size = meta_data.get("ContentLength", 0)
+        e_tag = meta_data.get("ETag")
+        if use_cache and download_cache.get(resource_id, remote_file_name, e_tag, size, fileobj):
+            return
+        start = fileobj.tell() if _seekable(fileobj) else None
+        if priority is None:
+            priority = TransferPriority.for_size(size)
+        with transfer_scheduler.transfer(priority):
+            token.get_client().download_fileobj(
+                Bucket=token.get_bucket(),
+                Key=token.get_s3_key(),
+                Fileobj=fileobj,
+                Callback=transfer_scheduler.throttled_callback(None, priority),
+                Config=_s3_download_config,
+            )
+        if start is not None:
+            fileobj.seek(start)
+            verify_download(meta_data, fileobj, remote_file_name)
+        if use_cache:
+            download_cache.put(resource_id, remote_file_name, e_tag, size, fileobj)
+
+    # pylint: disable=too-many-arguments
+    def open_stream(
+        self,
+        resource_id: str,
+        remote_file_name: str,
+        log_error=True,
+        use_cache: bool = True,
+        priority: TransferPriority = None,
+    ):
+        """
+        Open a file on s3 as a readable binary stream, without writing a local file.
+        :param resource_id:
+        :param remote_file_name: file name with path in s3
+        :param use_cache: if True read the file from the local download cache when the cached
+        copy has the same ETag and size
+        :param priority: priority class of the download in the transfer scheduler, by default
+        interactive for small files
+        :return: (stream, size), the stream has to be closed by the caller
+        """
+
+        token, meta_data = self._head_object(resource_id, remote_file_name, log_error)
+        size = meta_data.get("ContentLength", 0)
+        e_tag = meta_data.get("ETag")
+        if use_cache:
+            cached = download_cache.open(resource_id, remote_file_name, e_tag, size)
+            if cached is not None:
+                return cached, size
+        # botocore checks the body against the full object checksum while it is read
+        response = token.get_client().get_object(
+            Bucket=token.get_bucket(), Key=token.get_s3_key(), IfMatch=e_tag, ChecksumMode="ENABLED"
+        )
+        if priority is None:
+            priority = TransferPriority.for_size(size)
+        return transfer_scheduler.stream(response["Body"], priority), size
+
+    def _get_s3_sts_token(
+        self, resource_id: str, file_name: str, shared: bool = False
+    ) -> _S3STSToken:
+        return _s3_credentials.get_token(self, resource_id, file_name, shared=shared)
 
 
-_s3_sts_tokens: [str, _S3STSToken] = {}
+_s3_credentials = _S3CredentialManager()
+_s3_clients = {}
+_s3_clients_lock = threading.Lock()
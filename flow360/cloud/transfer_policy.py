@@ -0,0 +1,154 @@
+"""
+Part size and concurrency policy for multipart transfers.
+
+The initial part size is chosen from the size of the file, so that any file stays well
+under the S3 limit of 10,000 parts. While a transfer runs, the part size is adjusted from
+the measured duration of every part (small parts on a fast link are dominated by per-request
+latency, large parts on a slow link make retries expensive) and the number of concurrent
+parts climbs the measured throughput curve until adding workers stops paying off.
+"""
+
+import math
+import threading
+import time
+
+from boto3.s3.transfer import TransferConfig
+
+MB = 1024 * 1024
+
+# S3 multipart upload limits
+S3_MAX_PARTS = 10000
+S3_MIN_PART_SIZE = 5 * MB
+S3_MAX_PART_SIZE = 5 * 1024 * MB
+
+# Default part size of files small enough to stay under _TARGET_PARTS parts
+DEFAULT_PART_SIZE = 16 * MB
+# Number of parts the initial part size aims for on large files
+_TARGET_PARTS = 1000
+# Parts are never made smaller than needed to stay under this number of parts
+_MAX_PARTS = S3_MAX_PARTS // 2
+# Largest part size the adjustment grows to, parts are held in memory until uploaded
+_MAX_ADAPTIVE_PART_SIZE = 64 * MB
+
+
+def _round_up(size: int, multiple: int = MB) -> int:
+    return math.ceil(size / multiple) * multiple
+
+
+def part_size_for(file_size: int, default: int = DEFAULT_PART_SIZE) -> int:
+    """
+    Initial part size of a file: default, or larger when the file would need more than
+    _TARGET_PARTS parts of that size.
+    """
+    size = max(default, _round_up(math.ceil(file_size / _TARGET_PARTS)), S3_MIN_PART_SIZE)
+    return min(size, S3_MAX_PART_SIZE)
+
+
+def min_part_size_for(file_size: int) -> int:
+    """smallest part size which keeps the file under _MAX_PARTS parts"""
+    return max(S3_MIN_PART_SIZE, _round_up(math.ceil(file_size / _MAX_PARTS)))
+
+
+def transfer_config(file_size: int, max_concurrency: int = 16) -> TransferConfig:
+    """boto3 transfer configuration for uploading a file of file_size bytes"""
+    part_size = part_size_for(file_size)
+    return TransferConfig(
+        multipart_threshold=part_size,
+        multipart_chunksize=part_size,
+        max_concurrency=max_concurrency,
+        use_threads=True,
+    )
+
+
+# pylint: disable=too-many-instance-attributes
+class AdaptiveTransferPolicy:
+    """
+    Part size and concurrency of a multipart transfer, adjusted from completed parts.
+
+    record() is called with the size and duration of every completed part, from any thread.
+    The part size is doubled while parts complete in under a quarter of
+    target_part_seconds and halved while they take more than twice as long, within
+    [min_part_size_for(file_size), 64 MB]. The concurrency is changed by one step after
+    every window of completed parts, keeping the direction while the aggregate throughput
+    improves by more than 5 % and reversing it otherwise.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        file_size: int,
+        part_size: int = None,
+        min_concurrency: int = 2,
+        max_concurrency: int = 16,
+        initial_concurrency: int = 4,
+        target_part_seconds: float = 5.0,
+    ):
+        self._min_part_size = min_part_size_for(file_size)
+        self._max_part_size = max(_MAX_ADAPTIVE_PART_SIZE, self._min_part_size)
+        if part_size is None:
+            part_size = part_size_for(file_size)
+        self._part_size = min(max(part_size, self._min_part_size), self._max_part_size)
+        self._min_concurrency = max(min_concurrency, 1)
+        self._max_concurrency = max(max_concurrency, self._min_concurrency)
+        self._concurrency = min(
+            max(initial_concurrency, self._min_concurrency), self._max_concurrency
+        )
+        self._target_part_seconds = target_part_seconds
+        self._lock = threading.Lock()
+        self._part_seconds = None
+        self._direction = 1
+        self._last_throughput = None
+        self._window_start = None
+        self._window_bytes = 0
+        self._window_parts = 0
+
+    @property
+    def part_size(self) -> int:
+        """size of the next part"""
+        return self._part_size
+
+    @property
+    def concurrency(self) -> int:
+        """number of parts to transfer at the same time"""
+        return self._concurrency
+
+    def start(self):
+        """mark the start of the transfer, the first throughput window begins here"""
+        with self._lock:
+            if self._window_start is None:
+                self._window_start = time.monotonic()
+
+    def record(self, size: int, seconds: float):
+        """record a completed part of size bytes which took seconds to transfer"""
+        with self._lock:
+            now = time.monotonic()
+            if self._window_start is None:
+                self._window_start = now - seconds
+            self._part_seconds = (
+                seconds if self._part_seconds is None else 0.7 * self._part_seconds + 0.3 * seconds
+            )
+            self._adjust_part_size()
+
+            self._window_bytes += size
+            self._window_parts += 1
+            if self._window_parts >= max(self._concurrency, 4):
+                elapsed = max(now - self._window_start, 1e-6)
+                self._adjust_concurrency(self._window_bytes / elapsed)
+                self._window_start = now
+                self._window_bytes = 0
+                self._window_parts = 0
+
+    def _adjust_part_size(self):
+        if self._part_seconds < self._target_part_seconds / 4:
+            self._part_size = min(2 * self._part_size, self._max_part_size)
+        elif self._part_seconds > self._target_part_seconds * 2:
+            self._part_size = max(self._part_size // 2, self._min_part_size)
+
+    def _adjust_concurrency(self, throughput: float):
+        if self._last_throughput is not None and throughput <= 1.05 * self._last_throughput:
+            self._direction = -self._direction
+        self._last_throughput = throughput
+        self._concurrency = min(
+            max(self._concurrency + self._direction, self._min_concurrency),
+            self._max_concurrency,
+        )
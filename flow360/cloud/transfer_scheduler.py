@@ -0,0 +1,183 @@
+"""
+Process-wide scheduling of S3 transfers.
+
+All transfers in s3_utils pass the bytes they send or receive through one scheduler,
+which applies a global bandwidth cap (UserConfig.max_bandwidth_mb) shared by uploads and
+downloads, and gives interactive transfers precedence over bulk ones: while an interactive
+transfer is in progress, bulk transfers pause between chunks, so a small result file is
+fetched with low latency even when a mesh upload and large archive downloads saturate
+the link.
+
+The cap is a token bucket: every chunk takes its size from the bucket, which refills at
+the cap rate, and the caller sleeps off any deficit. Interactive chunks never wait for
+the deficit left by bulk chunks, the bulk transfers pay it back instead.
+"""
+
+import contextlib
+import io
+import threading
+import time
+from enum import Enum
+
+from ..user_config import UserConfig
+
+# objects up to this size are downloaded as interactive transfers by default
+INTERACTIVE_SIZE = 16 * 1024 * 1024
+# longest pause of a bulk chunk for interactive transfers, so bulk transfers never starve
+_BULK_YIELD = 0.5
+# the bucket holds at most this many seconds of transfer at the cap rate
+_BURST_SECONDS = 0.25
+
+
+class TransferPriority(Enum):
+    """
+    Priority class of a transfer
+    """
+
+    INTERACTIVE = "interactive"
+    BULK = "bulk"
+
+    @classmethod
+    def for_size(cls, size: int) -> "TransferPriority":
+        """interactive for small objects, bulk for large ones"""
+        return cls.INTERACTIVE if size <= INTERACTIVE_SIZE else cls.BULK
+
+
+class _ThrottledBody(io.BytesIO):
+    """request body passing every read through the scheduler, bytes read again after a
+    seek (checksum computation, retries) are only charged the first time"""
+
+    def __init__(self, data, scheduler: "TransferScheduler", priority: TransferPriority):
+        super().__init__(data)
+        self._scheduler = scheduler
+        self._priority = priority
+        self._charged = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        position = self.tell()
+        if position > self._charged:
+            self._scheduler.throttle(position - self._charged, self._priority)
+            self._charged = position
+        return data
+
+
+class _ThrottledStream(io.RawIOBase):
+    """response stream passing every read through the scheduler, an interactive stream
+    counts as an interactive transfer until it is closed"""
+
+    def __init__(self, stream, scheduler: "TransferScheduler", priority: TransferPriority):
+        super().__init__()
+        self._stream = stream
+        self._scheduler = scheduler
+        self._priority = priority
+        scheduler.start_transfer(priority)
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        data = self._stream.read(size)
+        self._scheduler.throttle(len(data), self._priority)
+        return data
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            self._scheduler.end_transfer(self._priority)
+            self._stream.close()
+        super().close()
+
+
+class TransferScheduler:
+    """
+    Bandwidth cap and priority classes shared by all S3 transfers of the process.
+    """
+
+    def __init__(self, max_bandwidth: float = None):
+        self._max_bandwidth = max_bandwidth
+        self._condition = threading.Condition()
+        self._interactive = 0
+        self._tokens = 0.0
+        self._time = time.monotonic()
+
+    @property
+    def max_bandwidth(self) -> float:
+        """bandwidth cap in bytes per second, 0 when transfers are not capped"""
+        if self._max_bandwidth is not None:
+            return self._max_bandwidth
+        return (UserConfig.max_bandwidth_mb or 0) * 1024 * 1024
+
+    @max_bandwidth.setter
+    def max_bandwidth(self, value: float):
+        """set the bandwidth cap in bytes per second, None restores the configured value"""
+        self._max_bandwidth = value
+
+    def start_transfer(self, priority: TransferPriority):
+        """register a transfer, bulk transfers yield while interactive ones are registered"""
+        if priority is TransferPriority.INTERACTIVE:
+            with self._condition:
+                self._interactive += 1
+
+    def end_transfer(self, priority: TransferPriority):
+        """unregister a transfer registered with start_transfer"""
+        if priority is TransferPriority.INTERACTIVE:
+            with self._condition:
+                self._interactive -= 1
+                self._condition.notify_all()
+
+    @contextlib.contextmanager
+    def transfer(self, priority: TransferPriority):
+        """context of a transfer, see start_transfer"""
+        self.start_transfer(priority)
+        try:
+            yield
+        finally:
+            self.end_transfer(priority)
+
+    def throttle(self, size: int, priority: TransferPriority):
+        """
+        Account for size bytes sent or received, blocking the caller as long as needed to
+        keep all transfers under the bandwidth cap and behind interactive transfers.
+        """
+        rate = self.max_bandwidth
+        if priority is TransferPriority.BULK:
+            with self._condition:
+                self._condition.wait_for(lambda: self._interactive == 0, timeout=_BULK_YIELD)
+        if rate <= 0 or size <= 0:
+            return
+        with self._condition:
+            now = time.monotonic()
+            self._tokens = min(self._tokens + (now - self._time) * rate, rate * _BURST_SECONDS)
+            self._time = now
+            self._tokens -= size
+            deficit = -self._tokens
+        if priority is TransferPriority.INTERACTIVE:
+            deficit = min(deficit, size)
+        if deficit > 0:
+            time.sleep(deficit / rate)
+
+    def throttled_callback(self, callback, priority: TransferPriority):
+        """progress callback of boto3 transfers throttling the transfer thread calling it"""
+
+        def _callback(size):
+            self.throttle(size, priority)
+            if callback is not None:
+                callback(size)
+
+        return _callback
+
+    def body(self, data, priority: TransferPriority = TransferPriority.BULK) -> io.BytesIO:
+        """seekable request body of data sent through the scheduler"""
+        return _ThrottledBody(data, self, priority)
+
+    def stream(self, stream, priority: TransferPriority) -> io.RawIOBase:
+        """readable response stream received through the scheduler"""
+        return _ThrottledStream(stream, self, priority)
+
+
+transfer_scheduler = TransferScheduler()
@@ -0,0 +1,191 @@
+"""
+On-disk journal for resumable multipart uploads.
+
+A journal is written under ~/.flow360/uploads for every multipart upload. It records the
+resource id, upload id and, for every dispatched part, its offset, length and, once
+uploaded, its ETag, size and checksum. An interrupted upload can then be resumed by
+re-uploading only the missing parts.
+"""
+
+import hashlib
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import pydantic as pd
+import zstandard as zstd
+
+from ..file_path import flow360_dir
+from ..log import log
+
+journal_dir = os.path.join(flow360_dir, "uploads")
+
+
+class UploadedPart(pd.BaseModel):
+    """
+    A single part of a multipart upload.
+
+    offset and length describe the range of the source stream the part was built from,
+    e_tag, size and checksum (the uploaded size and CRC32) are set once S3 acknowledged the
+    part. frames lists the (compressed size, input size) of the independently compressed
+    frames of the part, when the format needs them.
+    """
+
+    offset: int
+    length: int
+    e_tag: Optional[str] = None
+    size: Optional[int] = None
+    checksum: Optional[str] = None
+    frames: Optional[List[Tuple[int, int]]] = None
+
+
+class UploadJournal(pd.BaseModel):
+    """
+    Journal of a multipart upload of a local file to a cloud resource. checksums is False
+    for uploads started without CRC32 checksums, which cannot be added on resume.
+    zstd_level and zstd_multithreaded record how a zstd stream is compressed, so a resumed
+    upload produces the same bytes: zstd output is identical for any number of worker
+    threads, but differs from the output of single-threaded compression. zstd_version is
+    the version of the zstd library the upload was started with, other versions may
+    compress the same input to different bytes.
+    """
+
+    resource_id: str
+    remote_file_name: str
+    upload_id: str
+    file_name: str
+    file_size: int
+    file_mtime: float
+    chunk_length: int
+    seekable: bool = False
+    checksums: bool = False
+    zstd_level: int = 3
+    zstd_multithreaded: bool = False
+    zstd_version: Optional[Tuple[int, int, int]] = None
+    parts: Dict[int, UploadedPart] = pd.Field(default_factory=dict)
+
+    _lock: threading.Lock = pd.PrivateAttr(default_factory=threading.Lock)
+
+    @staticmethod
+    def _path(file_name: str, remote_file_name: str) -> str:
+        key = f"{os.path.abspath(file_name)}:{remote_file_name}"
+        return os.path.join(journal_dir, hashlib.sha1(key.encode()).hexdigest() + ".json")
+
+    @property
+    def path(self) -> str:
+        """path of the journal file"""
+        return self._path(self.file_name, self.remote_file_name)
+
+    # pylint: disable=too-many-arguments
+    @classmethod
+    def create(
+        cls,
+        resource_id: str,
+        remote_file_name: str,
+        upload_id: str,
+        file_name: str,
+        chunk_length: int,
+        seekable: bool = False,
+        zstd_level: int = 3,
+        zstd_multithreaded: bool = False,
+    ):
+        """
+        create and save a new journal for the upload of file_name, seekable records that
+        the file is uploaded in the seekable zstd format
+        """
+        stat = os.stat(file_name)
+        journal = cls(
+            resource_id=resource_id,
+            remote_file_name=remote_file_name,
+            upload_id=upload_id,
+            file_name=os.path.abspath(file_name),
+            file_size=stat.st_size,
+            file_mtime=stat.st_mtime,
+            chunk_length=chunk_length,
+            seekable=seekable,
+            checksums=True,
+            zstd_level=zstd_level,
+            zstd_multithreaded=zstd_multithreaded,
+            zstd_version=zstd.ZSTD_VERSION,
+        )
+        journal.save()
+        return journal
+
+    @classmethod
+    def find(cls, file_name: str, remote_file_name: str):
+        """
+        Find the journal of an unfinished upload of file_name.
+
+        Returns None when there is no journal or when the local file changed since the
+        upload started.
+        """
+        path = cls._path(file_name, remote_file_name)
+        if not os.path.exists(path):
+            return None
+        try:
+            journal = cls.parse_file(path)
+        except (pd.ValidationError, ValueError) as error:
+            log.warning(f"Ignoring unreadable upload journal {path}: {error}")
+            return None
+        stat = os.stat(file_name)
+        if journal.file_size != stat.st_size or journal.file_mtime != stat.st_mtime:
+            log.warning(f"{file_name} changed since the interrupted upload, starting over.")
+            journal.delete()
+            return None
+        return journal
+
+    def zstd_version_matches(self) -> bool:
+        """whether the upload was started with the installed version of the zstd library"""
+        return self.zstd_version == tuple(zstd.ZSTD_VERSION)
+
+    def save(self):
+        """write the journal to disk atomically"""
+        os.makedirs(journal_dir, exist_ok=True)
+        tmp_path = f"{self.path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            file.write(self.json())
+        os.replace(tmp_path, self.path)
+
+    def delete(self):
+        """remove the journal from disk"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def add_part(
+        self, part_number: int, offset: int, length: int, frames: List[Tuple[int, int]] = None
+    ):
+        """record a part that is about to be uploaded"""
+        with self._lock:
+            previous = self.parts.get(part_number)
+            if previous is not None and (previous.offset, previous.length, previous.frames) == (
+                offset,
+                length,
+                frames,
+            ):
+                return
+            self.parts[part_number] = UploadedPart(offset=offset, length=length, frames=frames)
+            self.save()
+
+    def set_uploaded(self, part_number: int, e_tag: str, size: int = None, checksum: str = None):
+        """record that a part has been uploaded"""
+        with self._lock:
+            part = self.parts[part_number]
+            part.e_tag = e_tag
+            part.size = size
+            part.checksum = checksum
+            self.save()
+
+    def uploaded_part(self, part_number: int, offset: int, length: int = None):
+        """
+        Return the upload result of part_number if it was already uploaded from the same
+        range of the source, otherwise None.
+        """
+        part = self.parts.get(part_number)
+        if part is None or part.e_tag is None or part.offset != offset:
+            return None
+        if length is not None and part.length != length:
+            return None
+        result = {"ETag": part.e_tag, "PartNumber": part_number}
+        if part.checksum is not None:
+            result["ChecksumCRC32"] = part.checksum
+        return result
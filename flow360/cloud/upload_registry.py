@@ -0,0 +1,120 @@
+"""
+Local registry of uploaded files for upload deduplication.
+
+The registry in ~/.flow360/upload_registry.json maps the content hash of an uploaded file,
+together with the resource type, solver version and parameters it was submitted with, to
+the id of the created resource. Content hashes of local files are indexed by path, size
+and modification time, so resubmitting an unchanged file does not read it again.
+"""
+
+import hashlib
+import os
+import threading
+from typing import Dict, Optional
+
+import pydantic as pd
+
+from ..file_path import flow360_dir
+from ..log import log
+
+registry_file = os.path.join(flow360_dir, "upload_registry.json")
+
+_READ_SIZE = 16 * 1024 * 1024
+
+
+def new_content_hasher():
+    """hash object used for content hashes, update it with the content of a file"""
+    return hashlib.sha256()
+
+
+def hash_file(file_name: str) -> str:
+    """content hash of a file"""
+    hasher = new_content_hasher()
+    with open(file_name, "rb") as file:
+        for data in iter(lambda: file.read(_READ_SIZE), b""):
+            hasher.update(data)
+    return hasher.hexdigest()
+
+
+class _FileRecord(pd.BaseModel):
+    size: int
+    mtime: float
+    content_hash: str
+
+
+class UploadRegistry(pd.BaseModel):
+    """
+    Registry of uploaded files and the resources created from them.
+    """
+
+    files: Dict[str, _FileRecord] = pd.Field(default_factory=dict)
+    resources: Dict[str, str] = pd.Field(default_factory=dict)
+
+    _lock: threading.Lock = pd.PrivateAttr(default_factory=threading.Lock)
+
+    @classmethod
+    def load(cls):
+        """load the registry, an unreadable registry is replaced by an empty one"""
+        if os.path.exists(registry_file):
+            try:
+                return cls.parse_file(registry_file)
+            except (pd.ValidationError, ValueError) as error:
+                log.warning(f"Ignoring unreadable upload registry {registry_file}: {error}")
+        return cls()
+
+    def save(self):
+        """write the registry to disk atomically"""
+        os.makedirs(os.path.dirname(registry_file), exist_ok=True)
+        tmp_path = f"{registry_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            file.write(self.json())
+        os.replace(tmp_path, registry_file)
+
+    @staticmethod
+    def resource_key(
+        resource_type: str, content_hash: str, solver_version: str = None, params: str = None
+    ) -> str:
+        """key of a resource created from a file with the given submit arguments"""
+        key = f"{resource_type}:{content_hash}:{solver_version}:{params}"
+        return hashlib.sha1(key.encode()).hexdigest()
+
+    def content_hash(self, file_name: str) -> Optional[str]:
+        """
+        Content hash of file_name without reading it when the unchanged file is indexed.
+
+        An unindexed file is only hashed when a registered file has the same size, otherwise
+        it cannot be a duplicate and None is returned.
+        """
+        path = os.path.abspath(file_name)
+        stat = os.stat(path)
+        record = self.files.get(path)
+        if record is not None and (record.size, record.mtime) == (stat.st_size, stat.st_mtime):
+            return record.content_hash
+        if not any(record.size == stat.st_size for record in self.files.values()):
+            return None
+        content_hash = hash_file(path)
+        self.files[path] = _FileRecord(
+            size=stat.st_size, mtime=stat.st_mtime, content_hash=content_hash
+        )
+        return content_hash
+
+    def find(self, key: str) -> Optional[str]:
+        """id of the resource registered under key"""
+        return self.resources.get(key)
+
+    def register(self, file_name: str, content_hash: str, key: str, resource_id: str):
+        """record that resource_id was created from file_name"""
+        path = os.path.abspath(file_name)
+        stat = os.stat(path)
+        with self._lock:
+            self.files[path] = _FileRecord(
+                size=stat.st_size, mtime=stat.st_mtime, content_hash=content_hash
+            )
+            self.resources[key] = resource_id
+            self.save()
+
+    def forget(self, key: str):
+        """remove a resource that no longer exists"""
+        with self._lock:
+            if self.resources.pop(key, None) is not None:
+                self.save()
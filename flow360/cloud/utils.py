@@ -1,6 +1,8 @@
 """utils for cloud operations
 """
 
+import threading
+import time
 from enum import Enum
 
 from rich.progress import (
@@ -21,6 +23,7 @@ class _S3Action(Enum):
     UPLOADING = "[bold red]↑"
     DOWNLOADING = "[bold green]↓"
     COMPRESSING = "[cyan]Compressing..."
+    DECOMPRESSING = "[cyan]Decompressing..."
     NONE = ""
 
 
@@ -46,3 +49,35 @@ def _get_progress(action: _S3Action = _S3Action.NONE):
         "•",
         TimeRemainingColumn(),
     )
+
+
+class _ThrottledProgress:
+    """
+    Accumulates progress and forwards it to update(advance) at most every min_interval
+    seconds, so per-chunk progress reporting does not slow down a tight loop. Call flush()
+    when done to report the remainder.
+    """
+
+    def __init__(self, update, min_interval: float = 0.1):
+        self._update = update
+        self._min_interval = min_interval
+        self._pending = 0
+        self._last_update = time.monotonic()
+        self._lock = threading.Lock()
+
+    def __call__(self, advance: int):
+        with self._lock:
+            self._pending += advance
+            now = time.monotonic()
+            if now - self._last_update < self._min_interval:
+                return
+            advance, self._pending = self._pending, 0
+            self._last_update = now
+        self._update(advance)
+
+    def flush(self):
+        """report all accumulated progress"""
+        with self._lock:
+            advance, self._pending = self._pending, 0
+        if advance:
+            self._update(advance)
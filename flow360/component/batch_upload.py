@@ -0,0 +1,103 @@
+"""
+Concurrent upload of several files to Flow360 resources
+"""
+
+import concurrent.futures
+import os
+import threading
+from typing import List, Tuple
+
+from ..cloud.utils import _get_progress, _S3Action
+from ..log import log
+from .resource_base import Flow360Resource
+
+# (resource, remote file name, local file name)
+UploadJob = Tuple[Flow360Resource, str, str]
+
+# Default number of files uploaded at the same time
+_MAX_CONCURRENT_FILES = 8
+
+
+# pylint: disable=too-few-public-methods
+class _JobProgress:
+    """
+    Progress callback of a single upload reporting to the progress of the batch. The total
+    set by the upload is ignored, the batch total is known in advance.
+    """
+
+    def __init__(self, advance):
+        self.total = None
+        self._advance = advance
+
+    def __call__(self, bytes_chunk_transferred):
+        self._advance(bytes_chunk_transferred)
+
+
+def upload_files(
+    jobs: List[UploadJob], max_concurrent_files: int = _MAX_CONCURRENT_FILES, progress_callback=None
+):
+    """
+    Upload files to cloud resources concurrently with one aggregate progress bar.
+
+    Every job is a (resource, remote file name, local file name) tuple. Jobs run on a pool
+    of max_concurrent_files threads and share the process-wide S3 credential and client
+    caches, so a batch takes about as long as its largest file rather than the sum of all
+    files. Large files are additionally uploaded in concurrent parts.
+
+    Args:
+        jobs (list of UploadJob): The files to upload.
+        max_concurrent_files (int, optional): The number of files uploaded at the same time
+        (default is 8).
+        progress_callback (ProgressCallbackInterface, optional): Custom progress callback,
+        its total is set to the size of all files and it is called with the number of bytes
+        uploaded from any file.
+
+    Raises:
+        FileNotFoundError: If a local file does not exist, before any upload starts.
+        Exception: The first error of a failed upload, once the running uploads ended.
+    """
+
+    for _, _, file_name in jobs:
+        if not os.path.exists(file_name):
+            raise FileNotFoundError(f"file {file_name} does not Exist!")
+    if not jobs:
+        return
+    total = sum(os.path.getsize(file_name) for _, _, file_name in jobs)
+    lock = threading.Lock()
+
+    with _get_progress(_S3Action.UPLOADING) as progress:
+        if progress_callback is not None:
+            progress_callback.total = total
+
+            def advance(size):
+                with lock:
+                    progress_callback(size)
+
+        else:
+            task_id = progress.add_task("upload", filename=f"{len(jobs)} files", total=total)
+
+            def advance(size):
+                progress.update(task_id, advance=size)
+
+        failed = threading.Event()
+
+        def upload(resource, remote_file_name, file_name):
+            # no new upload starts once one failed
+            if failed.is_set():
+                return
+            try:
+                # pylint: disable=protected-access
+                resource._upload_file(
+                    remote_file_name, file_name, progress_callback=_JobProgress(advance)
+                )
+            except BaseException:
+                failed.set()
+                raise
+            log.debug(f"Uploaded {file_name} to {remote_file_name} of {resource.id}")
+
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(1, min(max_concurrent_files, len(jobs)))
+        ) as executor:
+            futures = [executor.submit(upload, *job) for job in jobs]
+            for future in futures:
+                future.result()
@@ -2,9 +2,11 @@
 Case component
 """
 
+# pylint: disable=too-many-lines
 from __future__ import annotations
 
 import json
+import os
 import tempfile
 import time
 from typing import Any, Iterator, List, Union
@@ -12,6 +14,7 @@ from typing import Any, Iterator, List, Union
 import pydantic as pd
 
 from .. import error_messages
+from ..cloud.metadata_cache import metadata_cache
 from ..cloud.requests import MoveCaseItem, MoveToFolderRequest
 from ..cloud.rest_api import RestApi
 from ..exceptions import Flow360RuntimeError, Flow360ValidationError, Flow360ValueError
@@ -47,6 +50,7 @@ from .results.case_results import (
     SurfaceHeatTrasferResultCSVModel,
     TotalForcesResultCSVModel,
     UserDefinedDynamicsResultModel,
+    _download_results,
 )
 from .utils import is_valid_uuid, shared_account_confirm_proceed, validate_type
 from .validator import Validator
@@ -551,6 +555,8 @@ class Case(CaseBase, Flow360Resource):
             MoveToFolderRequest(dest_folder_id=folder.id, items=[MoveCaseItem(id=self.id)]).dict(),
             method="move",
         )
+        # the metadata records the parent folder
+        metadata_cache.invalidate(self._metadata_key)
         return self
 
     @classmethod
@@ -636,6 +642,29 @@ class Case(CaseBase, Flow360Resource):
             time.sleep(2)
 
 
+# download() argument -> CaseResultsModel field
+_RESULT_FIELDS = {
+    "surface": "surfaces",
+    "volume": "volumes",
+    "slices": "slices",
+    "isosurfaces": "isosurfaces",
+    "monitors": "monitors",
+    "nonlinear_residuals": "nonlinear_residuals",
+    "linear_residuals": "linear_residuals",
+    "cfl": "cfl",
+    "minmax_state": "minmax_state",
+    "max_residual_location": "max_residual_location",
+    "surface_forces": "surface_forces",
+    "total_forces": "total_forces",
+    "bet_forces": "bet_forces",
+    "actuator_disks": "actuator_disks",
+    "force_distribution": "force_distribution",
+    "user_defined_dynamics": "user_defined_dynamics",
+    "aeroacoustics": "aeroacoustics",
+    "surface_heat_transfer": "surface_heat_transfer",
+}
+
+
 # pylint: disable=unnecessary-lambda
 class CaseResultsModel(pd.BaseModel):
     """
@@ -725,6 +754,8 @@ class CaseResultsModel(pd.BaseModel):
                 value = values[field.name]
                 if isinstance(value, ResultBaseModel):
                     value._download_method = values["case"]._download_file
+                    value._download_fileobj_method = values["case"]._download_fileobj
+                    value._open_stream_method = values["case"]._open_download_stream
                     value._get_params_method = lambda: values["case"].params
 
                     values[field.name] = value
@@ -794,11 +825,12 @@ class CaseResultsModel(pd.BaseModel):
         value._is_downloadable = values["case"].has_user_defined_dynamics
         return value
 
-    def _execute_downloading(self):
+    def _download_tasks(self):
         """
-        Download all specified and available results for the case
+        Downloads of all specified and available results for the case
         """
-        for _, value in self.__dict__.items():
+        tasks = []
+        for name, value in self.__dict__.items():
             if isinstance(value, ResultBaseModel):
                 # we download if explicitly set set_downloader(<result_name>=True),
                 # or all=True but only when is not result=False
@@ -806,10 +838,48 @@ class CaseResultsModel(pd.BaseModel):
                 if self._downloader_settings.all is True and value.do_download is not False:
                     try_download = value._is_downloadable() is True
                 if try_download is True:
-                    value.download(
-                        to_folder=self._downloader_settings.destination,
-                        overwrite=self._downloader_settings.overwrite,
-                    )
+                    tasks.append((f"{name} of case {self.case.id}", self._download_task(value)))
+        return tasks
+
+    def _download_task(self, value: ResultBaseModel):
+        destination = self._downloader_settings.destination
+        overwrite = self._downloader_settings.overwrite
+
+        def download(progress_callback):
+            value.download(
+                to_folder=destination, overwrite=overwrite, progress_callback=progress_callback
+            )
+
+        return download
+
+    def _execute_downloading(self):
+        """
+        Download all specified and available results for the case
+        """
+        _download_results(self._download_tasks(), self._downloader_settings.max_workers)
+
+    # pylint: disable=redefined-builtin
+    def _set_downloader(
+        self,
+        all: bool = None,
+        overwrite: Union[bool, str] = False,
+        destination: str = None,
+        **results,
+    ):
+        """
+        Set which results are downloaded by the next _execute_downloading()
+        """
+        for result_name, field_name in _RESULT_FIELDS.items():
+            getattr(self, field_name).do_download = results.pop(result_name, None)
+        if len(results) > 0:
+            raise Flow360ValueError(
+                f"Unknown results: {list(results)}, available results: {list(_RESULT_FIELDS)}"
+            )
+
+        self._downloader_settings.all = all
+        self._downloader_settings.overwrite = overwrite
+        if destination is not None:
+            self.set_destination(folder_name=destination)
 
     def set_destination(
         self, folder_name: str = None, use_case_name: bool = None, use_case_id: bool = None
@@ -865,11 +935,12 @@ class CaseResultsModel(pd.BaseModel):
         aeroacoustics: bool = None,
         surface_heat_transfer: bool = None,
         all: bool = None,
-        overwrite: bool = False,
+        overwrite: Union[bool, str] = False,
         destination: str = None,
+        max_workers: int = None,
     ):
         """
-        Download result files associated with the case.
+        Download result files associated with the case. Files are downloaded concurrently.
 
         Parameters
         ----------
@@ -895,38 +966,41 @@ class CaseResultsModel(pd.BaseModel):
             Download actuator disk output file if True.
         all : bool, optional
             Download all result files if True. Ignore file if explicitly set: <result_name>=False
-        overwrite : bool, optional
+        overwrite : bool or "if-changed", optional
             If True, overwrite existing files with the same name in the destination.
+            If "if-changed", overwrite only files whose remote object changed since they were
+            downloaded, which makes re-syncing a results folder cheap.
         destination : str, optional
             Location to save downloaded files. If None, files will be saved in the current directory under ID folder.
-        """
-
-        self.surfaces.do_download = surface
-        self.volumes.do_download = volume
-        self.slices.do_download = slices
-        self.isosurfaces.do_download = isosurfaces
-        self.monitors.do_download = monitors
-
-        self.nonlinear_residuals.do_download = nonlinear_residuals
-        self.linear_residuals.do_download = linear_residuals
-        self.cfl.do_download = cfl
-        self.minmax_state.do_download = minmax_state
-        self.max_residual_location.do_download = max_residual_location
-
-        self.surface_forces.do_download = surface_forces
-        self.total_forces.do_download = total_forces
-        self.bet_forces.do_download = bet_forces
-        self.actuator_disks.do_download = actuator_disks
-        self.force_distribution.do_download = force_distribution
-
-        self.user_defined_dynamics.do_download = user_defined_dynamics
-        self.aeroacoustics.do_download = aeroacoustics
-        self.surface_heat_transfer.do_download = surface_heat_transfer
-
-        self._downloader_settings.all = all
-        self._downloader_settings.overwrite = overwrite
-        if destination is not None:
-            self.set_destination(folder_name=destination)
+        max_workers : int, optional
+            Number of files downloaded concurrently, 8 by default.
+        """
+
+        self._set_downloader(
+            surface=surface,
+            volume=volume,
+            slices=slices,
+            isosurfaces=isosurfaces,
+            monitors=monitors,
+            nonlinear_residuals=nonlinear_residuals,
+            linear_residuals=linear_residuals,
+            cfl=cfl,
+            minmax_state=minmax_state,
+            max_residual_location=max_residual_location,
+            surface_forces=surface_forces,
+            total_forces=total_forces,
+            bet_forces=bet_forces,
+            actuator_disks=actuator_disks,
+            force_distribution=force_distribution,
+            user_defined_dynamics=user_defined_dynamics,
+            aeroacoustics=aeroacoustics,
+            surface_heat_transfer=surface_heat_transfer,
+            all=all,
+            overwrite=overwrite,
+            destination=destination,
+        )
+        if max_workers is not None:
+            self._downloader_settings.max_workers = max_workers
 
         self._execute_downloading()
 
@@ -939,6 +1013,36 @@ class CaseResultsModel(pd.BaseModel):
         )
 
 
+# pylint: disable=protected-access
+def download_results(cases: List[Case], destination: str = ".", max_workers: int = 8, **results):
+    """
+    Download results of many cases at once. Files of all cases are downloaded concurrently
+    through one worker pool, results of each case are saved in a folder named by the case id.
+
+    Parameters
+    ----------
+    cases : List[Case]
+        Cases to download results of.
+    destination : str, optional
+        Folder in which the case folders are created.
+    max_workers : int, optional
+        Number of files downloaded concurrently.
+    **results :
+        Results to download, the same arguments as CaseResultsModel.download(),
+        for example total_forces=True or all=True.
+
+    Example
+    -------
+    >>> download_results(cases, total_forces=True, surface_forces=True) # doctest: +SKIP
+    """
+
+    tasks = []
+    for case in cases:
+        case.results._set_downloader(destination=os.path.join(destination, case.id), **results)
+        tasks += case.results._download_tasks()
+    _download_results(tasks, max_workers)
+
+
 class CaseList(Flow360ResourceListBase):
     """
     Case List component
@@ -971,3 +1075,9 @@ class CaseList(Flow360ResourceListBase):
 
     def __iter__(self) -> Iterator[Case]:
         return super().__iter__()
+
+    def download_results(self, destination: str = ".", max_workers: int = 8, **results):
+        """
+        Download results of all cases in the list, see download_results()
+        """
+        download_results(self, destination=destination, max_workers=max_workers, **results)
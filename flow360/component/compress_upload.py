@@ -3,26 +3,370 @@ Parallel Compress and Multiupload Flow360Resource to S3
 """
 
 import bz2
+import collections
 import concurrent.futures
+import functools
 import os
+import threading
+import time
+import zlib
+
+import zstandard as zstd
 
 from flow360.component.resource_base import Flow360Resource
 
-from ..cloud.utils import _get_progress, _S3Action
+from ..cloud.checksum import combine_checksums, encode_crc32
+from ..cloud.transfer_policy import AdaptiveTransferPolicy
+from ..cloud.upload_journal import UploadJournal
+from ..cloud.utils import _get_progress, _S3Action, _ThrottledProgress
+from ..exceptions import Flow360RuntimeError
+from .seekable_zstd import MAX_FRAME_SIZE, compress_frame, seek_table
+from .utils import validate_zstd_level
 
+# S3 requires all parts of a multipart upload, except the last one, to be at least 5 MB
+_MIN_UPLOAD_SIZE = 5 * 1024 * 1024
+# Default size of the chunks read from the input file
+_CHUNK_LENGTH = 25 * 1024 * 1024
+# Default number of compressed parts allowed to wait for (or be in) upload at the same time
+_MAX_QUEUED_PARTS = 16
 
-# pylint: disable=too-many-arguments, too-many-locals
+
+def _read_chunks(file, chunk_length: int, length: int = None):
+    remaining = length
+    while remaining is None or remaining > 0:
+        size = chunk_length if remaining is None else min(chunk_length, remaining)
+        chunk_data = file.read(size)
+        if not chunk_data:
+            return
+        if remaining is not None:
+            remaining -= len(chunk_data)
+        yield chunk_data
+
+
+def _hashed(chunks, hasher):
+    for chunk_data in chunks:
+        hasher.update(chunk_data)
+        yield chunk_data
+
+
+def _compress_in_order(executor, chunks, compress, max_pending: int):
+    """
+    Compress chunks concurrently on the executor and yield results in input order.
+
+    At most max_pending chunks are read ahead of the consumer, so memory use is bounded
+    regardless of the file size.
+    """
+    pending = collections.deque()
+    for chunk_data in chunks:
+        pending.append((len(chunk_data), executor.submit(compress, chunk_data)))
+        if len(pending) >= max_pending:
+            size, future = pending.popleft()
+            yield size, future.result()
+    while pending:
+        size, future = pending.popleft()
+        yield size, future.result()
+
+
+# pylint: disable=too-many-instance-attributes
+class _PartUploader:
+    """
+    Uploads the parts of a multipart upload on an executor.
+
+    Parts are numbered in submission order. submit() blocks the caller once
+    max_queued_parts parts are queued or uploading, which keeps peak memory at roughly
+    max_queued_parts * part size when the network is slower than compression. With a
+    policy, the limit is the lower of max_queued_parts and the policy concurrency, and the
+    size and duration of every uploaded part is reported to the policy. When a journal is
+    given, every part is recorded in it so an interrupted upload can be resumed.
+
+    The CRC32 of every part is computed on the upload thread from the data in memory and
+    sent with the part; the checksum of the whole object is combined from the part
+    checksums on completion. Uploads resumed from a journal without checksums send none.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        executor,
+        remote_resource: Flow360Resource,
+        remote_file_name: str,
+        upload_id: str,
+        max_queued_parts: int,
+        journal: UploadJournal = None,
+        on_upload=None,
+        policy: AdaptiveTransferPolicy = None,
+    ):
+        self._executor = executor
+        self._remote_resource = remote_resource
+        self._remote_file_name = remote_file_name
+        self._upload_id = upload_id
+        self._max_queued_parts = max(max_queued_parts, 1)
+        self._queued_parts = 0
+        self._slots = threading.Condition()
+        self._journal = journal
+        self._on_upload = on_upload
+        self._policy = policy
+        self._futures = []
+        self._checksums = journal is None or journal.checksums
+        if policy is not None:
+            policy.start()
+
+    def _has_free_slot(self) -> bool:
+        limit = self._max_queued_parts
+        if self._policy is not None:
+            limit = min(limit, self._policy.concurrency)
+        return self._queued_parts < limit
+
+    def _release_slot(self):
+        with self._slots:
+            self._queued_parts -= 1
+            self._slots.notify_all()
+
+    @property
+    def next_part_number(self) -> int:
+        """number of the next part to be submitted"""
+        return len(self._futures) + 1
+
+    def skip_uploaded(self, offset: int, length: int = None) -> bool:
+        """
+        Skip the next part if the journal says it was already uploaded from the same range.
+        """
+        if self._journal is None:
+            return False
+        part_number = self.next_part_number
+        result = self._journal.uploaded_part(part_number, offset, length)
+        if result is None:
+            return False
+        future = concurrent.futures.Future()
+        future.set_result((result, self._journal.parts[part_number].size))
+        self._futures.append(future)
+        return True
+
+    def submit(self, data, offset: int, length: int, frames=None):
+        """
+        Submit data as the next part. offset and length describe the range of the source
+        the part was built from, frames the sizes of the frames in the part; they are only
+        used for the journal.
+        """
+        part_number = self.next_part_number
+        if self._journal is not None:
+            self._journal.add_part(part_number, offset, length, frames)
+        with self._slots:
+            self._slots.wait_for(self._has_free_slot)
+            self._queued_parts += 1
+        try:
+            future = self._executor.submit(self._upload_part, part_number, data)
+        except BaseException:
+            self._release_slot()
+            raise
+        future.add_done_callback(lambda _: self._release_slot())
+        self._futures.append(future)
+
+    def _upload_part(self, part_number, data):
+        checksum = encode_crc32(zlib.crc32(data)) if self._checksums else None
+        start = time.monotonic()
+        result = self._remote_resource.upload_part(
+            self._remote_file_name, self._upload_id, part_number, data, checksum=checksum
+        )
+        if self._policy is not None:
+            self._policy.record(len(data), time.monotonic() - start)
+        if self._journal is not None:
+            self._journal.set_uploaded(part_number, result["ETag"], len(data), checksum)
+        if self._on_upload is not None:
+            self._on_upload(len(data))
+        return result, len(data)
+
+    def has_parts(self) -> bool:
+        """True when at least one part was submitted or skipped"""
+        return len(self._futures) > 0
+
+    def complete(self):
+        """wait for all parts and complete the multipart upload"""
+        results = [future.result() for future in self._futures]
+        uploaded_parts = [result for result, _ in results]
+        checksum = None
+        if self._checksums and all(
+            "ChecksumCRC32" in result and size is not None for result, size in results
+        ):
+            checksum = combine_checksums(
+                (result["ChecksumCRC32"], size) for result, size in results
+            )
+        self._remote_resource.complete_multipart_upload(
+            self._remote_file_name, self._upload_id, uploaded_parts, checksum=checksum
+        )
+        if self._journal is not None:
+            self._journal.delete()
+
+
+# pylint: disable=too-many-arguments, too-many-locals, too-many-statements, too-many-branches
+def _compress_chunks_and_upload(
+    file_name: str,
+    upload_id: str,
+    remote_resource: Flow360Resource,
+    remote_file_name: str,
+    compress,
+    max_workers: int,
+    chunk_length: int,
+    compression_workers: int,
+    max_queued_parts: int,
+    journal: UploadJournal,
+    hasher,
+    part_size: int,
+    progress_callback=None,
+    trailer=None,
+):
+    """
+    Compress every chunk of the file independently with compress and upload the results,
+    collected into parts, in file order.
+
+    Part offsets and lengths refer to the input file, so parts dispatched before an
+    interruption can be rebuilt from the same ranges. When trailer is given, the sizes of
+    the compressed chunks are recorded and trailer(frames), where frames lists the
+    (compressed size, input size) of every chunk, is appended to the last part.
+    """
+
+    assert os.path.isfile(file_name)
+    if compression_workers is None:
+        compression_workers = os.cpu_count() or 1
+    if journal is not None:
+        chunk_length = journal.chunk_length
+    file_size = os.path.getsize(file_name)
+    policy = AdaptiveTransferPolicy(file_size, max_concurrency=max_queued_parts)
+    if part_size is not None:
+        policy = None
+        part_size = max(part_size, _MIN_UPLOAD_SIZE)
+    compressed_bytes = 0
+    frames = []
+    with _get_progress() as progress, concurrent.futures.ThreadPoolExecutor(
+        max_workers=compression_workers
+    ) as compress_executor, concurrent.futures.ThreadPoolExecutor(
+        max_workers=max_workers
+    ) as upload_executor:
+        if progress_callback is not None:
+            progress_callback.total = file_size
+            on_read = progress_callback
+            on_upload = None
+        else:
+            task_id = progress.add_task(
+                _S3Action.COMPRESSING.value,
+                filename=os.path.basename(file_name),
+                total=file_size,
+            )
+            # Rough estimate of size of compressed file
+            task_id1 = progress.add_task(
+                _S3Action.UPLOADING.value,
+                filename=os.path.basename(file_name),
+                total=file_size * 0.37,
+            )
+
+            def on_read(size):
+                progress.update(task_id, advance=size)
+
+            def on_upload(size):
+                progress.update(task_id1, advance=size)
+
+        uploader = _PartUploader(
+            upload_executor,
+            remote_resource,
+            remote_file_name,
+            upload_id,
+            max_queued_parts,
+            journal=journal,
+            on_upload=on_upload,
+            policy=policy,
+        )
+
+        def compress_range(file, offset, length=None):
+            file.seek(offset)
+            chunks = _read_chunks(file, chunk_length, length)
+            if hasher is not None:
+                chunks = _hashed(chunks, hasher)
+            # chunks read ahead count against the memory budget of max_queued_parts
+            return _compress_in_order(
+                compress_executor,
+                chunks,
+                compress,
+                max_pending=min(2 * compression_workers, max_queued_parts),
+            )
+
+        def submit(part, offset, length, part_frames, last):
+            frames.extend(part_frames)
+            if trailer is not None and last:
+                part += trailer(frames)
+            uploader.submit(
+                part, offset, length, frames=part_frames if trailer is not None else None
+            )
+
+        with open(file_name, "rb") as file:
+            offset = 0
+            # Parts dispatched before an interruption are rebuilt from the same ranges
+            if journal is not None:
+                for part_number in sorted(journal.parts):
+                    recorded = journal.parts[part_number]
+                    if (trailer is None or recorded.frames is not None) and uploader.skip_uploaded(
+                        recorded.offset, recorded.length
+                    ):
+                        frames.extend(recorded.frames or [])
+                    else:
+                        chunks = list(compress_range(file, recorded.offset, recorded.length))
+                        part = b"".join(c for _, c in chunks)
+                        compressed_bytes += len(part)
+                        submit(
+                            part,
+                            recorded.offset,
+                            recorded.length,
+                            [(len(c), size) for size, c in chunks],
+                            last=recorded.offset + recorded.length >= file_size,
+                        )
+                    on_read(recorded.length)
+                    offset = recorded.offset + recorded.length
+
+            part = b""
+            part_length = 0
+            part_frames = []
+            for size, compressed_chunk in compress_range(file, offset):
+                # Every part but the last one is at least _MIN_UPLOAD_SIZE
+                if len(part) >= (policy.part_size if policy is not None else part_size):
+                    submit(part, offset, part_length, part_frames, last=False)
+                    offset += part_length
+                    part = b""
+                    part_length = 0
+                    part_frames = []
+                on_read(size)
+                compressed_bytes += len(compressed_chunk)
+                part += compressed_chunk
+                part_length += size
+                part_frames.append((len(compressed_chunk), size))
+            if part or not uploader.has_parts():
+                submit(part, offset, part_length, part_frames, last=True)
+
+        if progress_callback is None:
+            # Update upload progress bar with accurate total part_number
+            progress.update(task_id1, total=compressed_bytes)
+        uploader.complete()
+
+
+# pylint: disable=too-many-arguments
 def compress_and_upload_chunks(
     file_name: str,
     upload_id: str,
     remote_resource: Flow360Resource,
     remote_file_name: str,
     max_workers: int = 50,
-    chunk_length: int = 25 * 1024 * 1024,
+    chunk_length: int = _CHUNK_LENGTH,
+    compression_workers: int = None,
+    max_queued_parts: int = _MAX_QUEUED_PARTS,
+    journal: UploadJournal = None,
+    hasher=None,
+    part_size: int = None,
 ):
     """
     Compresses and uploads file chunks to a remote resource using Bzip2 compression.
 
+    Every chunk is compressed into an independent bz2 stream. Compression runs on a pool
+    of worker threads (bz2 releases the GIL while compressing), results are consumed in
+    file order, so part numbers are assigned deterministically.
+
     Args:
         file_name (str): The path to the input file that needs to be compressed
         and uploaded.
@@ -33,67 +377,274 @@ def compress_and_upload_chunks(
         max_workers (int, optional): The maximum number of concurrent workers for
         the thread pool (default is 50).
         chunk_length (int, optional): The size (in bytes) of each chunk to be
-        compressed and uploaded (default is 25 MB).
+        compressed (default is 25 MB).
+        compression_workers (int, optional): The number of threads compressing chunks
+        (default is the number of CPU cores).
+        max_queued_parts (int, optional): The maximum number of compressed parts held in
+        memory waiting for upload; reading blocks when it is reached (default is 16). It
+        also limits the number of chunks read ahead for compression.
+        journal (UploadJournal, optional): Journal recording the uploaded parts. Parts it
+        lists as uploaded are skipped, parts it lists as pending are rebuilt from the same
+        range of the file.
+        hasher (optional): hashlib object updated with the content of the file while it is
+        read for compression. The content is only complete when the journal has no parts.
+        part_size (int, optional): Compressed chunks are collected into parts of at least
+        part_size bytes (at least 5 MB). By default the part size is chosen from the file
+        size and adjusted from the measured upload time of every part, and the number of
+        parts uploaded at the same time follows the measured throughput.
 
     Raises:
         AssertionError: If the input 'file_name' does not exist or is not a regular file.
     """
 
-    def upload_and_update(part_number, chunk):
-        future = executor.submit(
-            remote_resource.upload_part,
-            remote_file_name,
-            upload_id,
-            part_number,
-            chunk,
-        )
-        # Wait for the upload to finish and update the progress
-        result = future.result()
-        progress.update(task_id1, advance=len(chunk))
-        return result
+    _compress_chunks_and_upload(
+        file_name,
+        upload_id,
+        remote_resource,
+        remote_file_name,
+        bz2.compress,
+        max_workers=max_workers,
+        chunk_length=chunk_length,
+        compression_workers=compression_workers,
+        max_queued_parts=max_queued_parts,
+        journal=journal,
+        hasher=hasher,
+        part_size=part_size,
+    )
+
+
+# pylint: disable=too-many-arguments
+def seekable_zstd_compress_and_upload_chunks(
+    file_name: str,
+    upload_id: str,
+    remote_resource: Flow360Resource,
+    remote_file_name: str,
+    max_workers: int = 50,
+    chunk_length: int = _CHUNK_LENGTH,
+    compression_level: int = 3,
+    compression_workers: int = None,
+    progress_callback=None,
+    max_queued_parts: int = _MAX_QUEUED_PARTS,
+    journal: UploadJournal = None,
+    hasher=None,
+    part_size: int = None,
+):
+    """
+    Compresses and uploads a file in the seekable Zstandard format.
+
+    Every chunk is compressed into an independent zstd frame on a pool of worker threads
+    and a seek table listing the size of every frame is appended in a skippable frame (see
+    seekable_zstd). The result is a standard .zst file; readers aware of the seek table can
+    decompress it in parallel or access ranges of it. Unlike the single frame written by
+    zstd_compress_and_upload_chunks, parts depend only on their range of the file, so a
+    resumed upload compresses only the missing parts.
+
+    Args:
+        file_name (str): The path to the input file that needs to be compressed
+        and uploaded.
+        upload_id (str): The ID of the multipart upload for the remote resource.
+        remote_resource (Flow360Resource): The remote resource to which the parts
+        will be uploaded.
+        remote_file_name (str): The name of the remote file on the remote resource.
+        max_workers (int, optional): The maximum number of concurrent workers for
+        the thread pool (default is 50).
+        chunk_length (int, optional): The size (in bytes) of the input of each frame
+        (default is 25 MB).
+        compression_level (int, optional): The compression level used by the Zstandard
+        compressor (default is 3).
+        compression_workers (int, optional): The number of threads compressing frames
+        (default is the number of CPU cores).
+        progress_callback (ProgressCallbackInterface, optional): Custom progress callback,
+        reports the number of input bytes processed.
+        max_queued_parts (int, optional): The maximum number of compressed parts held in
+        memory waiting for upload; reading blocks when it is reached (default is 16). It
+        also limits the number of chunks read ahead for compression.
+        journal (UploadJournal, optional): Journal recording the uploaded parts and the
+        sizes of their frames. Parts it lists as uploaded are skipped, parts it lists as
+        pending are rebuilt from the same range of the file.
+        hasher (optional): hashlib object updated with the content of the file while it is
+        read for compression. The content is only complete when the journal has no parts.
+        part_size (int, optional): Frames are collected into parts of at least part_size
+        bytes (at least 5 MB). By default the part size is adaptive.
+
+    Raises:
+        AssertionError: If the input 'file_name' does not exist or is not a regular file.
+    """
+
+    _compress_chunks_and_upload(
+        file_name,
+        upload_id,
+        remote_resource,
+        remote_file_name,
+        functools.partial(compress_frame, level=compression_level),
+        max_workers=max_workers,
+        chunk_length=min(chunk_length, MAX_FRAME_SIZE),
+        compression_workers=compression_workers,
+        max_queued_parts=max_queued_parts,
+        journal=journal,
+        hasher=hasher,
+        part_size=part_size,
+        progress_callback=progress_callback,
+        trailer=seek_table,
+    )
+
+
+# pylint: disable=too-many-arguments, too-many-locals
+def zstd_compress_and_upload_chunks(
+    file_name: str,
+    upload_id: str,
+    remote_resource: Flow360Resource,
+    remote_file_name: str,
+    max_workers: int = 50,
+    chunk_length: int = None,
+    compression_level: int = 3,
+    progress_callback=None,
+    max_queued_parts: int = _MAX_QUEUED_PARTS,
+    journal: UploadJournal = None,
+    hasher=None,
+    threads: int = -1,
+):
+    """
+    Compresses a file with Zstandard and streams the compressed output to a multipart upload.
+
+    Compressed data is accumulated in memory and every time a full part is available it is
+    submitted for upload, so compression and network transfer overlap and no temporary
+    compressed file is written to disk. The result is a single standard zstd frame,
+    compressed by zstd worker threads. Progress is reported at most ten times per second.
+
+    Args:
+        file_name (str): The path to the input file that needs to be compressed
+        and uploaded.
+        upload_id (str): The ID of the multipart upload for the remote resource.
+        remote_resource (Flow360Resource): The remote resource to which the parts
+        will be uploaded.
+        remote_file_name (str): The name of the remote file on the remote resource.
+        max_workers (int, optional): The maximum number of concurrent workers for
+        the thread pool (default is 50).
+        chunk_length (int, optional): The size (in bytes) of each uploaded part
+        (at least 5 MB). By default the part size is chosen from the file size and
+        adjusted from the measured upload time of every part, and the number of parts
+        uploaded at the same time follows the measured throughput.
+        compression_level (int, optional): The compression level used by the Zstandard
+        compressor, from 1 to 22 or negative for faster modes (default is 3).
+        progress_callback (ProgressCallbackInterface, optional): Custom progress callback,
+        reports the number of input bytes processed.
+        max_queued_parts (int, optional): The maximum number of compressed parts held in
+        memory waiting for upload; compression blocks when it is reached (default is 16).
+        journal (UploadJournal, optional): Journal recording the uploaded parts. A single
+        zstd frame cannot be restarted in the middle, so on resume the file is compressed
+        again, with the level and thread mode recorded in the journal, and only the parts
+        missing from the journal are uploaded. Recorded parts keep their recorded size.
+        Resuming an upload started with a different version of the zstd library is refused.
+        hasher (optional): hashlib object updated with the content of the file while it is
+        read for compression.
+        threads (int, optional): Number of zstd worker threads, -1 uses all CPU cores and 0
+        compresses on the calling thread (default is -1).
+
+    Raises:
+        AssertionError: If the input 'file_name' does not exist or is not a regular file.
+        Flow360RuntimeError: If the journal records parts compressed by a different version
+        of the zstd library.
+    """
 
     assert os.path.isfile(file_name)
-    uploaded_parts = []  # Initialize an empty list to store the uploaded parts
-    futures = []
-    min_upload_size = 5 * 1024 * 1024
-    compressed_bytes = 0
-    with _get_progress() as progress:
-        task_id = progress.add_task(
-            _S3Action.COMPRESSING.value,
-            filename=os.path.basename(file_name),
-            total=os.path.getsize(file_name),
+    if journal is not None and journal.parts and not journal.zstd_version_matches():
+        raise Flow360RuntimeError(
+            f"The upload of {file_name} was started with a different zstd version and cannot "
+            "be resumed, start the upload again."
         )
-        # Rough estimate of size of compressed file
-        task_id1 = progress.add_task(
-            _S3Action.UPLOADING.value,
-            filename=os.path.basename(file_name),
-            total=os.path.getsize(file_name) * 0.37,
+    file_size = os.path.getsize(file_name)
+    policy = None
+    if chunk_length is None:
+        policy = AdaptiveTransferPolicy(file_size, max_concurrency=max_queued_parts)
+        read_length = _CHUNK_LENGTH
+    else:
+        chunk_length = max(chunk_length, _MIN_UPLOAD_SIZE)
+        read_length = chunk_length
+    if journal is not None:
+        read_length = journal.chunk_length
+        compression_level = journal.zstd_level
+        if journal.zstd_multithreaded != (threads != 0):
+            threads = -1 if journal.zstd_multithreaded else 0
+    validate_zstd_level(compression_level)
+    compressor = zstd.ZstdCompressor(level=compression_level, threads=threads).compressobj()
+    buffer = bytearray()
+
+    with _get_progress() as progress, concurrent.futures.ThreadPoolExecutor(
+        max_workers=max_workers
+    ) as executor:
+        if progress_callback is not None:
+            progress_callback.total = file_size
+            on_read = _ThrottledProgress(progress_callback)
+            _on_upload = None
+
+        else:
+            task_id = progress.add_task(
+                _S3Action.COMPRESSING.value,
+                filename=os.path.basename(file_name),
+                total=file_size,
+            )
+            # Total is only known after compression finishes; start from a rough estimate
+            task_id1 = progress.add_task(
+                _S3Action.UPLOADING.value,
+                filename=os.path.basename(file_name),
+                total=file_size * 0.37,
+            )
+            on_read = _ThrottledProgress(lambda advance: progress.update(task_id, advance=advance))
+
+            def _on_upload(size):
+                progress.update(task_id1, advance=size)
+
+        uploader = _PartUploader(
+            executor,
+            remote_resource,
+            remote_file_name,
+            upload_id,
+            max_queued_parts,
+            journal=journal,
+            on_upload=_on_upload,
+            policy=policy,
         )
-        executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
-        part_number = 1
+
+        compressed_bytes = 0
+
+        def next_part_size():
+            recorded = journal.parts.get(uploader.next_part_number) if journal else None
+            if recorded is not None and recorded.length > 0:
+                return recorded.length
+            return policy.part_size if policy is not None else chunk_length
+
+        def submit_part(part):
+            # offsets of zstd parts refer to the compressed stream
+            offset = compressed_bytes - len(buffer)
+            if not uploader.skip_uploaded(offset, len(part)):
+                uploader.submit(bytes(part), offset, len(part))
+
+        def add_compressed(compressed):
+            nonlocal compressed_bytes
+            compressed_bytes += len(compressed)
+            buffer.extend(compressed)
+            part_size = next_part_size()
+            while len(buffer) >= part_size:
+                submit_part(buffer[:part_size])
+                del buffer[:part_size]
+                part_size = next_part_size()
+
         with open(file_name, "rb") as file:
-            while True:
-                # Read Chunk
-                chunk_data = file.read(chunk_length)
-                progress.update(task_id, advance=chunk_length)
-                if not chunk_data:
-                    break
-                # Compress Chunk
-                compressed_chunk = bz2.compress(chunk_data)
-                compressed_bytes += len(compressed_chunk)
-                # Ensure compressed chunk is at least min_upload_size
-                while len(compressed_chunk) < min_upload_size and chunk_data:
-                    chunk_data = file.read(chunk_length)
-                    compressed = bz2.compress(chunk_data)
-                    compressed_chunk += compressed
-                    compressed_bytes += len(compressed)
-                    progress.update(task_id, advance=chunk_length)
-                # Call the upload function for each part without waiting for the result
-                futures.append(executor.submit(upload_and_update, part_number, compressed_chunk))
-                part_number += 1
-        # Update upload progress bar with accurate total part_number
-        progress.update(task_id1, total=compressed_bytes)
-        concurrent.futures.wait(futures)
-
-    uploaded_parts = [future.result() for future in futures]
-    remote_resource.complete_multipart_upload(remote_file_name, upload_id, uploaded_parts)
+            chunks = _read_chunks(file, read_length)
+            if hasher is not None:
+                chunks = _hashed(chunks, hasher)
+            for chunk_data in chunks:
+                add_compressed(compressor.compress(chunk_data))
+                on_read(len(chunk_data))
+
+        # zstd worker threads return the output of the jobs still running on flush
+        add_compressed(compressor.flush())
+        on_read.flush()
+        # The last part is allowed to be smaller than the S3 minimum part size
+        if buffer or not uploader.has_parts():
+            submit_part(buffer)
+
+        if progress_callback is None:
+            progress.update(task_id1, total=compressed_bytes)
+        uploader.complete()
@@ -0,0 +1,220 @@
+"""
+Decompression of downloaded meshes
+
+Meshes uploaded with compress_and_upload_chunks are a concatenation of independent bz2
+streams, one per chunk. The stream boundaries are found by scanning for the bz2 stream
+header and the streams are decompressed concurrently (bz2 releases the GIL while
+decompressing) and written to the output file in order. Seekable zstd meshes are
+decompressed the same way, frame by frame, using their seek table.
+"""
+
+import bz2
+import collections
+import concurrent.futures
+import functools
+import gzip
+import mmap
+import os
+import re
+import shutil
+from typing import List, Tuple
+
+import zstandard as zstd
+
+from ..cloud.utils import _get_progress, _S3Action, _ThrottledProgress
+from ..exceptions import Flow360ValueError
+from ..log import log
+from .seekable_zstd import SeekableZstdFile, read_seek_table
+
+# "BZh", block size 1-9 and the magic number of the first block (BCD digits of pi)
+_BZ2_STREAM_HEADER = re.compile(rb"BZh[1-9]\x31\x41\x59\x26\x53\x59")
+_COPY_SIZE = 16 * 1024 * 1024
+# Bound of the decompressed results held in memory ahead of the writer
+_MAX_PENDING_BYTES = 512 * 1024 * 1024
+
+
+def find_bz2_streams(file_name: str) -> List[Tuple[int, int]]:
+    """
+    Offsets and lengths of the bz2 streams concatenated in file_name.
+
+    The header pattern may occasionally appear inside compressed data as well, such false
+    boundaries are detected when the streams are decompressed.
+    """
+    size = os.path.getsize(file_name)
+    if size == 0:
+        return []
+    with open(file_name, "rb") as file, mmap.mmap(
+        file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as data:
+        offsets = [match.start() for match in _BZ2_STREAM_HEADER.finditer(data)]
+    if not offsets or offsets[0] != 0:
+        return [(0, size)]
+    return [(start, end - start) for start, end in zip(offsets, offsets[1:] + [size])]
+
+
+def _read_range(file_name: str, offset: int, length: int) -> bytes:
+    with open(file_name, "rb") as file:
+        file.seek(offset)
+        return file.read(length)
+
+
+def _decompress_bz2_stream(file_name: str, offset: int, length: int) -> bytes:
+    decompressor = bz2.BZ2Decompressor()
+    data = decompressor.decompress(_read_range(file_name, offset, length))
+    if not decompressor.eof or decompressor.unused_data:
+        raise ValueError(f"no complete bz2 stream at offset {offset}")
+    return data
+
+
+def _decompress_bz2_serial(file_name: str, output_file: str, on_progress):
+    with open(file_name, "rb") as compressed, open(output_file, "wb") as output:
+        with bz2.BZ2File(compressed) as file:
+            position = 0
+            for data in iter(lambda: file.read(_COPY_SIZE), b""):
+                output.write(data)
+                on_progress(compressed.tell() - position)
+                position = compressed.tell()
+
+
+def _decompress_in_order(
+    output_file: str,
+    tasks,
+    workers: int,
+    on_progress,
+    max_pending_bytes: int = _MAX_PENDING_BYTES,
+):
+    """
+    Run the decompress functions of tasks, (compressed size, function) tuples, on a thread
+    pool and write their results to output_file in order.
+
+    Tasks are submitted ahead of the writer while their results, estimated from the largest
+    result written so far, fit in max_pending_bytes, and at most 2 * workers of them.
+    Before the first result is written, at most workers tasks are submitted.
+    """
+    with open(output_file, "wb") as output, concurrent.futures.ThreadPoolExecutor(
+        max_workers=workers
+    ) as executor:
+        pending = collections.deque()
+        largest = 0
+
+        def write_next():
+            nonlocal largest
+            length, future = pending.popleft()
+            data = future.result()
+            largest = max(largest, len(data))
+            output.write(data)
+            on_progress(length)
+
+        def full():
+            if not largest:
+                return len(pending) >= workers
+            return len(pending) >= 2 * workers or len(pending) * largest >= max_pending_bytes
+
+        try:
+            for length, function in tasks:
+                while pending and full():
+                    write_next()
+                pending.append((length, executor.submit(function)))
+            while pending:
+                write_next()
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+
+def _decompress_bz2_parallel(
+    file_name: str, streams: List[Tuple[int, int]], output_file: str, workers: int, on_progress
+):
+    tasks = [
+        (length, functools.partial(_decompress_bz2_stream, file_name, offset, length))
+        for offset, length in streams
+    ]
+    _decompress_in_order(output_file, tasks, workers, on_progress)
+
+
+def decompress_bz2(file_name: str, output_file: str, workers: int = None, progress_callback=None):
+    """
+    Decompress a bz2 file made of one or more concatenated streams.
+
+    Args:
+        file_name (str): The path to the bz2 file.
+        output_file (str): The path of the decompressed file.
+        workers (int, optional): The number of threads decompressing streams (default is the
+        number of CPU cores).
+        progress_callback (callable, optional): Called with the number of compressed bytes
+        processed.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    on_progress = progress_callback or (lambda _: None)
+    streams = find_bz2_streams(file_name) if workers > 1 else []
+    if len(streams) > 1:
+        try:
+            _decompress_bz2_parallel(file_name, streams, output_file, workers, on_progress)
+            return
+        except (OSError, ValueError) as error:
+            # a false stream boundary, decompress the file as a whole
+            log.debug(f"Decompressing {file_name} serially: {error}")
+    _decompress_bz2_serial(file_name, output_file, on_progress)
+
+
+def decompress_zstd(file_name: str, output_file: str, workers: int = None, progress_callback=None):
+    """
+    Decompress a zstd file. The frames of a file in the seekable zstd format are
+    decompressed concurrently by workers threads (default is the number of CPU cores),
+    other files are decompressed serially.
+
+    Args:
+        file_name (str): The path to the zstd file.
+        output_file (str): The path of the decompressed file.
+        workers (int, optional): The number of threads decompressing frames.
+        progress_callback (callable, optional): Called with the number of compressed bytes
+        processed.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    on_progress = progress_callback or (lambda _: None)
+    with open(file_name, "rb") as file:
+        seekable = read_seek_table(file) is not None
+    if seekable:
+        zstd_file = SeekableZstdFile(file_name)
+        tasks = [
+            (compressed, functools.partial(zstd_file.read_frame, index))
+            for index, (compressed, _) in enumerate(zstd_file.frames)
+        ]
+        _decompress_in_order(output_file, tasks, workers, on_progress)
+        on_progress(os.path.getsize(file_name) - zstd_file.compressed_offsets[-1])
+        return
+    with open(file_name, "rb") as compressed, open(output_file, "wb") as output:
+        with zstd.ZstdDecompressor().stream_reader(compressed, read_across_frames=True) as reader:
+            shutil.copyfileobj(reader, output, _COPY_SIZE)
+    on_progress(os.path.getsize(file_name))
+
+
+def decompress_file(file_name: str, output_file: str, workers: int = None):
+    """
+    Decompress a .bz2, .zst or .gz file to output_file, showing a progress bar.
+
+    bz2 files made of several streams and seekable zstd files are decompressed concurrently
+    by workers threads (default is the number of CPU cores). Returns output_file.
+    """
+    with _get_progress(_S3Action.DECOMPRESSING) as progress:
+        task_id = progress.add_task(
+            "decompress",
+            filename=os.path.basename(file_name),
+            total=os.path.getsize(file_name),
+        )
+        on_progress = _ThrottledProgress(lambda advance: progress.update(task_id, advance=advance))
+        if file_name.endswith(".bz2"):
+            decompress_bz2(file_name, output_file, workers, progress_callback=on_progress)
+        elif file_name.endswith(".zst"):
+            decompress_zstd(file_name, output_file, workers, progress_callback=on_progress)
+        elif file_name.endswith(".gz"):
+            with gzip.open(file_name, "rb") as reader, open(output_file, "wb") as output:
+                shutil.copyfileobj(reader, output, _COPY_SIZE)
+            on_progress(os.path.getsize(file_name))
+        else:
+            raise Flow360ValueError(f"Unsupported compression of {file_name}")
+        on_progress.flush()
+    log.info(f"Decompressed {file_name} to {output_file}")
+    return output_file
@@ -8,6 +8,7 @@ from typing import List, Optional, Union
 
 import pydantic as pd
 
+from ..cloud.metadata_cache import metadata_cache
 from ..cloud.requests import MoveFolderItem, MoveToFolderRequest, NewFolderRequest
 from ..cloud.rest_api import RestApi
 from ..exceptions import Flow360ValueError
@@ -91,16 +92,8 @@ class Folder(Flow360Resource):
     def info(self) -> FolderMeta:
         return super().info
 
-    def get_info(self, force=False) -> FolderMeta:
-        """
-        returns metadata info for resource
-        """
-
-        if self._info is None or force:
-            self._info = self.info_type_class(
-                **self.get(f"{self._endpoint}/items/{self.id}/metadata")
-            )
-        return self._info
+    def _fetch_info(self) -> FolderMeta:
+        return self.info_type_class(**self.get(f"{self._endpoint}/items/{self.id}/metadata"))
 
     def move_to_folder(self, folder: Folder):
         """
@@ -127,6 +120,8 @@ class Folder(Flow360Resource):
             ).dict(),
             method="move",
         )
+        # the metadata records the parent folder
+        metadata_cache.invalidate(self._metadata_key)
         return self
 
     @classmethod
@@ -2,9 +2,11 @@
 Flow360 base Model
 """
 
+import asyncio
 import os
 import re
 import shutil
+import time
 import traceback
 from abc import ABCMeta
 from datetime import datetime
@@ -16,10 +18,13 @@ from typing import List, Optional, Union
 import pydantic as pd
 
 from .. import error_messages
+from ..cloud.http_util import async_http
+from ..cloud.metadata_cache import metadata_cache
 from ..cloud.rest_api import RestApi
+from ..cloud.upload_registry import UploadRegistry
 from ..cloud.webbrowser import open_browser
 from ..component.interfaces import BaseInterface
-from ..exceptions import Flow360RuntimeError
+from ..exceptions import Flow360RuntimeError, Flow360WebNotFoundError
 from ..log import LogLevel, log
 from ..user_config import UserConfig
 from .utils import is_valid_uuid, validate_type
@@ -134,6 +139,28 @@ class ResourceDraft(metaclass=ABCMeta):
         """
         return self._id
 
+    @staticmethod
+    def _find_uploaded(registry: UploadRegistry, key: str, resource_class):
+        """
+        Return the resource registered under key if it still exists and is usable, registry
+        entries of deleted or failed resources are removed.
+        """
+        resource_id = registry.find(key)
+        if resource_id is None:
+            return None
+        try:
+            resource = resource_class(resource_id)
+            info = resource.get_info(force=True)
+        except Flow360WebNotFoundError:
+            info = None
+        if info is None or info.deleted or info.status == Flow360Status.ERROR:
+            registry.forget(key)
+            return None
+        log.info(
+            f"Found identical upload, using existing {resource_class.__name__} id={resource_id}"
+        )
+        return resource
+
     def is_cloud_resource(self):
         """checks if resource is before submission or after
 
@@ -186,7 +213,7 @@ class Flow360Resource(RestApi):
         """
         if self._info is None:
             validate_type(meta, "meta", self.info_type_class)
-            self._info = meta
+            self._update_info(meta)
         else:
             raise Flow360RuntimeError(
                 f"Resource already have metadata {self._info}. Cannot assign."
@@ -198,12 +225,29 @@ class Flow360Resource(RestApi):
             "This is abstract method. Needs to be implemented by specialised class."
         )
 
+    @property
+    def _metadata_key(self):
+        """key of the resource in metadata_cache"""
+        return (self.info_type_class, self.id)
+
+    def _fetch_info(self) -> Flow360ResourceBaseModel:
+        """request the metadata of the resource from the web API"""
+        return self.info_type_class(**self.get())
+
+    def _update_info(self, info: Flow360ResourceBaseModel):
+        """set new metadata of the resource, for all objects of the resource"""
+        self._info = info
+        metadata_cache.put(self._metadata_key, info)
+
     def get_info(self, force=False) -> Flow360ResourceBaseModel:
         """
         returns metadata info for resource
+
+        The metadata is shared by all objects of the resource in the process (see
+        cloud.metadata_cache), it is requested again when the resource is in progress and
+        the metadata is older than UserConfig.metadata_ttl, or when force is True.
         """
-        if self._info is None or force:
-            self._info = self.info_type_class(**self.get())
+        self._info = metadata_cache.get(self._metadata_key, self._fetch_info, force=force)
         return self._info
 
     @property
@@ -216,10 +260,42 @@ class Flow360Resource(RestApi):
     @property
     def status(self) -> Flow360Status:
         """
-        returns status for resource
+        returns status for resource, refreshed at most once per UserConfig.metadata_ttl
+        while the resource is in progress
         """
-        force = not self.info.status.is_final() and not self.info.deleted
-        return self.get_info(force).status
+        return self.get_info().status
+
+    async def get_info_async(self, force=False) -> Flow360ResourceBaseModel:
+        """
+        returns metadata info for resource, asyncio version of get_info()
+        """
+        info = None if force else metadata_cache.cached(self._metadata_key)
+        if info is None:
+            # get_info on the I/O threads, so the metadata is requested by _fetch_info of the
+            # resource type as in synchronous code
+            return await async_http.run(self.get_info, force=force)
+        self._info = info
+        return self._info
+
+    async def status_async(self) -> Flow360Status:
+        """
+        returns status for resource, asyncio version of status
+        """
+        info = await self.get_info_async()
+        return info.status
+
+    async def wait_async(self, timeout_minutes=60, poll_interval=2):
+        """Wait until the resource finishes processing, refresh periodically.
+        Many resources can be awaited concurrently with asyncio.gather() from one event loop.
+        """
+
+        start_time = time.time()
+        while not (await self.status_async()).is_final():
+            if time.time() - start_time > timeout_minutes * 60:
+                raise TimeoutError(
+                    "Timeout: Process did not finish within the specified timeout period"
+                )
+            await asyncio.sleep(poll_interval)
 
     @property
     def id(self):
@@ -272,12 +348,13 @@ class Flow360Resource(RestApi):
         file_name,
         to_file=None,
         to_folder=".",
-        overwrite: bool = True,
+        overwrite: Union[bool, str] = True,
         progress_callback=None,
         **kwargs,
     ):
         """
-        Download a specific file associated with the resource.
+        Download a specific file associated with the resource. The file is copied from the
+        local download cache when the remote object did not change since it was cached.
 
         Parameters
         ----------
@@ -288,8 +365,9 @@ class Flow360Resource(RestApi):
             If provided without an extension, the extension will be automatically added based on the file type.
         to_folder : str, optional
             Folder name to save the downloaded file. If None, the file will be saved in the current directory.
-        overwrite : bool, optional
+        overwrite : bool or "if-changed", optional
             If True, overwrite existing files with the same name in the destination.
+            If "if-changed", overwrite only when the remote object changed since the download.
         progress_callback : callable, optional
             A callback function to track the download progress.
         **kwargs : dict, optional
@@ -311,6 +389,42 @@ class Flow360Resource(RestApi):
             **kwargs,
         )
 
+    def _download_fileobj(self, file_name, fileobj, **kwargs):
+        """
+        Download a specific file associated with the resource into a writable binary file
+        object instead of a local file.
+
+        Parameters
+        ----------
+        file_name : str
+            Name of the file to be downloaded.
+        fileobj : file object
+            Writable binary file object, e.g. io.BytesIO.
+        **kwargs : dict, optional
+            Additional arguments to be passed to the download process.
+        """
+
+        self.s3_transfer_method.download_fileobj(self.id, file_name, fileobj, **kwargs)
+
+    def _open_download_stream(self, file_name, **kwargs):
+        """
+        Open a specific file associated with the resource as a readable binary stream.
+
+        Parameters
+        ----------
+        file_name : str
+            Name of the file to be opened.
+        **kwargs : dict, optional
+            Additional arguments to be passed to the download process.
+
+        Returns
+        -------
+        tuple
+            The stream, to be closed by the caller, and the size of the file.
+        """
+
+        return self.s3_transfer_method.open_stream(self.id, file_name, **kwargs)
+
     def _upload_file(self, remote_file_name: str, file_name: str, progress_callback=None):
         """
         general upload functionality
@@ -337,6 +451,7 @@ class Flow360Resource(RestApi):
         upload_id: str,
         part_number: int,
         compressed_chunk,
+        checksum: str = None,
     ):
         """
         Uploads a part of the file as part of a multipart upload.
@@ -346,16 +461,18 @@ class Flow360Resource(RestApi):
             upload_id (str): The ID of the multipart upload.
             part_number (int): The part number of the upload.
             compressed_chunk: The compressed chunk data to upload.
+            checksum (str, optional): The CRC32 checksum of the data (see cloud.checksum).
 
         Returns:
-            {"ETag": response["ETag"], "PartNumber": part_number}
+            {"ETag": response["ETag"], "PartNumber": part_number}, with "ChecksumCRC32" when
+            checksum is given
         """
         return self.s3_transfer_method.upload_part(
-            self.id, remote_file_name, upload_id, part_number, compressed_chunk
+            self.id, remote_file_name, upload_id, part_number, compressed_chunk, checksum=checksum
         )
 
     def complete_multipart_upload(
-        self, remote_file_name: str, upload_id: str, uploaded_parts: dict
+        self, remote_file_name: str, upload_id: str, uploaded_parts: dict, checksum: str = None
     ):
         """
         Completes a multipart upload for the specified remote file name and upload ID.
@@ -369,12 +486,13 @@ class Flow360Resource(RestApi):
                     "ETag": "string",       # The ETag of each uploaded part.
                     "part_number": int      # The part number of each uploaded part.
                 }
+            checksum (str, optional): The CRC32 checksum of the whole object.
 
         Returns:
             None
         """
         self.s3_transfer_method.complete_multipart_upload(
-            self.id, remote_file_name, upload_id, uploaded_parts
+            self.id, remote_file_name, upload_id, uploaded_parts, checksum=checksum
         )
 
     # pylint: disable=no-member
@@ -1,23 +1,28 @@
 """ Case results module"""
 
+import contextlib
 import os
 import re
 import shutil
 import tempfile
+import threading
 import time
-import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from enum import Enum
-from typing import Callable, Dict, List, Optional
+from typing import Callable, Dict, List, Literal, Optional, Tuple, Union
 
 import numpy as np
 import pandas
 import pydantic as pd
 
 from ...cloud.s3_utils import (
+    OVERWRITE_IF_CHANGED,
     CloudFileNotFoundError,
+    ProgressCallbackInterface,
     get_local_filename_and_create_folders,
 )
-from ...exceptions import Flow360ValueError
+from ...cloud.utils import _get_progress, _S3Action
+from ...exceptions import Flow360RuntimeError, Flow360ValueError
 from ...log import log
 from ..flow360_params.conversions import unit_converter
 from ..flow360_params.flow360_params import Flow360Params
@@ -28,15 +33,11 @@ from ..flow360_params.unit_system import (
     PowerType,
     is_flow360_unit,
 )
+from .tar_index import TarGzIndex
+from .tar_stream import extract_tar_stream
 
-# pylint: disable=consider-using-with
-TMP_DIR = tempfile.TemporaryDirectory()
-
-
-def _temp_file_generator(suffix: str = ""):
-    random_name = str(uuid.uuid4()) + suffix
-    file_path = os.path.join(TMP_DIR.name, random_name)
-    return file_path
+# CSV results up to this size are loaded from memory, larger ones spill to a temporary file
+_MAX_IN_MEMORY_SIZE = 32 * 1024 * 1024
 
 
 class CaseDownloadable(Enum):
@@ -82,15 +83,111 @@ class ResultsDownloaderSettings(pd.BaseModel):
     ----------
     all : bool, optional (default False)
         Flag indicating whether to download all available results.
-    overwrite : bool, optional (default False)
-        Flag indicating whether to overwrite existing files during download.
+    overwrite : bool or "if-changed", optional (default False)
+        Flag indicating whether to overwrite existing files during download, "if-changed"
+        overwrites only files whose remote object changed since they were downloaded.
     destination : str, optional (default ".")
         The destination directory where the results will be downloaded.
+    max_workers : int, optional (default 8)
+        Number of result files downloaded concurrently.
     """
 
     all: Optional[bool] = pd.Field(False)
-    overwrite: Optional[bool] = pd.Field(False)
+    overwrite: Optional[Union[Literal["if-changed"], bool]] = pd.Field(False)
     destination: Optional[str] = pd.Field(".")
+    max_workers: Optional[int] = pd.Field(8)
+
+
+class _AggregateProgress:
+    """
+    Progress bar shared by many concurrent downloads, its total grows as file sizes get known.
+    """
+
+    def __init__(self, progress, description: str):
+        self._progress = progress
+        self._task_id = progress.add_task("download", filename=description, total=0)
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def add_total(self, size: int):
+        """add bytes to the total of the progress bar"""
+        with self._lock:
+            self._total += size
+            self._progress.update(self._task_id, total=self._total)
+
+    def advance(self, size: int):
+        """advance the progress bar"""
+        self._progress.update(self._task_id, advance=size)
+
+    def callback(self):
+        """create a progress callback for a single file"""
+        return _FileProgressCallback(self)
+
+
+class _FileProgressCallback(ProgressCallbackInterface):
+    """
+    Progress callback of a single file reporting into an aggregate progress bar.
+    """
+
+    def __init__(self, aggregate: _AggregateProgress):
+        self._aggregate = aggregate
+        self._total = 0
+
+    @property
+    def total(self):
+        return self._total
+
+    @total.setter
+    def total(self, total: int):
+        self._aggregate.add_total(total - self._total)
+        self._total = total
+
+    def __call__(self, bytes_chunk_transferred):
+        self._aggregate.advance(bytes_chunk_transferred)
+
+
+def _download_results(tasks: List[Tuple[str, Callable]], max_workers: int):
+    """
+    Run result downloads concurrently on a bounded worker pool with one aggregate progress bar.
+
+    Parameters
+    ----------
+    tasks : list of (str, callable)
+        Name of the result and a function downloading it. The function receives a progress
+        callback.
+    max_workers : int
+        Number of downloads running at the same time.
+
+    Raises
+    ------
+    Flow360RuntimeError
+        When any of the downloads failed, after all other downloads finished. Every failure
+        is logged separately.
+    """
+
+    if len(tasks) == 0:
+        return
+
+    failed = []
+    with _get_progress(_S3Action.DOWNLOADING) as progress:
+        aggregate = _AggregateProgress(progress, f"{len(tasks)} results")
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(download, aggregate.callback()): name for name, download in tasks
+            }
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                # pylint: disable=broad-exception-caught
+                except Exception as error:
+                    log.error(f"Failed to download {futures[future]}: {error}")
+                    failed.append((futures[future], error))
+
+    if len(failed) == 1:
+        raise failed[0][1]
+    if len(failed) > 1:
+        names = ", ".join(name for name, _ in failed)
+        raise Flow360RuntimeError(f"Failed to download {len(failed)} results: {names}")
 
 
 class ResultBaseModel(pd.BaseModel):
@@ -107,6 +204,10 @@ class ResultBaseModel(pd.BaseModel):
         Flag indicating whether to perform the download.
     _download_method : Callable, optional
         The method responsible for downloading the file.
+    _download_fileobj_method : Callable, optional
+        The method downloading the file into a file object.
+    _open_stream_method : Callable, optional
+        The method opening the file as a readable stream.
     _get_params_method : Callable, optional
         The method to get Case parameters.
     _is_downloadable : Callable, optional
@@ -123,10 +224,14 @@ class ResultBaseModel(pd.BaseModel):
     local_file_name: str = pd.Field(None)
     do_download: Optional[bool] = pd.Field(None)
     _download_method: Optional[Callable] = pd.PrivateAttr()
+    _download_fileobj_method: Optional[Callable] = pd.PrivateAttr()
+    _open_stream_method: Optional[Callable] = pd.PrivateAttr()
     _get_params_method: Optional[Callable] = pd.PrivateAttr()
     _is_downloadable: Callable = pd.PrivateAttr(lambda: True)
 
-    def download(self, to_file: str = None, to_folder: str = ".", overwrite: bool = False):
+    def download(
+        self, to_file: str = None, to_folder: str = ".", overwrite: bool = False, **kwargs
+    ):
         """
         Download the file to the specified location.
 
@@ -141,9 +246,17 @@ class ResultBaseModel(pd.BaseModel):
         """
 
         self._download_method(
-            self._remote_path(), to_file=to_file, to_folder=to_folder, overwrite=overwrite
+            self._remote_path(),
+            to_file=to_file,
+            to_folder=to_folder,
+            overwrite=overwrite,
+            **kwargs,
         )
 
+    def _download_fileobj(self, fileobj, **kwargs):
+        self._download_fileobj_method(self._remote_path(), fileobj, **kwargs)
+        return True
+
     def _remote_path(self):
         return f"results/{self.remote_file_name}"
 
@@ -154,8 +267,6 @@ class ResultCSVModel(ResultBaseModel):
 
     Parameters
     ----------
-    temp_file : str
-        Path to the temporary CSV file.
     _values : dict, optional
         Internal storage for the CSV data.
     _raw_values : dict, optional
@@ -183,9 +294,6 @@ class ResultCSVModel(ResultBaseModel):
         Convert the data to a Pandas DataFrame.
     """
 
-    temp_file: str = pd.Field(
-        const=True, default_factory=lambda: _temp_file_generator(suffix=".csv")
-    )
     _values: Optional[Dict] = pd.PrivateAttr(None)
     _raw_values: Optional[Dict] = pd.PrivateAttr(None)
 
@@ -224,15 +332,24 @@ class ResultCSVModel(ResultBaseModel):
 
     def load_from_remote(self, **kwargs_download):
         """
-        Load CSV data from a remote source.
+        Load CSV data from a remote source. Files are served from the local download cache
+        when the remote object did not change. The data is downloaded into memory, only files
+        larger than 32 MB are spilled to a temporary file.
         """
 
-        self.download(to_file=self.temp_file, overwrite=True, **kwargs_download)
-        self._raw_values = self._read_csv_file(self.temp_file)
-        self.local_file_name = self.temp_file
+        with tempfile.SpooledTemporaryFile(max_size=_MAX_IN_MEMORY_SIZE) as buffer:
+            if not self._download_fileobj(buffer, **kwargs_download):
+                return
+            buffer.seek(0)
+            self._raw_values = self._read_csv_file(buffer)
+        self.local_file_name = None
 
     def download(
-        self, to_file: str = None, to_folder: str = ".", overwrite: bool = False, **kwargs
+        self,
+        to_file: str = None,
+        to_folder: str = ".",
+        overwrite: Union[bool, str] = False,
+        **kwargs,
     ):
         """
         Download the CSV file.
@@ -243,8 +360,9 @@ class ResultCSVModel(ResultBaseModel):
             The name of the file after downloading.
         to_folder : str, optional
             The folder where the file will be downloaded.
-        overwrite : bool, optional
-            Flag indicating whether to overwrite existing files.
+        overwrite : bool or "if-changed", optional
+            Flag indicating whether to overwrite existing files. "if-changed" skips files
+            that are identical to the remote object.
         """
 
         local_file_path = get_local_filename_and_create_folders(
@@ -256,7 +374,7 @@ class ResultCSVModel(ResultBaseModel):
             )
 
         else:
-            if overwrite is True or self.local_file_name is None:
+            if overwrite is not False or self.local_file_name is None:
                 self._download_method(
                     self._remote_path(),
                     to_file=to_file,
@@ -265,7 +383,7 @@ class ResultCSVModel(ResultBaseModel):
                     **kwargs,
                 )
             else:
-                shutil.copy(self.temp_file, local_file_path)
+                shutil.copy(self.local_file_name, local_file_path)
                 log.info(f"Saved to {local_file_path}")
 
     def __str__(self):
@@ -364,11 +482,110 @@ class ResultTarGZModel(ResultBaseModel):
 
     Methods
     -------
+    download(to_file: str = None, to_folder: str = ".", overwrite: bool = False,
+             extract: bool = False, members: Union[str, List[str]] = None)
+        Download the TAR GZ file, or extract it while it is downloaded.
     to_file(filename: str, overwrite: bool = False)
         Save the TAR GZ file.
+    list_members(to_folder: str = ".")
+        Names of the files in the archive.
+    open_member(name: str, to_folder: str = ".")
+        Content of a single file of the archive.
 
     """
 
+    _index: Optional[TarGzIndex] = pd.PrivateAttr(None)
+
+    # pylint: disable=too-many-arguments
+    def download(
+        self,
+        to_file: str = None,
+        to_folder: str = ".",
+        overwrite: bool = False,
+        extract: bool = False,
+        members: Union[str, List[str]] = None,
+        **kwargs,
+    ):
+        """
+        Download the TAR GZ file to the specified location.
+
+        Parameters
+        ----------
+        to_file : str, optional
+            The name of the file after downloading, not used when extracting.
+        to_folder : str, optional
+            The folder where the file is downloaded, or the files of the archive are
+            extracted to.
+        overwrite : bool, optional
+            Flag indicating whether to overwrite existing files.
+        extract : bool, optional
+            Stream the archive through the gzip and tar decoders and write its files to
+            to_folder as they arrive, without writing the archive to disk.
+        members : str or list of str, optional
+            Glob patterns of the files to extract, e.g. "*.plt", by default all files.
+
+        Returns
+        -------
+        list of str or None
+            Paths of the extracted files when extract is True.
+        """
+
+        if not extract:
+            if members is not None:
+                raise Flow360ValueError("members can only be selected when extract=True")
+            return super().download(
+                to_file=to_file, to_folder=to_folder, overwrite=overwrite, **kwargs
+            )
+        if to_file is not None:
+            raise Flow360ValueError("to_file cannot be used with extract=True, use to_folder")
+        stream, size = self._open_stream_method(self._remote_path(), **kwargs)
+        with contextlib.closing(stream):
+            return extract_tar_stream(
+                stream,
+                to_folder,
+                members=members,
+                size=size,
+                file_name=self.remote_file_name,
+                overwrite=overwrite,
+            )
+
+    def _indexed_archive(self, to_folder: str) -> TarGzIndex:
+        """
+        Download the archive to to_folder unless it is up to date and load its index,
+        indexing the archive on first use.
+        """
+        if self.local_file_name is None:
+            archive = os.path.join(to_folder, os.path.basename(self.remote_file_name))
+            self.download(to_file=archive, overwrite=OVERWRITE_IF_CHANGED)
+            self.local_file_name = archive
+        if self._index is None or self._index.archive_mtime != os.path.getmtime(
+            self.local_file_name
+        ):
+            self._index = TarGzIndex.open(self.local_file_name)
+        return self._index
+
+    def list_members(self, to_folder: str = ".") -> List[str]:
+        """
+        Names of the files in the archive. The archive is downloaded to to_folder and
+        indexed on first use, the index is stored next to it.
+        """
+        return self._indexed_archive(to_folder).list_members()
+
+    def open_member(self, name: str, to_folder: str = "."):
+        """
+        Content of a single file of the archive as a binary file object. Decompression
+        resumes from the restart point of the archive index closest to the file, so the
+        whole archive is not decompressed for every file.
+
+        Parameters
+        ----------
+        name : str
+            Name of the file in the archive, as returned by list_members().
+        to_folder : str, optional
+            The folder where the archive is downloaded when it is not available locally.
+        """
+        return self._indexed_archive(to_folder).open_member(name)
+
     def to_file(self, filename, overwrite: bool = False):
         """
         Save the TAR GZ file.
@@ -503,6 +720,9 @@ class MonitorsResultModel(ResultTarGZModel):
                         self._monitors[name]._download_method = (
                             self._download_method
                         )  # pylint: disable=protected-access
+                        self._monitors[name]._download_fileobj_method = (
+                            self._download_fileobj_method
+                        )
 
         return self._monitor_names
 
@@ -580,6 +800,7 @@ class UserDefinedDynamicsResultModel(ResultBaseModel):
                         self._udds[name] = UserDefinedDynamicsCSVModel(remote_file_name=filename)
                         # pylint: disable=protected-access
                         self._udds[name]._download_method = self._download_method
+                        self._udds[name]._download_fileobj_method = self._download_fileobj_method
 
         return self._udd_names
 
@@ -700,6 +921,22 @@ class OptionallyDownloadableResultCSVModel(ResultCSVModel):
 
     _err_msg = "Case does not produced these results."
 
+    @contextlib.contextmanager
+    def _report_missing_results(self):
+        try:
+            yield
+        except CloudFileNotFoundError as err:
+            if self._is_downloadable() is False:
+                log.warning(self._err_msg)
+            else:
+                log.error(
+                    (
+                        "A problem occured when trying to download results:"
+                        f"{self.remote_file_name}"
+                    )
+                )
+                raise err
+
     def download(
         self, to_file: str = None, to_folder: str = ".", overwrite: bool = False, **kwargs
     ):
@@ -721,21 +958,15 @@ class OptionallyDownloadableResultCSVModel(ResultCSVModel):
             If the cloud file for the results is not found.
         """
 
-        try:
+        with self._report_missing_results():
             super().download(
                 to_file=to_file, to_folder=to_folder, overwrite=overwrite, log_error=False, **kwargs
             )
-        except CloudFileNotFoundError as err:
-            if self._is_downloadable() is False:
-                log.warning(self._err_msg)
-            else:
-                log.error(
-                    (
-                        "A problem occured when trying to download results:"
-                        f"{self.remote_file_name}"
-                    )
-                )
-                raise err
+
+    def _download_fileobj(self, fileobj, **kwargs):
+        with self._report_missing_results():
+            return super()._download_fileobj(fileobj, log_error=False, **kwargs)
+        return False
 
 
 class ActuatorDiskResultCSVModel(OptionallyDownloadableResultCSVModel):
@@ -0,0 +1,256 @@
+"""
+Random access to the members of tar.gz result archives.
+
+A one-time indexing pass over an archive records the offset and size of every tar member
+in the decompressed stream and saves them next to the archive in
+<archive>.flow360-index.json. A member is then read by resuming decompression at the
+closest gzip restart point before it, instead of decompressing the archive from the start.
+
+With the optional indexed_gzip package, restart points (a 32 KB window and the bit offset
+in the compressed stream, as in zlib's zran example) are exported to
+<archive>.flow360-index.gzidx, so they are available across sessions. The zlib module
+cannot resume inflation at a bit offset, so without indexed_gzip restart points are
+snapshots of the decompressor kept in memory: the first access in a session decompresses
+up to the member, later accesses resume from the snapshots.
+"""
+
+import io
+import os
+import tarfile
+import zlib
+from typing import Dict, List, Optional
+
+import pydantic as pd
+
+from ...exceptions import Flow360ValueError
+from ...log import log
+
+try:
+    import indexed_gzip
+
+    _INDEXED_GZIP_AVAILABLE = True
+except ImportError:
+    _INDEXED_GZIP_AVAILABLE = False
+
+_INDEX_SUFFIX = ".flow360-index.json"
+_GZIP_INDEX_SUFFIX = ".flow360-index.gzidx"
+# distance between restart points in the decompressed stream
+_SPACING = 16 * 1024 * 1024
+_READ_SIZE = 1024 * 1024
+
+
+class _Snapshot:
+    """decompressor state after consuming in_offset compressed bytes and producing out_offset"""
+
+    def __init__(self, in_offset: int, out_offset: int, decompressor):
+        self.in_offset = in_offset
+        self.out_offset = out_offset
+        self.decompressor = decompressor
+
+
+class _GzipReader(io.RawIOBase):
+    """
+    Sequential reader of a gzip file starting from a snapshot. A snapshot of the
+    decompressor is recorded in snapshots, keyed by out_offset // spacing, every spacing
+    bytes of output.
+    """
+
+    def __init__(self, file, snapshots: Dict[int, _Snapshot], start: _Snapshot = None):
+        super().__init__()
+        self._file = file
+        self._snapshots = snapshots
+        if start is None:
+            start = _Snapshot(0, 0, zlib.decompressobj(wbits=31))
+        self._in_offset = start.in_offset
+        self._out_offset = start.out_offset
+        self._decompressor = start.decompressor.copy()
+        self._member_output = start.out_offset > 0
+        self._input = b""
+        self._finished = False
+        self._file.seek(self._in_offset)
+
+    def readable(self):
+        return True
+
+    @property
+    def position(self) -> int:
+        """offset in the decompressed stream"""
+        return self._out_offset
+
+    def _snapshot(self):
+        bucket = self._out_offset // _SPACING
+        if bucket not in self._snapshots:
+            consumed = self._in_offset - len(self._input)
+            self._snapshots[bucket] = _Snapshot(
+                consumed, self._out_offset, self._decompressor.copy()
+            )
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = _READ_SIZE
+        while not self._finished:
+            if not self._input:
+                self._input = self._file.read(_READ_SIZE)
+                self._in_offset += len(self._input)
+                if not self._input:
+                    self._finished = True
+                    break
+            try:
+                output = self._decompressor.decompress(self._input, size)
+            except zlib.error:
+                if self._member_output:
+                    raise
+                # padding after the last gzip member
+                self._finished = True
+                break
+            if self._decompressor.eof:
+                # concatenated gzip members
+                self._input = self._decompressor.unused_data
+                self._decompressor = zlib.decompressobj(wbits=31)
+                self._member_output = False
+            else:
+                self._input = self._decompressor.unconsumed_tail
+                self._member_output = True
+            self._out_offset += len(output)
+            self._snapshot()
+            if output:
+                return output
+        return b""
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+    def skip(self, length: int):
+        """discard length bytes of decompressed output"""
+        while length > 0:
+            data = self.read(min(length, _READ_SIZE))
+            if not data:
+                raise EOFError("unexpected end of gzip stream")
+            length -= len(data)
+
+
+class TarMember(pd.BaseModel):
+    """a regular file in a tar archive, offset is the start of its data in the tar stream"""
+
+    name: str
+    offset: int
+    size: int
+
+
+class TarGzIndex(pd.BaseModel):
+    """
+    Index of the members of a tar.gz archive.
+    """
+
+    archive_size: int
+    archive_mtime: float
+    members: List[TarMember] = pd.Field(default_factory=list)
+
+    _archive: str = pd.PrivateAttr(None)
+    _snapshots: Dict[int, _Snapshot] = pd.PrivateAttr(default_factory=dict)
+    _indexed_gzip_file = pd.PrivateAttr(None)
+
+    @staticmethod
+    def index_path(archive: str) -> str:
+        """path of the index of archive"""
+        return archive + _INDEX_SUFFIX
+
+    @classmethod
+    def open(cls, archive: str, rebuild: bool = False):
+        """
+        Load the index of archive, building it when it does not exist or the archive
+        changed since it was built.
+        """
+        index = None if rebuild else cls.load(archive)
+        if index is None:
+            index = cls.build(archive)
+        return index
+
+    @classmethod
+    def load(cls, archive: str) -> Optional["TarGzIndex"]:
+        """load the index of archive if it is up to date"""
+        path = cls.index_path(archive)
+        if not os.path.exists(path):
+            return None
+        try:
+            index = cls.parse_file(path)
+        except (pd.ValidationError, ValueError) as error:
+            log.warning(f"Ignoring unreadable archive index {path}: {error}")
+            return None
+        stat = os.stat(archive)
+        if (index.archive_size, index.archive_mtime) != (stat.st_size, stat.st_mtime):
+            return None
+        index._archive = archive
+        return index
+
+    @classmethod
+    def build(cls, archive: str) -> "TarGzIndex":
+        """index archive by reading it once and save the index next to it"""
+        stat = os.stat(archive)
+        index = cls(archive_size=stat.st_size, archive_mtime=stat.st_mtime)
+        index._archive = archive
+        with open(archive, "rb") as file:
+            if _INDEXED_GZIP_AVAILABLE:
+                fileobj = index._gzip_file(import_index=False)
+                fileobj.seek(0)
+            else:
+                fileobj = _GzipReader(file, index._snapshots)
+            with tarfile.open(fileobj=fileobj, mode="r|") as tar:
+                for member in tar:
+                    if member.isfile():
+                        index.members.append(
+                            TarMember(name=member.name, offset=member.offset_data, size=member.size)
+                        )
+        if _INDEXED_GZIP_AVAILABLE:
+            fileobj.build_full_index()
+            fileobj.export_index(archive + _GZIP_INDEX_SUFFIX)
+        with open(cls.index_path(archive), "w", encoding="utf-8") as file:
+            file.write(index.json())
+        log.info(f"Indexed {len(index.members)} members of {archive}")
+        return index
+
+    def _gzip_file(self, import_index: bool = True):
+        if self._indexed_gzip_file is None:
+            self._indexed_gzip_file = indexed_gzip.IndexedGzipFile(self._archive, spacing=_SPACING)
+            gzip_index = self._archive + _GZIP_INDEX_SUFFIX
+            if import_index and os.path.exists(gzip_index):
+                self._indexed_gzip_file.import_index(gzip_index)
+        return self._indexed_gzip_file
+
+    def list_members(self) -> List[str]:
+        """names of the regular files in the archive"""
+        return [member.name for member in self.members]
+
+    def _member(self, name: str) -> TarMember:
+        for member in self.members:
+            if member.name == name:
+                return member
+        raise Flow360ValueError(f"{name} not found in {self._archive}")
+
+    def read(self, offset: int, size: int) -> bytes:
+        """size bytes of the decompressed tar stream starting at offset"""
+        if _INDEXED_GZIP_AVAILABLE:
+            fileobj = self._gzip_file()
+            fileobj.seek(offset)
+            return fileobj.read(size)
+        start = self._snapshots.get(offset // _SPACING)
+        if start is None or start.out_offset > offset:
+            before = [s for s in self._snapshots.values() if s.out_offset <= offset]
+            start = max(before, key=lambda snapshot: snapshot.out_offset, default=None)
+        with open(self._archive, "rb") as file:
+            reader = _GzipReader(file, self._snapshots, start=start)
+            reader.skip(offset - reader.position)
+            data = bytearray()
+            while len(data) < size:
+                chunk = reader.read(size - len(data))
+                if not chunk:
+                    raise EOFError("unexpected end of gzip stream")
+                data += chunk
+        return bytes(data)
+
+    def open_member(self, name: str) -> io.BytesIO:
+        """content of member name as a binary file object"""
+        member = self._member(name)
+        return io.BytesIO(self.read(member.offset, member.size))
@@ -0,0 +1,121 @@
+"""
+Streaming extraction of tar.gz result archives.
+
+The archive is read from a stream, e.g. the body of an S3 object, through gzip and tar
+decoders, and its members are written to the destination folder as they arrive. The
+archive itself is never written to disk.
+"""
+
+import fnmatch
+import io
+import os
+import tarfile
+from typing import List, Union
+
+from ...cloud.utils import _get_progress, _S3Action
+from ...exceptions import Flow360ValueError
+from ...log import log
+
+# reading the archive in large blocks keeps the per-read overhead of the stream low
+_BUFFER_SIZE = 1024 * 1024
+
+
+class _CountingReader(io.RawIOBase):
+    """readable wrapper around a stream reporting the number of bytes read to callback"""
+
+    def __init__(self, stream, callback):
+        super().__init__()
+        self._stream = stream
+        self._callback = callback
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        data = self._stream.read(size)
+        if data:
+            self._callback(len(data))
+        return data
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+
+def _matches(name: str, members: List[str]) -> bool:
+    return members is None or any(fnmatch.fnmatch(name, pattern) for pattern in members)
+
+
+def _check_member(member: tarfile.TarInfo, to_folder: str):
+    """reject members which would be written outside of to_folder"""
+    destination = os.path.realpath(to_folder)
+    path = os.path.realpath(os.path.join(destination, member.name))
+    if os.path.commonpath([destination, path]) != destination or os.path.isabs(member.name):
+        raise Flow360ValueError(f"Refusing to extract {member.name} outside of {to_folder}")
+
+
+def extract_tar_stream(
+    stream,
+    to_folder: str,
+    members: Union[str, List[str]] = None,
+    size: int = None,
+    file_name: str = "",
+    overwrite: bool = True,
+) -> List[str]:
+    """
+    Extract a tar.gz archive read sequentially from stream into to_folder.
+
+    Parameters
+    ----------
+    stream :
+        Readable binary stream of the compressed archive.
+    to_folder : str
+        The folder where the members are written.
+    members : str or list of str, optional
+        Glob patterns of the member names to extract, e.g. "*.plt"; all regular files and
+        directories are extracted by default.
+    size : int, optional
+        Size of the compressed archive, used for the progress bar.
+    file_name : str, optional
+        Name of the archive shown in the progress bar.
+    overwrite : bool, optional
+        Flag indicating whether to overwrite existing files, by default True.
+
+    Returns
+    -------
+    list of str
+        Paths of the extracted files.
+    """
+
+    if isinstance(members, str):
+        members = [members]
+    os.makedirs(to_folder, exist_ok=True)
+    extracted = []
+    with _get_progress(_S3Action.DOWNLOADING) as progress:
+        task_id = progress.add_task("download", filename=file_name, total=size)
+        reader = io.BufferedReader(
+            _CountingReader(stream, lambda n: progress.update(task_id, advance=n)),
+            buffer_size=_BUFFER_SIZE,
+        )
+        with tarfile.open(fileobj=reader, mode="r|gz") as tar:
+            for member in tar:
+                if not _matches(member.name, members):
+                    continue
+                if not (member.isfile() or member.isdir()):
+                    # links and special files are never extracted from result archives
+                    log.warning(f"Skipping {member.name}, not a regular file.")
+                    continue
+                _check_member(member, to_folder)
+                path = os.path.join(to_folder, member.name)
+                if member.isfile() and not overwrite and os.path.exists(path):
+                    log.info(f"Skipping {member.name}, file exists.")
+                    continue
+                if hasattr(tarfile, "data_filter"):
+                    tar.extract(member, to_folder, filter="data")
+                else:
+                    tar.extract(member, to_folder)
+                if member.isfile():
+                    extracted.append(path)
+    log.info(f"Extracted {len(extracted)} files to {to_folder}")
+    return extracted
@@ -0,0 +1,120 @@
+"""
+Seekable Zstandard format
+
+A seekable zstd file is a sequence of independent zstd frames followed by a seek table
+stored in a skippable frame, as specified by the zstd seekable format
+(contrib/seekable_format in the zstd repository). Standard decoders skip the seek table,
+so the file stays a regular .zst file, while readers aware of the table can decompress
+frames in parallel or decompress only the frames covering a byte range.
+
+Seek table layout, all integers little-endian:
+    skippable frame magic (u32), frame size (u32),
+    per frame: compressed size (u32), decompressed size (u32),
+    number of frames (u32), descriptor (u8), seekable magic (u32)
+"""
+
+import bisect
+import os
+import struct
+from typing import List, Optional, Tuple
+
+import zstandard as zstd
+
+from ..exceptions import Flow360ValueError
+
+SKIPPABLE_FRAME_MAGIC = 0x184D2A5E
+SEEKABLE_MAGIC = 0x8F92EAB1
+_FOOTER_SIZE = 9
+_ENTRY_SIZE = 8
+# frame sizes are stored as u32
+MAX_FRAME_SIZE = 0xFFFFFFFF
+
+
+def compress_frame(data, level: int = 3) -> bytes:
+    """compress data into an independent zstd frame which records its content size"""
+    return zstd.ZstdCompressor(level=level, write_content_size=True).compress(data)
+
+
+def seek_table(frames: List[Tuple[int, int]]) -> bytes:
+    """
+    Seek table of frames, a list of (compressed size, decompressed size) tuples, as a
+    skippable zstd frame.
+    """
+    entries = b"".join(struct.pack("<II", compressed, size) for compressed, size in frames)
+    footer = struct.pack("<IBI", len(frames), 0, SEEKABLE_MAGIC)
+    header = struct.pack("<II", SKIPPABLE_FRAME_MAGIC, len(entries) + len(footer))
+    return header + entries + footer
+
+
+def read_seek_table(file) -> Optional[List[Tuple[int, int]]]:
+    """
+    Read the seek table at the end of a seekable binary file object.
+
+    Returns the list of (compressed size, decompressed size) of the frames, or None when
+    the file has no seek table.
+    """
+    file.seek(0, os.SEEK_END)
+    size = file.tell()
+    if size < _FOOTER_SIZE + 8:
+        return None
+    file.seek(size - _FOOTER_SIZE)
+    count, descriptor, magic = struct.unpack("<IBI", file.read(_FOOTER_SIZE))
+    if magic != SEEKABLE_MAGIC:
+        return None
+    entry_size = _ENTRY_SIZE + (4 if descriptor & 0x80 else 0)
+    table_size = 8 + count * entry_size + _FOOTER_SIZE
+    if table_size > size:
+        raise Flow360ValueError("Invalid seek table, it is larger than the file")
+    file.seek(size - table_size)
+    data = file.read(table_size)
+    skippable_magic, frame_size = struct.unpack_from("<II", data)
+    if skippable_magic != SKIPPABLE_FRAME_MAGIC or frame_size != table_size - 8:
+        raise Flow360ValueError("Invalid seek table header")
+    frames = [struct.unpack_from("<II", data, 8 + index * entry_size) for index in range(count)]
+    if sum(compressed for compressed, _ in frames) != size - table_size:
+        raise Flow360ValueError("Seek table does not match the size of the file")
+    return frames
+
+
+class SeekableZstdFile:
+    """
+    Random access to the decompressed content of a local seekable zstd file.
+    """
+
+    def __init__(self, file_name: str):
+        self.file_name = file_name
+        with open(file_name, "rb") as file:
+            frames = read_seek_table(file)
+        if frames is None:
+            raise Flow360ValueError(f"{file_name} has no zstd seek table")
+        self.frames = frames
+        # start offsets of every frame in the compressed and decompressed content
+        self.compressed_offsets = [0]
+        self.offsets = [0]
+        for compressed, size in frames:
+            self.compressed_offsets.append(self.compressed_offsets[-1] + compressed)
+            self.offsets.append(self.offsets[-1] + size)
+
+    @property
+    def size(self) -> int:
+        """size of the decompressed content"""
+        return self.offsets[-1]
+
+    def read_frame(self, index: int) -> bytes:
+        """decompressed content of frame index"""
+        with open(self.file_name, "rb") as file:
+            file.seek(self.compressed_offsets[index])
+            data = file.read(self.frames[index][0])
+        return zstd.ZstdDecompressor().decompress(data, max_output_size=self.frames[index][1])
+
+    def read(self, offset: int, length: int) -> bytes:
+        """decompressed content from offset to offset + length, decompressing only the
+        frames covering the range"""
+        end = min(offset + length, self.size)
+        if offset >= end:
+            return b""
+        first = bisect.bisect_right(self.offsets, offset) - 1
+        last = bisect.bisect_left(self.offsets, end) - 1
+        data = b"".join(self.read_frame(index) for index in range(first, last + 1))
+        start = offset - self.offsets[first]
+        return data[start : start + end - offset]
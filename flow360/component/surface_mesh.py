@@ -11,8 +11,10 @@ from typing import Iterator, List, Union
 import pydantic as pd
 
 from ..cloud.rest_api import RestApi
+from ..cloud.upload_registry import UploadRegistry, hash_file
 from ..exceptions import Flow360FileError, Flow360ValueError
 from ..log import log
+from .batch_upload import upload_files
 from .flow360_params.params_base import params_generic_validator
 from .interfaces import SurfaceMeshInterface
 from .meshing.params import SurfaceMeshingParams, VolumeMeshingParams
@@ -102,13 +104,17 @@ class SurfaceMeshDraft(ResourceDraft):
         return self._geometry_file
 
     # pylint: disable=protected-access
-    def submit(self, progress_callback=None) -> SurfaceMesh:
+    def submit(self, progress_callback=None, dedupe: bool = False) -> SurfaceMesh:
         """submit surface meshing to cloud
 
         Parameters
         ----------
         progress_callback : callback, optional
             Use for custom progress bar, by default None
+        dedupe : bool, optional
+            Return the existing SurfaceMesh when a geometry file with identical content was
+            already submitted from this machine with the same solver version and meshing
+            params, by default False.
 
         Returns
         -------
@@ -116,6 +122,70 @@ class SurfaceMeshDraft(ResourceDraft):
             SurfaceMesh object with id
         """
 
+        registry = UploadRegistry.load() if dedupe else None
+        submitted_mesh, remote_file_name, registration = self._create_for_upload(registry)
+        if remote_file_name is None:
+            return submitted_mesh
+        submitted_mesh._upload_file(
+            remote_file_name, self.geometry_file, progress_callback=progress_callback
+        )
+        self._finish_upload(submitted_mesh, remote_file_name, registration)
+        return submitted_mesh
+
+    @classmethod
+    def submit_all(
+        cls,
+        drafts: List[SurfaceMeshDraft],
+        progress_callback=None,
+        dedupe: bool = False,
+        max_concurrent_files: int = None,
+    ) -> List[SurfaceMesh]:
+        """submit several surface meshings to cloud, uploading their geometry files
+        concurrently with one progress bar
+
+        Parameters
+        ----------
+        drafts : List[SurfaceMeshDraft]
+            Surface mesh drafts to submit
+        progress_callback : callback, optional
+            Use for custom progress bar of all uploads, by default None
+        dedupe : bool, optional
+            Return the existing SurfaceMesh for geometry files already submitted from this
+            machine, see submit(), by default False.
+        max_concurrent_files : int, optional
+            Number of geometry files uploaded at the same time, by default 8
+
+        Returns
+        -------
+        List[SurfaceMesh]
+            SurfaceMesh objects with id, in the order of drafts
+        """
+
+        # drafts share one registry, so every registration of the batch is kept on save
+        registry = UploadRegistry.load() if dedupe else None
+        created = [draft._create_for_upload(registry) for draft in drafts]
+        jobs = [
+            (submitted_mesh, remote_file_name, draft.geometry_file)
+            for draft, (submitted_mesh, remote_file_name, _) in zip(drafts, created)
+            if remote_file_name is not None
+        ]
+        upload_kwargs = {}
+        if max_concurrent_files is not None:
+            upload_kwargs["max_concurrent_files"] = max_concurrent_files
+        upload_files(jobs, progress_callback=progress_callback, **upload_kwargs)
+        for draft, (submitted_mesh, remote_file_name, registration) in zip(drafts, created):
+            if remote_file_name is not None:
+                draft._finish_upload(submitted_mesh, remote_file_name, registration)
+        return [submitted_mesh for submitted_mesh, _, _ in created]
+
+    def _create_for_upload(self, registry: UploadRegistry = None):
+        """
+        Validate the draft and create the surface mesh. Returns the surface mesh, the remote
+        name of its geometry file and the upload registration, or the existing surface mesh
+        and None twice when it is found in registry. Without registry, the geometry file is
+        not deduplicated.
+        """
+
         self._validate()
         name = self.name
         if name is None:
@@ -124,6 +194,23 @@ class SurfaceMeshDraft(ResourceDraft):
         if not shared_account_confirm_proceed():
             raise Flow360ValueError("User aborted resource submit.")
 
+        registration = None
+        if registry is not None:
+            content_hash = registry.content_hash(self.geometry_file) or hash_file(
+                self.geometry_file
+            )
+            registry_key = UploadRegistry.resource_key(
+                SurfaceMesh.__name__,
+                content_hash,
+                self.solver_version,
+                self.params.flow360_json(),
+            )
+            surface_mesh = self._find_uploaded(registry, registry_key, SurfaceMesh)
+            if surface_mesh is not None:
+                self._id = surface_mesh.id
+                return surface_mesh, None, None
+            registration = (registry, content_hash, registry_key)
+
         data = {
             "name": self.name,
             "tags": self.tags,
@@ -140,13 +227,14 @@ class SurfaceMeshDraft(ResourceDraft):
         submitted_mesh = SurfaceMesh(self.id)
 
         _, ext = os.path.splitext(self.geometry_file)
-        remote_file_name = f"geometry{ext}"
-        submitted_mesh._upload_file(
-            remote_file_name, self.geometry_file, progress_callback=progress_callback
-        )
+        return submitted_mesh, f"geometry{ext}", registration
+
+    def _finish_upload(self, submitted_mesh: SurfaceMesh, remote_file_name: str, registration):
         submitted_mesh._complete_upload(remote_file_name)
+        if registration is not None:
+            registry, content_hash, registry_key = registration
+            registry.register(self.geometry_file, content_hash, registry_key, submitted_mesh.id)
         log.info(f"SurfaceMesh successfully submitted: {submitted_mesh.short_description()}")
-        return submitted_mesh
 
     @classmethod
     def validator_api(cls, params: SurfaceMeshingParams, solver_version=None):
@@ -240,7 +328,7 @@ class SurfaceMesh(Flow360Resource):
         :return:
         """
         resp = self.post({}, method=f"completeUpload?fileName={remote_file_name}")
-        self._info = SurfaceMeshMeta(**resp)
+        self._update_info(SurfaceMeshMeta(**resp))
 
     @classmethod
     def from_cloud(cls, surface_mesh_id: str):
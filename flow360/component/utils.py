@@ -10,7 +10,7 @@ from tempfile import NamedTemporaryFile
 import zstandard as zstd
 
 from ..accounts_utils import Accounts
-from ..cloud.utils import _get_progress, _S3Action
+from ..cloud.utils import _get_progress, _S3Action, _ThrottledProgress
 from ..error_messages import shared_submit_warning
 from ..exceptions import Flow360TypeError, Flow360ValueError
 from ..log import log
@@ -108,39 +108,90 @@ def validate_type(value, parameter_name: str, expected_type):
         )
 
 
-# pylint: disable=consider-using-with
-def zstd_compress(file_path, output_file_path=None, compression_level=3):
+def validate_zstd_level(compression_level: int):
+    """
+    Validate a Zstandard compression level
+
+    Parameters
+    ----------
+    compression_level : int
+        level from 1 to zstd.MAX_COMPRESSION_LEVEL, or negative for the faster modes
+
+    Raises
+    ------
+    Flow360ValueError
+        when the level is not supported by zstd
+    """
+    if not -(1 << 17) <= compression_level <= zstd.MAX_COMPRESSION_LEVEL or compression_level == 0:
+        raise Flow360ValueError(
+            f"compression_level must be between 1 and {zstd.MAX_COMPRESSION_LEVEL} "
+            f"or negative, got {compression_level}"
+        )
+
+
+# Size of the reads from the input file of zstd_compress
+_ZSTD_READ_SIZE = 16 * 1024 * 1024
+
+
+# pylint: disable=consider-using-with, too-many-arguments, too-many-locals
+def zstd_compress(
+    file_path,
+    output_file_path=None,
+    compression_level=3,
+    threads=-1,
+    progress_callback=None,
+    read_size=_ZSTD_READ_SIZE,
+):
     """
     Compresses the file located at 'file_path' using Zstandard compression.
 
+    The file is read in large blocks into a reused buffer and compressed by zstd worker
+    threads, so Python only runs a few iterations per block. Progress is reported at most
+    ten times per second.
+
     Args:
         file_path (str): The path to the input file that needs to be compressed.
         output_file_path (str, optional): The path where the compressed data will be written as a new file.
                                          If not provided, a temporary file with a ".zst" suffix will be created.
-        compression_level (int, optional): The compression level used by the Zstandard compressor (default is 3).
+        compression_level (int, optional): The compression level used by the Zstandard compressor,
+                                           from 1 to 22 or negative for faster modes (default is 3).
+        threads (int, optional): Number of zstd worker threads, -1 uses all CPU cores and 0 compresses
+                                 on the calling thread (default is -1).
+        progress_callback (ProgressCallbackInterface, optional): Custom progress callback, reports the
+                                                                 number of input bytes compressed.
+        read_size (int, optional): Size of the blocks read from the input file (default is 16 MB).
 
     Returns:
         str or None: The path to the compressed file if successful, or None if an error occurred.
     """
+    validate_zstd_level(compression_level)
     try:
-        cctx = zstd.ZstdCompressor(level=compression_level)
+        file_size = os.path.getsize(file_path)
+        cctx = zstd.ZstdCompressor(level=compression_level, threads=threads)
         if not output_file_path:
             output_file_path = NamedTemporaryFile(suffix=".zst").name
-        with open(file_path, "rb") as f_in, open(output_file_path, "wb") as f_out:
-            with cctx.stream_writer(f_out) as compressor, _get_progress(
-                _S3Action.COMPRESSING
-            ) as progress:
+        with open(file_path, "rb", buffering=0) as f_in, open(
+            output_file_path, "wb"
+        ) as f_out, _get_progress(_S3Action.COMPRESSING) as progress:
+            if progress_callback is not None:
+                progress_callback.total = file_size
+                on_progress = _ThrottledProgress(progress_callback)
+            else:
                 task_id = progress.add_task(
-                    "Compressing file",
-                    filename=os.path.basename(file_path),
-                    total=os.path.getsize(file_path),
+                    "Compressing file", filename=os.path.basename(file_path), total=file_size
+                )
+                on_progress = _ThrottledProgress(
+                    lambda advance: progress.update(task_id, advance=advance)
                 )
+            buffer = memoryview(bytearray(read_size))
+            with cctx.stream_writer(f_out, size=file_size, closefd=False) as compressor:
                 while True:
-                    chunk = f_in.read(1024)
-                    if not chunk:
+                    length = f_in.readinto(buffer)
+                    if not length:
                         break
-                    compressor.write(chunk)
-                    progress.update(task_id, advance=len(chunk))
+                    compressor.write(buffer[:length])
+                    on_progress(length)
+            on_progress.flush()
         return output_file_path
     except (zstd.ZstdError, FileNotFoundError, IOError) as error:
         log.error(f"Error occurred while compressing the file: {error}")
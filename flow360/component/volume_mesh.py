@@ -11,10 +11,18 @@ from typing import Iterator, List, Optional, Union
 import numpy as np
 from pydantic import Extra, Field, validator
 
-from flow360.component.compress_upload import compress_and_upload_chunks
+from flow360.component.compress_upload import (
+    _CHUNK_LENGTH,
+    compress_and_upload_chunks,
+    seekable_zstd_compress_and_upload_chunks,
+    zstd_compress_and_upload_chunks,
+)
 
 from ..cloud.requests import CopyExampleVolumeMeshRequest, NewVolumeMeshRequest
 from ..cloud.rest_api import RestApi
+from ..cloud.s3_utils import OVERWRITE_IF_CHANGED
+from ..cloud.upload_journal import UploadJournal
+from ..cloud.upload_registry import UploadRegistry, hash_file, new_content_hasher
 from ..exceptions import (
     Flow360CloudFileError,
     Flow360FileError,
@@ -25,6 +33,7 @@ from ..exceptions import (
 from ..log import log
 from ..solver_version import Flow360Version
 from .case import Case, CaseDraft
+from .decompress import decompress_file
 from .flow360_params.boundaries import NoSlipWall
 from .flow360_params.flow360_params import (
     Flow360MeshParams,
@@ -41,7 +50,7 @@ from .resource_base import (
     ResourceDraft,
 )
 from .types import COMMENTS
-from .utils import shared_account_confirm_proceed, validate_type, zstd_compress
+from .utils import shared_account_confirm_proceed, validate_type, validate_zstd_level
 from .validator import Validator
 
 try:
@@ -405,6 +414,11 @@ class VolumeMeshDraft(ResourceDraft):
         self.solver_version = solver_version
         self._id = None
         self.compress_method = CompressionFormat.ZST
+        # upload .zst meshes as independent frames with a seek table (seekable zstd format)
+        self.seekable_zstd = False
+        # level and number of worker threads of zstd compression, -1 uses all CPU cores
+        self.zstd_level = 3
+        self.zstd_threads = -1
         ResourceDraft.__init__(self)
 
     def _submit_from_surface(self):
@@ -430,26 +444,7 @@ class VolumeMeshDraft(ResourceDraft):
         log.info(f"VolumeMesh successfully submitted: {mesh.short_description()}")
         return mesh
 
-    # pylint: disable=protected-access, too-many-locals
-    def _submit_upload_mesh(self, progress_callback=None):
-        assert os.path.exists(self.file_name)
-
-        original_compression, file_name_no_compression = CompressionFormat.detect(self.file_name)
-        mesh_format = VolumeMeshFileFormat.detect(file_name_no_compression)
-        endianness = UGRIDEndianness.detect(file_name_no_compression)
-        if mesh_format is VolumeMeshFileFormat.CGNS:
-            remote_file_name = "volumeMesh"
-        else:
-            remote_file_name = "mesh"
-        compression = (
-            original_compression
-            if original_compression != CompressionFormat.NONE
-            else self.compress_method
-        )
-        remote_file_name = (
-            f"{remote_file_name}{endianness.ext()}{mesh_format.ext()}{compression.ext()}"
-        )
-
+    def _create_for_upload(self, remote_file_name, mesh_format, endianness, compression):
         name = self.name
         if name is None:
             name = os.path.splitext(os.path.basename(self.file_name))[0]
@@ -470,39 +465,165 @@ class VolumeMeshDraft(ResourceDraft):
 
         info = VolumeMeshMeta(**resp)
         self._id = info.id
-        mesh = VolumeMesh(self.id)
+        return VolumeMesh(self.id)
 
-        # parallel compress and upload
-        if (
-            original_compression == CompressionFormat.NONE
-            and self.compress_method == CompressionFormat.BZ2
-        ):
-            upload_id = mesh.create_multipart_upload(remote_file_name)
-            compress_and_upload_chunks(self.file_name, upload_id, mesh, remote_file_name)
+    def _registry_key(self, content_hash: str) -> str:
+        params = self.params.flow360_json() if self.params is not None else None
+        return UploadRegistry.resource_key(
+            VolumeMesh.__name__, content_hash, self.solver_version, params
+        )
 
-        elif (
-            original_compression == CompressionFormat.NONE
-            and self.compress_method == CompressionFormat.ZST
-        ):
-            compressed_file_name = zstd_compress(self.file_name)
-            mesh._upload_file(
-                remote_file_name, compressed_file_name, progress_callback=progress_callback
-            )
-            os.remove(compressed_file_name)
+    # pylint: disable=protected-access, too-many-locals, too-many-branches, too-many-statements
+    def _submit_upload_mesh(
+        self, progress_callback=None, resume: bool = False, dedupe: bool = False
+    ):
+        assert os.path.exists(self.file_name)
+
+        original_compression, file_name_no_compression = CompressionFormat.detect(self.file_name)
+        mesh_format = VolumeMeshFileFormat.detect(file_name_no_compression)
+        endianness = UGRIDEndianness.detect(file_name_no_compression)
+        if mesh_format is VolumeMeshFileFormat.CGNS:
+            remote_file_name = "volumeMesh"
+        else:
+            remote_file_name = "mesh"
+        compression = (
+            original_compression
+            if original_compression != CompressionFormat.NONE
+            else self.compress_method
+        )
+        remote_file_name = (
+            f"{remote_file_name}{endianness.ext()}{mesh_format.ext()}{compression.ext()}"
+        )
+        compress_on_upload = original_compression == CompressionFormat.NONE and (
+            self.compress_method in [CompressionFormat.BZ2, CompressionFormat.ZST]
+        )
+        if compress_on_upload and self.compress_method == CompressionFormat.ZST:
+            validate_zstd_level(self.zstd_level)
+
+        registry = UploadRegistry.load() if dedupe else None
+        content_hash = None
+        if dedupe:
+            content_hash = registry.content_hash(self.file_name)
+            if content_hash is None and not compress_on_upload:
+                # there is no compression pass to compute the hash in
+                content_hash = hash_file(self.file_name)
+            if content_hash is not None:
+                mesh = self._find_uploaded(registry, self._registry_key(content_hash), VolumeMesh)
+                if mesh is not None:
+                    self._id = mesh.id
+                    return mesh
+
+        journal = UploadJournal.find(self.file_name, remote_file_name) if resume else None
+        if journal is not None:
+            self._id = journal.resource_id
+            mesh = VolumeMesh(self.id)
+            log.info(f"Resuming upload of {self.file_name} to VolumeMesh id={self.id}")
+            if (
+                compress_on_upload
+                and self.compress_method == CompressionFormat.ZST
+                and not journal.seekable
+                and not journal.zstd_version_matches()
+            ):
+                # another zstd version may compress the file to bytes that do not continue the
+                # parts uploaded before, so the mesh is uploaded again from the start
+                log.warning(
+                    f"{self.file_name} was partially uploaded with a different zstd version, "
+                    "restarting the upload."
+                )
+                journal.delete()
+                journal = None
+        else:
+            mesh = self._create_for_upload(remote_file_name, mesh_format, endianness, compression)
+            if mesh is None:
+                return None
+
+        # parallel compress and upload
+        hasher = None
+        if compress_on_upload:
+            # a resumed upload keeps the format it was started with
+            seekable = journal.seekable if journal is not None else self.seekable_zstd
+            if dedupe and content_hash is None:
+                # resumed bz2 and seekable zstd uploads do not read the parts uploaded before
+                if journal is None or (
+                    self.compress_method == CompressionFormat.ZST and not seekable
+                ):
+                    hasher = new_content_hasher()
+            if journal is None:
+                upload_id = mesh.create_multipart_upload(remote_file_name)
+                journal = UploadJournal.create(
+                    mesh.id,
+                    remote_file_name,
+                    upload_id,
+                    self.file_name,
+                    _CHUNK_LENGTH,
+                    seekable=seekable and self.compress_method == CompressionFormat.ZST,
+                    zstd_level=self.zstd_level,
+                    zstd_multithreaded=self.zstd_threads != 0,
+                )
+            if self.compress_method == CompressionFormat.BZ2:
+                compress_and_upload_chunks(
+                    self.file_name,
+                    journal.upload_id,
+                    mesh,
+                    remote_file_name,
+                    journal=journal,
+                    hasher=hasher,
+                )
+            elif seekable:
+                seekable_zstd_compress_and_upload_chunks(
+                    self.file_name,
+                    journal.upload_id,
+                    mesh,
+                    remote_file_name,
+                    compression_level=self.zstd_level,
+                    progress_callback=progress_callback,
+                    journal=journal,
+                    hasher=hasher,
+                )
+            else:
+                zstd_compress_and_upload_chunks(
+                    self.file_name,
+                    journal.upload_id,
+                    mesh,
+                    remote_file_name,
+                    compression_level=self.zstd_level,
+                    progress_callback=progress_callback,
+                    journal=journal,
+                    hasher=hasher,
+                    threads=self.zstd_threads,
+                )
         else:
             mesh._upload_file(remote_file_name, self.file_name, progress_callback=progress_callback)
         mesh._complete_upload(remote_file_name)
 
+        if hasher is not None:
+            content_hash = hasher.hexdigest()
+        if content_hash is not None:
+            registry.register(
+                self.file_name, content_hash, self._registry_key(content_hash), mesh.id
+            )
+
         log.info(f"VolumeMesh successfully uploaded: {mesh.short_description()}")
         return mesh
 
-    def submit(self, progress_callback=None) -> VolumeMesh:
+    def submit(
+        self, progress_callback=None, resume: bool = False, dedupe: bool = False
+    ) -> VolumeMesh:
         """submit mesh to cloud
 
         Parameters
         ----------
         progress_callback : callback, optional
             Use for custom progress bar, by default None
+        resume : bool, optional
+            Resume an interrupted upload of the same file, by default False. Only the parts
+            missing from the local upload journal (~/.flow360/uploads) are uploaded. When no
+            unfinished upload of this file is found, the mesh is submitted as usual.
+        dedupe : bool, optional
+            Return the existing VolumeMesh when a file with identical content was already
+            uploaded from this machine with the same solver version and params, by default
+            False. Uploaded files are recorded in ~/.flow360/upload_registry.json; their content
+            hash is computed while the file is compressed for upload.
 
         Returns
         -------
@@ -514,7 +635,7 @@ class VolumeMeshDraft(ResourceDraft):
             raise Flow360ValueError("User aborted resource submit.")
 
         if self.file_name is not None:
-            return self._submit_upload_mesh(progress_callback)
+            return self._submit_upload_mesh(progress_callback, resume=resume, dedupe=dedupe)
 
         if self.surface_mesh_id is not None and self.name is not None and self.params is not None:
             return self._submit_from_surface()
@@ -609,11 +730,21 @@ class VolumeMesh(Flow360Resource):
         )
 
     # pylint: disable=R0801
-    def download(self, to_file=None, to_folder=".", overwrite: bool = True):
+    def download(
+        self,
+        to_file=None,
+        to_folder=".",
+        overwrite: Union[bool, str] = True,
+        decompress: bool = False,
+        decompression_workers: int = None,
+    ):
         """
         Download volume mesh file
         :param to_file:
-        :return:
+        :param decompress: if True, a compressed mesh is also decompressed next to the
+        downloaded file, multi-stream bz2 meshes concurrently on decompression_workers threads
+        (default is the number of CPU cores)
+        :return: path of the downloaded file, or of the decompressed file when decompress is True
         """
         status = self.status
         if not status.is_final():
@@ -624,12 +755,27 @@ class VolumeMesh(Flow360Resource):
         if remote_file_name is None:
             remote_file_name = self._remote_file_name()
 
-        return super()._download_file(
+        file_name = super()._download_file(
             remote_file_name,
             to_file=to_file,
             to_folder=to_folder,
             overwrite=overwrite,
         )
+        if not decompress or file_name is None:
+            return file_name
+        compression, decompressed_file_name = CompressionFormat.detect(file_name)
+        if compression == CompressionFormat.NONE:
+            return file_name
+        if os.path.exists(decompressed_file_name) and (
+            overwrite is False
+            or (
+                overwrite == OVERWRITE_IF_CHANGED
+                and os.path.getmtime(decompressed_file_name) >= os.path.getmtime(file_name)
+            )
+        ):
+            log.info(f"Skipping decompression, {decompressed_file_name} exists.")
+            return decompressed_file_name
+        return decompress_file(file_name, decompressed_file_name, workers=decompression_workers)
 
     def _complete_upload(self, remote_file_name):
         """
@@ -637,7 +783,7 @@ class VolumeMesh(Flow360Resource):
         :return:
         """
         resp = self.post({}, method=f"completeUpload?fileName={remote_file_name}")
-        self._info = VolumeMeshMeta(**resp)
+        self._update_info(VolumeMeshMeta(**resp))
 
     @classmethod
     def _interface(cls):
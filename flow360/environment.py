@@ -16,6 +16,8 @@ class EnvironmentConfig(BaseModel):
     aws_region: str
     apikey_profile: str
     portal_web_api_endpoint: str = None
+    # S3 endpoint of an S3-compatible storage, the AWS endpoint of aws_region by default
+    s3_endpoint_url: str = None
 
     def active(self):
         """
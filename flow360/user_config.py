@@ -11,8 +11,10 @@ from .log import log
 
 config_file = os.path.join(flow360_dir, "config.toml")
 DEFAULT_PROFILE = "default"
+DEFAULT_CACHE_SIZE_MB = 2048
 
 
+# pylint: disable=too-many-instance-attributes
 class BasicUserConfig:
     """
     Basic User Configuration.
@@ -26,6 +28,9 @@ class BasicUserConfig:
         self._check_env_apikey()
         self._do_validation = True
         self._suppress_submit_warning = None
+        self._cache_size_mb = None
+        self._max_bandwidth_mb = None
+        self._metadata_ttl = None
 
     def _check_env_profile(self):
         simcloud_profile = os.environ.get("SIMCLOUD_PROFILE", None)
@@ -105,6 +110,64 @@ class BasicUserConfig:
         """cancel local submit warning settings"""
         self._suppress_submit_warning = None
 
+    @property
+    def cache_size_mb(self):
+        """size limit of the local download cache
+
+        Returns
+        -------
+        int
+            size limit in MB, 0 when the cache is disabled
+        """
+        if self._cache_size_mb is not None:
+            return self._cache_size_mb
+        return (
+            self.config.get("user", {})
+            .get("config", {})
+            .get("cache_size_mb", DEFAULT_CACHE_SIZE_MB)
+        )
+
+    def set_cache_size_mb(self, size_mb: int = None):
+        """locally set size limit of the local download cache, 0 disables the cache,
+        None restores the value from config.toml"""
+        self._cache_size_mb = size_mb
+
+    @property
+    def max_bandwidth_mb(self):
+        """bandwidth cap shared by all uploads and downloads
+
+        Returns
+        -------
+        float
+            cap in MB/s, 0 when transfers are not capped
+        """
+        if self._max_bandwidth_mb is not None:
+            return self._max_bandwidth_mb
+        return self.config.get("user", {}).get("config", {}).get("max_bandwidth_mb", 0)
+
+    def set_max_bandwidth_mb(self, bandwidth_mb: float = None):
+        """locally set the bandwidth cap of uploads and downloads in MB/s, 0 removes the
+        cap, None restores the value from config.toml"""
+        self._max_bandwidth_mb = bandwidth_mb
+
+    @property
+    def metadata_ttl(self):
+        """time the metadata of a resource in progress is reused before it is requested again
+
+        Returns
+        -------
+        float
+            TTL in seconds, 0 requests the metadata on every access
+        """
+        if self._metadata_ttl is not None:
+            return self._metadata_ttl
+        return self.config.get("user", {}).get("config", {}).get("metadata_ttl", 2)
+
+    def set_metadata_ttl(self, ttl: float = None):
+        """locally set the TTL of the metadata of resources in progress in seconds, None
+        restores the value from config.toml"""
+        self._metadata_ttl = ttl
+
     @property
     def do_validation(self):
         """for handling user side validation (pydantic)
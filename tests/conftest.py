@@ -3,6 +3,7 @@ import tempfile
 
 import pytest
 
+from flow360.cloud.metadata_cache import metadata_cache
 from flow360.file_path import flow360_dir
 from flow360.log import log, set_logging_file
 
@@ -31,3 +32,9 @@ def before_log_test():
 def after_log_test():
     yield
     set_logging_file(pytest.tmp_log_file, level="DEBUG")
+
+
+@pytest.fixture(autouse=True)
+def clear_metadata_cache():
+    # resources of different tests share mock ids
+    metadata_cache.invalidate()
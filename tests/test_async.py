@@ -0,0 +1,59 @@
+import asyncio
+import threading
+import time
+
+from flow360 import Case, Folder, VolumeMesh
+from flow360.cloud.http_util import AsyncHttp
+from flow360.component.resource_base import Flow360Status
+
+from .mock_server import mock_response
+from .utils import mock_id
+
+
+def test_get_info_async(mock_response):
+    case = Case(mock_id)
+    info = asyncio.run(case.get_info_async())
+    assert info.id == case.info.id
+    assert asyncio.run(case.status_async()) == Flow360Status.COMPLETED
+
+
+def test_get_info_async_custom_metadata_url(mock_response):
+    # folders request their metadata from folders/items/{id}/metadata
+    folder = Folder("folder-3834758b-3d39-4a4a-ad85-710b7652267c")
+    info = asyncio.run(folder.get_info_async(force=True))
+    assert info == Folder("folder-3834758b-3d39-4a4a-ad85-710b7652267c").info
+
+
+def test_wait_async_many_resources(mock_response):
+    async def wait_all(resources):
+        await asyncio.gather(*(resource.wait_async(timeout_minutes=1) for resource in resources))
+        return [resource.info.status for resource in resources]
+
+    resources = [Case(mock_id) for _ in range(20)] + [VolumeMesh(mock_id) for _ in range(20)]
+    statuses = asyncio.run(wait_all(resources))
+    assert all(status.is_final() for status in statuses)
+
+
+def test_async_http_bounded_concurrency():
+    class SlowClient:
+        def __init__(self):
+            self.in_flight = 0
+            self.max_in_flight = 0
+            self._lock = threading.Lock()
+
+        def get(self, path, json=None, params=None):
+            with self._lock:
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            time.sleep(0.01)
+            with self._lock:
+                self.in_flight -= 1
+            return path
+
+    async def get_all(client):
+        return await asyncio.gather(*(client.get(f"path/{i}") for i in range(50)))
+
+    slow = SlowClient()
+    results = asyncio.run(get_all(AsyncHttp(slow, max_concurrency=4)))
+    assert results == [f"path/{i}" for i in range(50)]
+    assert slow.max_in_flight <= 4
@@ -0,0 +1,164 @@
+import os
+import threading
+import time
+
+import pytest
+
+from flow360.cloud import upload_registry
+from flow360.cloud.upload_registry import UploadRegistry
+from flow360.component import surface_mesh
+from flow360.component.batch_upload import upload_files
+from flow360.component.meshing.params import Face, SurfaceMeshingParams
+from flow360.component.surface_mesh import (
+    SurfaceMesh,
+    SurfaceMeshDraft,
+    SurfaceMeshMeta,
+)
+
+
+class FakeResource:
+    def __init__(self, resource_id, fail=False):
+        self.id = resource_id
+        self.fail = fail
+        self.uploaded = {}
+        self._lock = threading.Lock()
+
+    def _upload_file(self, remote_file_name, file_name, progress_callback=None):
+        size = os.path.getsize(file_name)
+        progress_callback.total = size
+        for _ in range(4):
+            time.sleep(0.05)
+            if self.fail:
+                raise ConnectionError("connection dropped")
+            progress_callback(size // 4)
+        with self._lock:
+            self.uploaded[remote_file_name] = file_name
+
+
+class Progress:
+    def __init__(self):
+        self.total = None
+        self.transferred = 0
+
+    def __call__(self, size):
+        self.transferred += size
+
+
+@pytest.fixture
+def files(tmp_path):
+    names = []
+    for i in range(6):
+        name = os.path.join(tmp_path, f"file-{i}.csm")
+        with open(name, "wb") as fh:
+            fh.write(b"x" * 1024 * (i + 1))
+        names.append(name)
+    return names
+
+
+def test_upload_files_concurrently(files):
+    resources = [FakeResource(f"id-{i}") for i in range(len(files))]
+    progress = Progress()
+
+    start = time.monotonic()
+    upload_files(
+        [(resource, "geometry.csm", name) for resource, name in zip(resources, files)],
+        progress_callback=progress,
+    )
+
+    # six uploads of 0.2 s each take about as long as one
+    assert time.monotonic() - start < 0.6
+    assert [resource.uploaded for resource in resources] == [{"geometry.csm": f} for f in files]
+    total = sum(os.path.getsize(name) for name in files)
+    assert progress.total == total
+    assert progress.transferred == total
+
+
+def test_upload_files_errors(files):
+    with pytest.raises(FileNotFoundError):
+        upload_files([(FakeResource("id"), "geometry.csm", "missing.csm")])
+
+    resources = [FakeResource("id-0"), FakeResource("id-1", fail=True), FakeResource("id-2")]
+    with pytest.raises(ConnectionError):
+        upload_files(
+            [(resource, "geometry.csm", name) for resource, name in zip(resources, files)],
+            max_concurrent_files=1,
+        )
+    assert resources[0].uploaded
+    assert not resources[2].uploaded
+
+    upload_files([])
+
+
+def test_surface_mesh_submit_all(files, monkeypatch):
+    params = SurfaceMeshingParams(
+        max_edge_length=0.1, faces={"mysphere": Face(max_edge_length=0.05)}
+    )
+    drafts = [SurfaceMesh.create(name, params=params) for name in files[:3]]
+    resources = {}
+    finished = []
+
+    def create_for_upload(draft, registry):
+        if draft.geometry_file == files[1]:
+            # found by dedupe, nothing to upload
+            return "existing", None, None
+        resources[draft.geometry_file] = FakeResource(draft.geometry_file)
+        return resources[draft.geometry_file], "geometry.csm", None
+
+    def finish_upload(draft, submitted_mesh, remote_file_name, registration):
+        finished.append(draft.geometry_file)
+
+    monkeypatch.setattr(SurfaceMeshDraft, "_create_for_upload", create_for_upload)
+    monkeypatch.setattr(SurfaceMeshDraft, "_finish_upload", finish_upload)
+
+    meshes = SurfaceMeshDraft.submit_all(drafts)
+
+    assert meshes == [resources[files[0]], "existing", resources[files[2]]]
+    assert resources[files[0]].uploaded == {"geometry.csm": files[0]}
+    assert finished == [files[0], files[2]]
+
+
+class FakeSurfaceMeshApi:
+    created = {}
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+
+    def post(self, data):
+        mesh_id = f"00000000-0000-4000-8000-{len(self.created):012}"
+        self.created[mesh_id] = {
+            "name": data["name"] or mesh_id,
+            "userId": "user-id",
+            "id": mesh_id,
+            "solverVersion": None,
+            "status": "uploading",
+            "deleted": False,
+            "config": data["config"],
+        }
+        return self.created[mesh_id]
+
+
+def complete_upload(mesh, remote_file_name):
+    mesh._update_info(SurfaceMeshMeta(**FakeSurfaceMeshApi.created[mesh.id]))
+
+
+def test_surface_mesh_submit_all_dedupe(files, tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        upload_registry, "registry_file", os.path.join(tmp_path, "upload_registry.json")
+    )
+    monkeypatch.setattr(FakeSurfaceMeshApi, "created", {})
+    monkeypatch.setattr(surface_mesh, "RestApi", FakeSurfaceMeshApi)
+    monkeypatch.setattr(SurfaceMeshDraft, "validator_api", lambda *args, **kwargs: None)
+    monkeypatch.setattr(surface_mesh, "shared_account_confirm_proceed", lambda: True)
+    monkeypatch.setattr(SurfaceMesh, "_upload_file", lambda *args, **kwargs: None)
+    monkeypatch.setattr(SurfaceMesh, "_complete_upload", complete_upload)
+    params = SurfaceMeshingParams(
+        max_edge_length=0.1, faces={"mysphere": Face(max_edge_length=0.05)}
+    )
+
+    meshes = SurfaceMeshDraft.submit_all(
+        [SurfaceMesh.create(name, params=params) for name in files[:2]], dedupe=True
+    )
+
+    # both registrations of the batch are saved
+    assert [mesh.id for mesh in meshes] == list(FakeSurfaceMeshApi.created)
+    assert sorted(UploadRegistry.load().resources.values()) == list(FakeSurfaceMeshApi.created)
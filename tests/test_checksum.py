@@ -0,0 +1,81 @@
+import io
+import os
+import zlib
+
+import pytest
+
+from flow360.cloud import checksum
+from flow360.cloud.checksum import (
+    combine_checksums,
+    crc32_combine,
+    decode_crc32,
+    encode_crc32,
+    fileobj_crc32,
+    object_checksum,
+    verify_download,
+)
+from flow360.exceptions import Flow360CloudFileError
+
+
+def test_encode_crc32():
+    checksum = encode_crc32(zlib.crc32(b"hello world"))
+    # value returned by S3 for an object with content "hello world"
+    assert checksum == "DUoRhQ=="
+    assert decode_crc32(checksum) == zlib.crc32(b"hello world")
+
+
+@pytest.mark.parametrize("split", [0, 1, 1000, 4095, 4096])
+def test_crc32_combine(split):
+    data = os.urandom(4096)
+    first, second = data[:split], data[split:]
+    assert crc32_combine(zlib.crc32(first), zlib.crc32(second), len(second)) == zlib.crc32(data)
+
+
+def test_combine_checksums():
+    parts = [os.urandom(size) for size in [5 * 1024 * 1024, 12345, 1]]
+    combined = combine_checksums((encode_crc32(zlib.crc32(part)), len(part)) for part in parts)
+    assert combined == encode_crc32(zlib.crc32(b"".join(parts)))
+
+
+def test_combine_checksums_reuses_operators():
+    checksum._zeros_operator.cache_clear()
+    parts = [os.urandom(size) for size in [1000] * 50 + [17]]
+    combined = combine_checksums((encode_crc32(zlib.crc32(part)), len(part)) for part in parts)
+    assert combined == encode_crc32(zlib.crc32(b"".join(parts)))
+    # one operator for the parts of equal length and one for the last part
+    assert checksum._zeros_operator.cache_info().misses == 2
+
+
+def test_verify_download(tmp_path):
+    data = os.urandom(100000)
+    meta_data = {"ChecksumCRC32": encode_crc32(zlib.crc32(data)), "ChecksumType": "FULL_OBJECT"}
+    assert fileobj_crc32(io.BytesIO(data)) == meta_data["ChecksumCRC32"]
+    verify_download(meta_data, io.BytesIO(data), "mesh.cgns")
+    # composite checksums of multipart uploads cannot be checked without the part sizes
+    verify_download({"ChecksumCRC32": "AAAAAA==-2", "ChecksumType": "COMPOSITE"}, "", "mesh")
+    verify_download({}, "", "mesh.cgns")
+
+    file_name = os.path.join(tmp_path, "mesh.cgns")
+    with open(file_name, "wb") as fh:
+        fh.write(data[:-1] + b"x")
+    with pytest.raises(Flow360CloudFileError):
+        verify_download(meta_data, file_name, "mesh.cgns")
+    assert not os.path.exists(file_name)
+
+
+def test_verify_download_composite_checksum(tmp_path):
+    # multipart upload_file with ChecksumAlgorithm CRC32, head_object of a botocore which
+    # does not report the checksum type
+    data = os.urandom(1000)
+    file_name = os.path.join(tmp_path, "mesh.cgns")
+    with open(file_name, "wb") as fh:
+        fh.write(data)
+    composite = encode_crc32(zlib.crc32(encode_crc32(zlib.crc32(data)).encode())) + "-2"
+    for meta_data in [
+        {"ChecksumCRC32": composite},
+        {"ChecksumCRC32": composite, "ChecksumType": "FULL_OBJECT"},
+        {"ChecksumCRC32": encode_crc32(zlib.crc32(b"other"))},
+    ]:
+        assert object_checksum(meta_data) is None
+        verify_download(meta_data, file_name, "mesh.cgns")
+    assert os.path.exists(file_name)
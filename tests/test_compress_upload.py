@@ -0,0 +1,372 @@
+import bz2
+import io
+import os
+import threading
+import time
+import zlib
+
+import pytest
+import zstandard as zstd
+
+from flow360.cloud import upload_journal
+from flow360.cloud.checksum import encode_crc32
+from flow360.cloud.upload_journal import UploadJournal
+from flow360.component import compress_upload
+from flow360.component.compress_upload import (
+    compress_and_upload_chunks,
+    seekable_zstd_compress_and_upload_chunks,
+    zstd_compress_and_upload_chunks,
+)
+from flow360.component.seekable_zstd import read_seek_table
+from flow360.exceptions import Flow360RuntimeError, Flow360ValueError
+
+from .utils import mock_id
+
+
+class FakeMultipartResource:
+    def __init__(self):
+        self.parts = {}
+        self.completed = None
+        self.checksum = None
+        self._lock = threading.Lock()
+
+    def upload_part(
+        self, remote_file_name, upload_id, part_number, compressed_chunk, checksum=None
+    ):
+        with self._lock:
+            self.parts[part_number] = bytes(compressed_chunk)
+        result = {"ETag": f"etag-{part_number}", "PartNumber": part_number}
+        if checksum is not None:
+            assert checksum == encode_crc32(zlib.crc32(compressed_chunk))
+            result["ChecksumCRC32"] = checksum
+        return result
+
+    def complete_multipart_upload(self, remote_file_name, upload_id, uploaded_parts, checksum=None):
+        self.completed = uploaded_parts
+        self.checksum = checksum
+
+    def uploaded_data(self):
+        return b"".join(self.parts[number] for number in sorted(self.parts))
+
+
+@pytest.fixture
+def mesh_file(tmp_path):
+    file_name = os.path.join(tmp_path, "mesh.lb8.ugrid")
+    with open(file_name, "wb") as fh:
+        for i in range(2000):
+            fh.write(os.urandom(4096))
+            fh.write(f"{i} 0.0 1.0 2.0\n".encode() * 100)
+    return file_name
+
+
+def test_zstd_compress_and_upload_chunks(mesh_file):
+    resource = FakeMultipartResource()
+    zstd_compress_and_upload_chunks(
+        mesh_file, "upload-id", resource, "mesh.lb8.ugrid.zst", chunk_length=5 * 1024 * 1024
+    )
+
+    assert len(resource.parts) > 1
+    assert [part["PartNumber"] for part in resource.completed] == list(
+        range(1, len(resource.parts) + 1)
+    )
+    with open(mesh_file, "rb") as fh:
+        original = fh.read()
+    assert zstd.ZstdDecompressor().decompressobj().decompress(resource.uploaded_data()) == original
+
+
+def test_compress_and_upload_chunks(mesh_file):
+    resource = FakeMultipartResource()
+    compress_and_upload_chunks(
+        mesh_file, "upload-id", resource, "mesh.lb8.ugrid.bz2", chunk_length=1024 * 1024
+    )
+
+    assert [part["PartNumber"] for part in resource.completed] == list(
+        range(1, len(resource.parts) + 1)
+    )
+    with open(mesh_file, "rb") as fh:
+        original = fh.read()
+    assert bz2.decompress(resource.uploaded_data()) == original
+    assert resource.checksum == encode_crc32(zlib.crc32(resource.uploaded_data()))
+    assert all("ChecksumCRC32" in part for part in resource.completed)
+
+
+def test_compress_and_upload_chunks_deterministic_parts(mesh_file):
+    serial = FakeMultipartResource()
+    compress_and_upload_chunks(
+        mesh_file, "upload-id", serial, "mesh.bz2", chunk_length=512 * 1024, compression_workers=1
+    )
+    parallel = FakeMultipartResource()
+    compress_and_upload_chunks(
+        mesh_file, "upload-id", parallel, "mesh.bz2", chunk_length=512 * 1024, compression_workers=8
+    )
+
+    assert serial.parts == parallel.parts
+    assert all(len(serial.parts[n]) >= 5 * 1024 * 1024 for n in sorted(serial.parts)[:-1])
+
+
+class SlowMultipartResource(FakeMultipartResource):
+    def __init__(self):
+        super().__init__()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def upload_part(
+        self, remote_file_name, upload_id, part_number, compressed_chunk, checksum=None
+    ):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.05)
+        with self._lock:
+            self.in_flight -= 1
+        return super().upload_part(
+            remote_file_name, upload_id, part_number, compressed_chunk, checksum
+        )
+
+
+def test_upload_in_flight_parts_are_bounded(tmp_path):
+    file_name = os.path.join(tmp_path, "mesh.lb8.ugrid")
+    with open(file_name, "wb") as fh:
+        fh.write(os.urandom(40 * 1024 * 1024))
+
+    resource = SlowMultipartResource()
+    zstd_compress_and_upload_chunks(
+        file_name,
+        "upload-id",
+        resource,
+        "mesh.zst",
+        chunk_length=5 * 1024 * 1024,
+        max_queued_parts=2,
+    )
+
+    assert len(resource.parts) >= 8
+    assert resource.max_in_flight <= 2
+
+
+class Progress:
+    def __init__(self):
+        self.total = None
+        self.consumed = 0
+
+    def __call__(self, size):
+        self.consumed += 1
+
+
+def test_compression_read_ahead_is_bounded(tmp_path, monkeypatch):
+    file_name = os.path.join(tmp_path, "mesh.lb8.ugrid")
+    with open(file_name, "wb") as fh:
+        fh.write(os.urandom(20 * 1024 * 1024))
+
+    progress = Progress()
+    read_ahead = []
+    read_chunks = compress_upload._read_chunks
+
+    def recording_read_chunks(*args):
+        for read, chunk_data in enumerate(read_chunks(*args), start=1):
+            read_ahead.append(read - progress.consumed)
+            yield chunk_data
+
+    monkeypatch.setattr(compress_upload, "_read_chunks", recording_read_chunks)
+    seekable_zstd_compress_and_upload_chunks(
+        file_name,
+        "upload-id",
+        FakeMultipartResource(),
+        "mesh.zst",
+        chunk_length=1024 * 1024,
+        compression_workers=8,
+        progress_callback=progress,
+        max_queued_parts=2,
+    )
+
+    assert progress.consumed == 20
+    assert max(read_ahead) == 2
+
+
+class FailingMultipartResource(FakeMultipartResource):
+    def __init__(self, fail_part):
+        super().__init__()
+        self.fail_part = fail_part
+
+    def upload_part(
+        self, remote_file_name, upload_id, part_number, compressed_chunk, checksum=None
+    ):
+        if part_number == self.fail_part:
+            raise ConnectionError("connection dropped")
+        return super().upload_part(
+            remote_file_name, upload_id, part_number, compressed_chunk, checksum
+        )
+
+
+@pytest.mark.parametrize(
+    "upload_function,decompress",
+    [
+        (compress_and_upload_chunks, bz2.decompress),
+        (
+            zstd_compress_and_upload_chunks,
+            lambda data: zstd.ZstdDecompressor().decompressobj().decompress(data),
+        ),
+        (
+            seekable_zstd_compress_and_upload_chunks,
+            lambda data: zstd.ZstdDecompressor()
+            .stream_reader(io.BytesIO(data), read_across_frames=True)
+            .read(),
+        ),
+    ],
+)
+def test_resume_upload_from_journal(tmp_path, monkeypatch, upload_function, decompress):
+    monkeypatch.setattr(upload_journal, "journal_dir", os.path.join(tmp_path, "uploads"))
+    file_name = os.path.join(tmp_path, "mesh.lb8.ugrid")
+    with open(file_name, "wb") as fh:
+        fh.write(os.urandom(24 * 1024 * 1024))
+
+    journal = UploadJournal.create(mock_id, "mesh.ugrid", "upload-id", file_name, 6 * 1024 * 1024)
+    failing = FailingMultipartResource(fail_part=2)
+    with pytest.raises(ConnectionError):
+        upload_function(file_name, "upload-id", failing, "mesh.ugrid", journal=journal)
+    assert failing.completed is None
+
+    journal = UploadJournal.find(file_name, "mesh.ugrid")
+    assert journal.upload_id == "upload-id"
+    assert journal.parts[1].e_tag == "etag-1"
+    assert journal.parts[2].e_tag is None
+
+    resumed = FakeMultipartResource()
+    upload_function(file_name, "upload-id", resumed, "mesh.ugrid", journal=journal)
+
+    assert 1 not in resumed.parts
+    assert 2 in resumed.parts
+    assert [part["PartNumber"] for part in resumed.completed] == list(
+        range(1, len(resumed.completed) + 1)
+    )
+    failing.parts.update(resumed.parts)
+    with open(file_name, "rb") as fh:
+        assert decompress(failing.uploaded_data()) == fh.read()
+    assert resumed.checksum == encode_crc32(zlib.crc32(failing.uploaded_data()))
+    assert UploadJournal.find(file_name, "mesh.ugrid") is None
+
+
+def test_resume_multithreaded_zstd_upload(tmp_path, monkeypatch):
+    monkeypatch.setattr(upload_journal, "journal_dir", os.path.join(tmp_path, "uploads"))
+    file_name = os.path.join(tmp_path, "mesh.lb8.ugrid")
+    with open(file_name, "wb") as fh:
+        for i in range(6000):
+            fh.write(os.urandom(4096))
+            fh.write(f"{i} 0.0 1.0 2.0\n".encode() * 20)
+
+    journal = UploadJournal.create(
+        mock_id,
+        "mesh.ugrid",
+        "upload-id",
+        file_name,
+        6 * 1024 * 1024,
+        zstd_level=5,
+        zstd_multithreaded=True,
+    )
+    failing = FailingMultipartResource(fail_part=2)
+    with pytest.raises(ConnectionError):
+        zstd_compress_and_upload_chunks(
+            file_name, "upload-id", failing, "mesh.ugrid", journal=journal, threads=2
+        )
+
+    # the resumed upload compresses with the level and thread mode of the journal
+    journal = UploadJournal.find(file_name, "mesh.ugrid")
+    resumed = FakeMultipartResource()
+    zstd_compress_and_upload_chunks(
+        file_name, "upload-id", resumed, "mesh.ugrid", journal=journal, threads=0
+    )
+
+    failing.parts.update(resumed.parts)
+    with open(file_name, "rb") as fh:
+        original = fh.read()
+    assert zstd.ZstdDecompressor().decompressobj().decompress(failing.uploaded_data()) == original
+    compressor = zstd.ZstdCompressor(level=5, threads=1).compressobj()
+    assert failing.uploaded_data() == compressor.compress(original) + compressor.flush()
+
+
+def test_resume_zstd_upload_other_zstd_version(tmp_path, monkeypatch):
+    monkeypatch.setattr(upload_journal, "journal_dir", os.path.join(tmp_path, "uploads"))
+    file_name = os.path.join(tmp_path, "mesh.lb8.ugrid")
+    with open(file_name, "wb") as fh:
+        fh.write(os.urandom(24 * 1024 * 1024))
+
+    journal = UploadJournal.create(mock_id, "mesh.ugrid", "upload-id", file_name, 6 * 1024 * 1024)
+    assert journal.zstd_version == tuple(zstd.ZSTD_VERSION)
+    failing = FailingMultipartResource(fail_part=2)
+    with pytest.raises(ConnectionError):
+        zstd_compress_and_upload_chunks(
+            file_name, "upload-id", failing, "mesh.ugrid", journal=journal
+        )
+
+    # journals written before the zstd version was recorded cannot be resumed either
+    journal = UploadJournal.find(file_name, "mesh.ugrid")
+    assert journal.zstd_version_matches()
+    for zstd_version in [(1, 0, 0), None]:
+        journal.zstd_version = zstd_version
+        journal.save()
+        journal = UploadJournal.find(file_name, "mesh.ugrid")
+        assert not journal.zstd_version_matches()
+        resumed = FakeMultipartResource()
+        with pytest.raises(Flow360RuntimeError):
+            zstd_compress_and_upload_chunks(
+                file_name, "upload-id", resumed, "mesh.ugrid", journal=journal
+            )
+        assert not resumed.parts
+
+
+def test_zstd_compress_and_upload_chunks_invalid_level(mesh_file):
+    with pytest.raises(Flow360ValueError):
+        zstd_compress_and_upload_chunks(
+            mesh_file, "upload-id", FakeMultipartResource(), "mesh.zst", compression_level=23
+        )
+
+
+class TimedMultipartResource(FakeMultipartResource):
+    def upload_part(
+        self, remote_file_name, upload_id, part_number, compressed_chunk, checksum=None
+    ):
+        time.sleep(0.01)
+        return super().upload_part(
+            remote_file_name, upload_id, part_number, compressed_chunk, checksum
+        )
+
+
+def test_zstd_adaptive_part_size(tmp_path):
+    file_name = os.path.join(tmp_path, "mesh.lb8.ugrid")
+    with open(file_name, "wb") as fh:
+        fh.write(os.urandom(80 * 1024 * 1024))
+
+    resource = TimedMultipartResource()
+    # compress on the calling thread, so parts are uploaded while the file is read
+    zstd_compress_and_upload_chunks(file_name, "upload-id", resource, "mesh.zst", threads=0)
+
+    sizes = [len(resource.parts[n]) for n in sorted(resource.parts)]
+    # fast parts grow the part size from the initial 16 MB
+    assert sizes[0] == 16 * 1024 * 1024
+    assert max(sizes[:-1]) > 16 * 1024 * 1024
+    with open(file_name, "rb") as fh:
+        original = fh.read()
+    assert zstd.ZstdDecompressor().decompressobj().decompress(resource.uploaded_data()) == original
+
+
+def test_seekable_zstd_compress_and_upload_chunks(mesh_file):
+    resource = FakeMultipartResource()
+    seekable_zstd_compress_and_upload_chunks(
+        mesh_file,
+        "upload-id",
+        resource,
+        "mesh.lb8.ugrid.zst",
+        chunk_length=1024 * 1024,
+        part_size=5 * 1024 * 1024,
+    )
+
+    with open(mesh_file, "rb") as fh:
+        original = fh.read()
+    data = resource.uploaded_data()
+    assert len(resource.parts) > 1
+    # a standard decoder skips the seek table
+    reader = zstd.ZstdDecompressor().stream_reader(io.BytesIO(data), read_across_frames=True)
+    assert reader.read() == original
+
+    frames = read_seek_table(io.BytesIO(data))
+    assert len(frames) == -(-len(original) // (1024 * 1024))
+    assert sum(size for _, size in frames) == len(original)
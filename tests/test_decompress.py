@@ -0,0 +1,157 @@
+import bz2
+import functools
+import gzip
+import os
+
+import pytest
+import zstandard as zstd
+
+from flow360.component import decompress
+from flow360.component.compress_upload import (
+    compress_and_upload_chunks,
+    seekable_zstd_compress_and_upload_chunks,
+)
+from flow360.component.decompress import (
+    decompress_bz2,
+    decompress_file,
+    decompress_zstd,
+    find_bz2_streams,
+)
+
+from .test_compress_upload import FakeMultipartResource
+
+
+@pytest.fixture
+def mesh_content():
+    return b"".join(os.urandom(1024) + f"{i} 0.0 1.0 2.0\n".encode() * 50 for i in range(3000))
+
+
+@pytest.fixture
+def multi_stream_bz2(tmp_path, mesh_content):
+    file_name = os.path.join(tmp_path, "mesh.lb8.ugrid")
+    with open(file_name, "wb") as fh:
+        fh.write(mesh_content)
+    resource = FakeMultipartResource()
+    compress_and_upload_chunks(
+        file_name, "upload-id", resource, "mesh.lb8.ugrid.bz2", chunk_length=256 * 1024
+    )
+    compressed = os.path.join(tmp_path, "downloaded.lb8.ugrid.bz2")
+    with open(compressed, "wb") as fh:
+        fh.write(resource.uploaded_data())
+    return compressed
+
+
+def test_find_bz2_streams(multi_stream_bz2, mesh_content):
+    streams = find_bz2_streams(multi_stream_bz2)
+
+    assert len(streams) == -(-len(mesh_content) // (256 * 1024))
+    assert streams[0][0] == 0
+    assert sum(length for _, length in streams) == os.path.getsize(multi_stream_bz2)
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_decompress_bz2(tmp_path, multi_stream_bz2, mesh_content, workers):
+    output = os.path.join(tmp_path, "mesh.lb8.ugrid")
+    progress = []
+    decompress_bz2(multi_stream_bz2, output, workers=workers, progress_callback=progress.append)
+
+    with open(output, "rb") as fh:
+        assert fh.read() == mesh_content
+    assert sum(progress) == os.path.getsize(multi_stream_bz2)
+
+
+def test_decompress_bz2_false_boundary(tmp_path, monkeypatch, multi_stream_bz2, mesh_content):
+    streams = find_bz2_streams(multi_stream_bz2)
+    offset, length = streams[1]
+    # a header pattern inside compressed data splits a stream in two
+    split = streams[:1] + [(offset, 100), (offset + 100, length - 100)] + streams[2:]
+    monkeypatch.setattr(decompress, "find_bz2_streams", lambda file_name: split)
+
+    output = os.path.join(tmp_path, "mesh.lb8.ugrid")
+    decompress_bz2(multi_stream_bz2, output, workers=4)
+
+    with open(output, "rb") as fh:
+        assert fh.read() == mesh_content
+
+
+def test_decompress_bz2_scans_once(tmp_path, monkeypatch, multi_stream_bz2, mesh_content):
+    scans = []
+
+    def counting_find_bz2_streams(file_name):
+        scans.append(file_name)
+        return find_bz2_streams(file_name)
+
+    monkeypatch.setattr(decompress, "find_bz2_streams", counting_find_bz2_streams)
+    output = os.path.join(tmp_path, "mesh.lb8.ugrid")
+    decompress_bz2(multi_stream_bz2, output, workers=4)
+
+    assert scans == [multi_stream_bz2]
+    with open(output, "rb") as fh:
+        assert fh.read() == mesh_content
+
+
+def test_decompress_in_order_bounded_by_bytes(tmp_path):
+    started = []
+    written = []
+    in_flight = []
+
+    def task(index):
+        started.append(index)
+        in_flight.append((len(written), len(started) - len(written)))
+        return bytes([index]) * 1024
+
+    decompress._decompress_in_order(
+        os.path.join(tmp_path, "output"),
+        [(1, functools.partial(task, index)) for index in range(40)],
+        8,
+        written.append,
+        max_pending_bytes=3 * 1024,
+    )
+
+    with open(os.path.join(tmp_path, "output"), "rb") as fh:
+        assert fh.read() == b"".join(bytes([index]) * 1024 for index in range(40))
+    # at most workers tasks before the size of the results is known, then three results
+    # once the tasks submitted before are written
+    assert max(count for _, count in in_flight) <= 8
+    assert max(count for done, count in in_flight if done >= 8) <= 3
+
+
+@pytest.mark.parametrize(
+    "ext,compress",
+    [
+        (".bz2", bz2.compress),
+        (".gz", gzip.compress),
+        (".zst", lambda data: zstd.ZstdCompressor().compress(data)),
+    ],
+)
+def test_decompress_file(tmp_path, mesh_content, ext, compress):
+    compressed = os.path.join(tmp_path, "mesh.cgns" + ext)
+    with open(compressed, "wb") as fh:
+        fh.write(compress(mesh_content))
+
+    output = decompress_file(compressed, os.path.join(tmp_path, "mesh.cgns"))
+
+    with open(output, "rb") as fh:
+        assert fh.read() == mesh_content
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_decompress_seekable_zstd(tmp_path, mesh_content, workers):
+    file_name = os.path.join(tmp_path, "mesh.lb8.ugrid")
+    with open(file_name, "wb") as fh:
+        fh.write(mesh_content)
+    resource = FakeMultipartResource()
+    seekable_zstd_compress_and_upload_chunks(
+        file_name, "upload-id", resource, "mesh.lb8.ugrid.zst", chunk_length=256 * 1024
+    )
+    compressed = os.path.join(tmp_path, "downloaded.lb8.ugrid.zst")
+    with open(compressed, "wb") as fh:
+        fh.write(resource.uploaded_data())
+
+    output = os.path.join(tmp_path, "decompressed.lb8.ugrid")
+    progress = []
+    decompress_zstd(compressed, output, workers=workers, progress_callback=progress.append)
+
+    with open(output, "rb") as fh:
+        assert fh.read() == mesh_content
+    assert sum(progress) == os.path.getsize(compressed)
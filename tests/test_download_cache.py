@@ -0,0 +1,332 @@
+import errno
+import functools
+import io
+import os
+import zlib
+from datetime import datetime, timezone
+
+import pytest
+
+from flow360.cloud import download_cache as download_cache_module
+from flow360.cloud import s3_utils
+from flow360.cloud.checksum import encode_crc32
+from flow360.cloud.download_cache import DownloadCache
+from flow360.cloud.s3_utils import S3TransferType
+from flow360.component.case import Case
+from flow360.component.results import case_results
+from flow360.exceptions import Flow360CloudFileError, Flow360ValueError
+
+from .utils import mock_id
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    path = os.path.join(tmp_path, "cache")
+    monkeypatch.setattr(download_cache_module, "cache_dir", path)
+    return path
+
+
+def _write(path, data):
+    with open(path, "wb") as fh:
+        fh.write(data)
+
+
+def _read(path):
+    with open(path, "rb") as fh:
+        return fh.read()
+
+
+def test_cache_hit_and_miss(tmp_path, cache_dir):
+    cache = DownloadCache(max_size=1024)
+    source = os.path.join(tmp_path, "source.csv")
+    target = os.path.join(tmp_path, "target.csv")
+    _write(source, b"CL,CD\n0.4,0.01\n")
+
+    assert not cache.get(mock_id, "results/total_forces_v2.csv", '"etag"', 15, target)
+    cache.put(mock_id, "results/total_forces_v2.csv", '"etag"', 15, source)
+
+    assert cache.get(mock_id, "results/total_forces_v2.csv", '"etag"', 15, target)
+    assert _read(target) == _read(source)
+    assert not cache.get(mock_id, "results/total_forces_v2.csv", '"other"', 15, target)
+    assert not cache.get(mock_id, "results/cfl_v2.csv", '"etag"', 15, target)
+
+
+def test_cache_links_downloaded_files(tmp_path, cache_dir, monkeypatch):
+    cache = DownloadCache(max_size=1024)
+    source = os.path.join(tmp_path, "source.csv")
+    _write(source, b"CL,CD\n0.4,0.01\n")
+
+    cache.put(mock_id, "results/total_forces_v2.csv", '"etag"', 15, source)
+    (entry,) = os.scandir(cache_dir)
+    assert os.path.samefile(entry.path, source)
+
+    # a cache hit replaces the linked file instead of writing into the cache entry
+    _write(entry.path, b"CL,CD\n0.5,0.02\n")
+    assert cache.get(mock_id, "results/total_forces_v2.csv", '"etag"', 15, source)
+    assert _read(source) == b"CL,CD\n0.5,0.02\n"
+    assert not os.path.samefile(entry.path, source)
+
+    def cross_device_link(src, dst):
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+    monkeypatch.setattr(os, "link", cross_device_link)
+    cache.put(mock_id, "results/cfl_v2.csv", '"etag"', 15, source)
+    target = os.path.join(tmp_path, "target.csv")
+    assert cache.get(mock_id, "results/cfl_v2.csv", '"etag"', 15, target)
+    assert _read(target) == _read(source)
+
+
+def test_cache_evicts_least_recently_used(tmp_path, cache_dir):
+    cache = DownloadCache(max_size=250)
+    target = os.path.join(tmp_path, "target")
+    for i in range(3):
+        source = os.path.join(tmp_path, f"file-{i}")
+        _write(source, bytes([i]) * 100)
+        cache.put(mock_id, f"file-{i}", "etag", 100, source)
+        # make modification times distinct and in order of use
+        for entry in os.scandir(cache_dir):
+            os.utime(entry.path, (entry.stat().st_mtime - 10, entry.stat().st_mtime - 10))
+        if i == 1:
+            assert cache.get(mock_id, "file-0", "etag", 100, target)
+
+    assert cache.get(mock_id, "file-0", "etag", 100, target)
+    assert not cache.get(mock_id, "file-1", "etag", 100, target)
+    assert cache.get(mock_id, "file-2", "etag", 100, target)
+
+
+def test_disabled_cache(tmp_path, cache_dir):
+    cache = DownloadCache(max_size=0)
+    source = os.path.join(tmp_path, "source")
+    _write(source, b"data")
+    cache.put(mock_id, "file", "etag", 4, source)
+    assert not os.path.exists(cache_dir)
+
+
+class FakeClient:
+    def __init__(self, data, e_tag='"etag"', checksum=None):
+        self.data = data
+        self.e_tag = e_tag
+        self.checksum = checksum
+        self.downloads = 0
+
+    def head_object(self, Bucket, Key, ChecksumMode):
+        meta_data = {
+            "ContentLength": len(self.data),
+            "ETag": self.e_tag,
+            "LastModified": datetime(2024, 1, 1, tzinfo=timezone.utc),
+        }
+        if self.checksum is not None:
+            meta_data.update(ChecksumCRC32=self.checksum, ChecksumType="FULL_OBJECT")
+        return meta_data
+
+    def get_object(self, Bucket, Key, IfMatch, ChecksumMode):
+        assert IfMatch == self.e_tag
+        self.downloads += 1
+        return {"Body": io.BytesIO(self.data)}
+
+    def download_fileobj(self, Bucket, Key, Fileobj, Callback, Config):
+        self.downloads += 1
+        Fileobj.write(self.data)
+
+    def download_file(self, Bucket, Filename, Key, Callback, Config):
+        self.downloads += 1
+        _write(Filename, self.data)
+        Callback(len(self.data))
+
+
+class FakeToken:
+    shared = False
+
+    def __init__(self, client):
+        self.client = client
+
+    def get_client(self):
+        return self.client
+
+    def get_bucket(self):
+        return "bucket"
+
+    def get_s3_key(self):
+        return "key"
+
+
+def test_download_file_uses_cache(tmp_path, cache_dir, monkeypatch):
+    client = FakeClient(b"CL,CD\n0.4,0.01\n")
+    monkeypatch.setattr(
+        S3TransferType, "_get_s3_sts_token", lambda self, *args, **kwargs: FakeToken(client)
+    )
+    monkeypatch.setattr(s3_utils, "download_cache", DownloadCache(max_size=1024))
+
+    # s3_download_override replaces download_file of S3TransferType.CASE
+    download_file = S3TransferType.download_file
+    first = os.path.join(tmp_path, "first.csv")
+    second = os.path.join(tmp_path, "second.csv")
+    download_file(S3TransferType.CASE, mock_id, "results/total_forces_v2.csv", to_file=first)
+    download_file(S3TransferType.CASE, mock_id, "results/total_forces_v2.csv", to_file=second)
+    assert client.downloads == 1
+    assert _read(second) == client.data
+
+    download_file(
+        S3TransferType.CASE,
+        mock_id,
+        "results/total_forces_v2.csv",
+        to_file=second,
+        use_cache=False,
+    )
+    assert client.downloads == 2
+
+
+def test_download_file_if_changed(tmp_path, cache_dir, monkeypatch):
+    client = FakeClient(b"CL,CD\n0.4,0.01\n")
+    monkeypatch.setattr(
+        S3TransferType, "_get_s3_sts_token", lambda self, *args, **kwargs: FakeToken(client)
+    )
+    monkeypatch.setattr(s3_utils, "download_cache", DownloadCache(max_size=0))
+    download_file = S3TransferType.download_file
+    to_file = os.path.join(tmp_path, "total_forces_v2.csv")
+
+    def download():
+        download_file(
+            S3TransferType.CASE,
+            mock_id,
+            "results/total_forces_v2.csv",
+            to_file=to_file,
+            overwrite="if-changed",
+        )
+
+    download()
+    download()
+    assert client.downloads == 1
+    assert os.path.exists(os.path.join(tmp_path, ".total_forces_v2.csv.flow360.json"))
+
+    client.data = b"CL,CD\n0.5,0.02\n"
+    client.e_tag = '"changed"'
+    download()
+    assert client.downloads == 2
+    assert _read(to_file) == client.data
+
+    _write(to_file, b"edited locally")
+    download()
+    assert client.downloads == 3
+
+    with pytest.raises(Flow360ValueError):
+        download_file(S3TransferType.CASE, mock_id, "file", to_file=to_file, overwrite="always")
+
+
+def test_download_fileobj_uses_cache(cache_dir, monkeypatch):
+    client = FakeClient(b"CL,CD\n0.4,0.01\n")
+    monkeypatch.setattr(
+        S3TransferType, "_get_s3_sts_token", lambda self, *args, **kwargs: FakeToken(client)
+    )
+    monkeypatch.setattr(s3_utils, "download_cache", DownloadCache(max_size=1024))
+
+    for _ in range(2):
+        buffer = io.BytesIO()
+        S3TransferType.download_fileobj(
+            S3TransferType.CASE, mock_id, "results/total_forces_v2.csv", buffer
+        )
+        assert buffer.getvalue() == client.data
+    assert client.downloads == 1
+
+
+def test_open_stream_uses_cache(cache_dir, monkeypatch):
+    client = FakeClient(b"CL,CD\n0.4,0.01\n")
+    monkeypatch.setattr(
+        S3TransferType, "_get_s3_sts_token", lambda self, *args, **kwargs: FakeToken(client)
+    )
+    monkeypatch.setattr(s3_utils, "download_cache", DownloadCache(max_size=1024))
+
+    stream, size = S3TransferType.CASE.open_stream(mock_id, "results/surfaces.tar.gz")
+    assert (stream.read(), size) == (client.data, len(client.data))
+    assert client.downloads == 1
+
+    buffer = io.BytesIO()
+    S3TransferType.download_fileobj(S3TransferType.CASE, mock_id, "results/surfaces.tar.gz", buffer)
+    assert client.downloads == 2
+    stream, size = S3TransferType.CASE.open_stream(mock_id, "results/surfaces.tar.gz")
+    with stream:
+        assert stream.read() == client.data
+    assert client.downloads == 2
+
+
+def test_download_verifies_checksum(tmp_path, cache_dir, monkeypatch):
+    data = b"CL,CD\n0.4,0.01\n"
+    client = FakeClient(data, checksum=encode_crc32(zlib.crc32(data)))
+    monkeypatch.setattr(
+        S3TransferType, "_get_s3_sts_token", lambda self, *args, **kwargs: FakeToken(client)
+    )
+    monkeypatch.setattr(s3_utils, "download_cache", DownloadCache(max_size=1024))
+    download_file = S3TransferType.download_file
+    to_file = os.path.join(tmp_path, "total_forces_v2.csv")
+
+    download_file(S3TransferType.CASE, mock_id, "results/total_forces_v2.csv", to_file=to_file)
+    assert _read(to_file) == data
+
+    client.data = b"CL,CD\n0.4,0.02\n"
+    client.e_tag = '"corrupted"'
+    with pytest.raises(Flow360CloudFileError):
+        download_file(S3TransferType.CASE, mock_id, "results/total_forces_v2.csv", to_file=to_file)
+    assert not os.path.exists(to_file)
+    with pytest.raises(Flow360CloudFileError):
+        S3TransferType.download_fileobj(
+            S3TransferType.CASE, mock_id, "results/total_forces_v2.csv", io.BytesIO()
+        )
+    # corrupted content is not cached
+    client.data = data
+    download_file(S3TransferType.CASE, mock_id, "results/total_forces_v2.csv", to_file=to_file)
+    assert client.downloads == 4
+
+
+class Py39SpooledTemporaryFile:
+    """SpooledTemporaryFile of Python 3.9 and 3.10, which has no seekable() and readinto()"""
+
+    def __init__(self, max_size=0):
+        self._file = io.BytesIO()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self._file.close()
+
+    def __iter__(self):
+        return iter(self._file)
+
+    def read(self, *args):
+        return self._file.read(*args)
+
+    def readline(self, *args):
+        return self._file.readline(*args)
+
+    def write(self, data):
+        return self._file.write(data)
+
+    def seek(self, *args):
+        return self._file.seek(*args)
+
+    def tell(self):
+        return self._file.tell()
+
+    def flush(self):
+        pass
+
+
+def test_load_from_remote_without_seekable(cache_dir, monkeypatch):
+    data = b"CL,CD\n0.4,0.01\n"
+    client = FakeClient(data, checksum=encode_crc32(zlib.crc32(data)))
+    monkeypatch.setattr(
+        S3TransferType, "_get_s3_sts_token", lambda self, *args, **kwargs: FakeToken(client)
+    )
+    monkeypatch.setattr(s3_utils, "download_cache", DownloadCache(max_size=1024))
+    # undo s3_download_override of other tests
+    monkeypatch.setattr(
+        S3TransferType.CASE,
+        "download_fileobj",
+        functools.partial(S3TransferType.download_fileobj, S3TransferType.CASE),
+    )
+    monkeypatch.setattr(case_results.tempfile, "SpooledTemporaryFile", Py39SpooledTemporaryFile)
+
+    for _ in range(2):
+        total_forces = Case(mock_id).results.total_forces
+        assert total_forces.values["CL"][0] == 0.4
+    assert client.downloads == 1
@@ -0,0 +1,69 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from flow360.cloud.http_util import Http
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    failures = {}
+
+    def _respond(self):
+        remaining = self.failures.get(self.path, 0)
+        if remaining > 0:
+            self.failures[self.path] = remaining - 1
+            self.send_response(503)
+            self.send_header("Retry-After", "0")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    do_GET = _respond
+    do_POST = _respond
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FlakyHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_retry_idempotent_requests(server):
+    FlakyHandler.failures = {"/get": 2}
+    client = Http(requests.Session(), backoff_factor=0, backoff_jitter=0)
+
+    response = client._request("get", f"{server}/get")
+
+    assert response.status_code == 200
+    assert client.stats.retries == 2
+    assert client.stats.requests == 1
+
+
+def test_no_retry_on_post(server):
+    FlakyHandler.failures = {"/post": 1}
+    client = Http(requests.Session(), backoff_factor=0, backoff_jitter=0)
+
+    response = client._request("post", f"{server}/post")
+
+    assert response.status_code == 503
+    assert client.stats.retries == 0
+
+
+def test_retries_exhausted_returns_last_response(server):
+    FlakyHandler.failures = {"/get": 10}
+    client = Http(requests.Session(), max_retries=2, backoff_factor=0, backoff_jitter=0)
+
+    response = client._request("get", f"{server}/get")
+
+    assert response.status_code == 503
+    assert client.stats.retries == 2
@@ -0,0 +1,134 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from flow360.cloud.metadata_cache import MetadataCache, metadata_cache
+from flow360.component import case
+from flow360.component.case import Case
+from flow360.component.resource_base import Flow360Status
+from flow360.component.volume_mesh import VolumeMesh
+
+from .utils import mock_id
+
+
+class FakeFetch:
+    def __init__(self, *statuses, delay=0):
+        self.statuses = list(statuses)
+        self.delay = delay
+        self.calls = 0
+
+    def __call__(self, *args):
+        self.calls += 1
+        time.sleep(self.delay)
+        status = self.statuses[min(self.calls, len(self.statuses)) - 1]
+        return SimpleNamespace(status=status, deleted=False)
+
+
+def test_final_metadata_cached_indefinitely():
+    cache = MetadataCache(ttl=0)
+    fetch = FakeFetch(Flow360Status.COMPLETED)
+
+    assert cache.get("key", fetch).status == Flow360Status.COMPLETED
+    assert cache.get("key", fetch).status == Flow360Status.COMPLETED
+    assert fetch.calls == 1
+
+    cache.get("key", fetch, force=True)
+    assert fetch.calls == 2
+
+
+def test_metadata_in_progress_refreshed_after_ttl():
+    cache = MetadataCache(ttl=0.2)
+    fetch = FakeFetch(Flow360Status.RUNNING, Flow360Status.COMPLETED)
+
+    assert cache.get("key", fetch).status == Flow360Status.RUNNING
+    assert cache.get("key", fetch).status == Flow360Status.RUNNING
+    assert cache.cached("key").status == Flow360Status.RUNNING
+    assert fetch.calls == 1
+
+    time.sleep(0.2)
+    assert cache.cached("key") is None
+    assert cache.get("key", fetch).status == Flow360Status.COMPLETED
+    assert fetch.calls == 2
+
+
+def test_uploaded_metadata_refreshed_after_ttl(monkeypatch):
+    fetch = FakeFetch(Flow360Status.PROCESSED)
+    monkeypatch.setattr(VolumeMesh, "_fetch_info", fetch)
+    monkeypatch.setattr(metadata_cache, "_ttl", 60)
+
+    # metadata returned by completeUpload, the mesh is processed next
+    VolumeMesh(mock_id)._update_info(SimpleNamespace(status=Flow360Status.UPLOADED, deleted=False))
+    assert VolumeMesh(mock_id).status == Flow360Status.UPLOADED
+    assert fetch.calls == 0
+
+    monkeypatch.setattr(metadata_cache, "_ttl", 0)
+    assert VolumeMesh(mock_id).status == Flow360Status.PROCESSED
+    assert fetch.calls == 1
+
+
+class FakeFolderApi:
+    moved = []
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+
+    def put(self, data, method=None):
+        self.moved.append((data, method))
+
+
+def test_move_to_folder_invalidates_metadata(monkeypatch):
+    fetch = FakeFetch(Flow360Status.COMPLETED)
+    monkeypatch.setattr(Case, "_fetch_info", fetch)
+    monkeypatch.setattr(FakeFolderApi, "moved", [])
+    monkeypatch.setattr(case, "RestApi", FakeFolderApi)
+
+    assert Case(mock_id).status == Flow360Status.COMPLETED
+    Case(mock_id).move_to_folder(SimpleNamespace(id=mock_id))
+    assert len(FakeFolderApi.moved) == 1
+    assert Case(mock_id).status == Flow360Status.COMPLETED
+    assert fetch.calls == 2
+
+
+def test_concurrent_requests_share_one_fetch():
+    cache = MetadataCache(ttl=10)
+    fetch = FakeFetch(Flow360Status.RUNNING, delay=0.1)
+
+    threads = [threading.Thread(target=cache.get, args=("key", fetch)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert fetch.calls == 1
+
+    # forced requests waiting for a request sent after them reuse its result, so there is
+    # one forced fetch for the requests sent before the first one started and one for the rest
+    threads = [
+        threading.Thread(target=cache.get, args=("key", fetch), kwargs={"force": True})
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert fetch.calls <= 3
+
+
+def test_resource_objects_share_metadata(monkeypatch):
+    fetch = FakeFetch(Flow360Status.RUNNING, Flow360Status.COMPLETED)
+    monkeypatch.setattr(VolumeMesh, "_fetch_info", fetch)
+    monkeypatch.setattr(metadata_cache, "_ttl", 60)
+
+    assert VolumeMesh(mock_id).status == Flow360Status.RUNNING
+    assert VolumeMesh(mock_id).status == Flow360Status.RUNNING
+    assert fetch.calls == 1
+
+    # other resource types with the same id have their own metadata
+    monkeypatch.setattr(Case, "_fetch_info", FakeFetch(Flow360Status.PENDING))
+    assert Case(mock_id).status == Flow360Status.PENDING
+
+    monkeypatch.setattr(metadata_cache, "_ttl", 0)
+    assert VolumeMesh(mock_id).status == Flow360Status.COMPLETED
+    assert VolumeMesh(mock_id).status == Flow360Status.COMPLETED
+    assert fetch.calls == 2
@@ -0,0 +1,65 @@
+import io
+import os
+
+import pytest
+from botocore.response import StreamingBody
+
+from flow360.cloud.ranged_download import download_ranges
+
+
+class FakeS3Client:
+    def __init__(self, data, fail_start=None):
+        self.data = data
+        self.fail_start = fail_start
+        self.requested = []
+
+    def get_object(self, Bucket, Key, Range, IfMatch):
+        start, end = (int(value) for value in Range[len("bytes=") :].split("-"))
+        if start == self.fail_start:
+            raise ConnectionError("connection reset")
+        self.requested.append(start)
+        body = self.data[start : end + 1]
+        return {"Body": StreamingBody(io.BytesIO(body), len(body))}
+
+
+def test_download_ranges(tmp_path):
+    data = os.urandom(10 * 1024 * 1024 + 123)
+    to_file = os.path.join(tmp_path, "volumes.tar.gz")
+    received = []
+
+    client = FakeS3Client(data)
+    download_ranges(
+        client, "bucket", "key", to_file, len(data), '"etag"', 1024 * 1024, 4, received.append
+    )
+
+    with open(to_file, "rb") as fh:
+        assert fh.read() == data
+    assert sum(received) == len(data)
+    assert len(client.requested) == 11
+    assert os.listdir(tmp_path) == ["volumes.tar.gz"]
+
+
+def test_download_ranges_resume(tmp_path):
+    data = os.urandom(8 * 1024 * 1024)
+    to_file = os.path.join(tmp_path, "volumes.tar.gz")
+
+    failing = FakeS3Client(data, fail_start=3 * 1024 * 1024)
+    with pytest.raises(ConnectionError):
+        download_ranges(failing, "bucket", "key", to_file, len(data), '"etag"', 1024 * 1024, 1)
+    assert not os.path.exists(to_file)
+
+    client = FakeS3Client(data)
+    download_ranges(client, "bucket", "key", to_file, len(data), '"etag"', 1024 * 1024, 4)
+
+    assert 3 * 1024 * 1024 in client.requested
+    assert all(start >= 3 * 1024 * 1024 for start in client.requested)
+    with open(to_file, "rb") as fh:
+        assert fh.read() == data
+
+    # a changed object does not reuse ranges of the previous version
+    failing = FakeS3Client(data, fail_start=3 * 1024 * 1024)
+    with pytest.raises(ConnectionError):
+        download_ranges(failing, "bucket", "key", to_file, len(data), '"etag"', 1024 * 1024, 1)
+    client = FakeS3Client(data)
+    download_ranges(client, "bucket", "key", to_file, len(data), '"other"', 1024 * 1024, 4)
+    assert len(client.requested) == 8
@@ -9,6 +9,8 @@ import pytest
 import flow360 as fl
 import flow360.units as u
 from flow360 import log
+from flow360.cloud.s3_utils import CloudFileNotFoundError
+from flow360.component.case import download_results
 from flow360.component.results.case_results import ActuatorDiskResultCSVModel
 
 from .mock_server import mock_response
@@ -153,3 +155,37 @@ def test_downloader(mock_response):
         assert len(files) == 1
         results.total_forces.load_from_local(os.path.join(temp_dir, "total_forces_v2.csv"))
         assert results.total_forces.values["CL"][0] == 0.400770406499246
+
+
+@pytest.mark.usefixtures("s3_download_override")
+def test_download_results_of_many_cases(mock_response):
+    cases = [fl.Case(id=mock_id), fl.Case(id="00112233-4455-6677-8899-bbbbbbbbbbbb")]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        download_results(cases, destination=temp_dir, max_workers=4, total_forces=True, cfl=True)
+        for case in cases:
+            files = os.listdir(os.path.join(temp_dir, case.id))
+            assert sorted(files) == ["cfl_v2.csv", "total_forces_v2.csv"]
+
+    with pytest.raises(fl.exceptions.Flow360ValueError):
+        download_results(cases, forces=True)
+
+
+@pytest.mark.usefixtures("s3_download_override")
+def test_load_from_remote_in_memory(mock_response):
+    case = fl.Case(id=mock_id)
+
+    assert case.results.total_forces.values["CL"][0] == 0.400770406499246
+    assert case.results.total_forces.local_file_name is None
+
+
+def test_load_from_remote_missing_optional_result():
+    results = ActuatorDiskResultCSVModel()
+
+    def download_fileobj_method(remote_path, fileobj, **kwargs):
+        raise CloudFileNotFoundError({"Error": {"Code": "404"}}, "GetObject")
+
+    results._download_fileobj_method = download_fileobj_method
+    results._is_downloadable = lambda: False
+    results.load_from_remote()
+    assert results._raw_values is None
@@ -1,11 +1,185 @@
 import os
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
 
+import botocore
 import pytest
 
-from flow360.cloud.s3_utils import S3TransferType
+from flow360.cloud import s3_utils
+from flow360.cloud.s3_utils import S3TransferType, _S3STSToken
+from flow360.environment import Env
 from flow360.exceptions import Flow360ValueError
 
+from .utils import mock_id
+
 
 def test_file_download():
     with pytest.raises(Flow360ValueError):
         S3TransferType.CASE.download_file("id", "file", to_file="to_file", to_folder="to_folder")
+
+
+def _sts_token(access_key_id, expiration):
+    return _S3STSToken.parse_obj(
+        {
+            "cloudpath": "s3://flow360-bucket/users/user-id/case-id/results/file.csv",
+            "userCredentials": {
+                "accessKeyId": access_key_id,
+                "expiration": expiration,
+                "secretAccessKey": "secret",
+                "sessionToken": "token",
+            },
+        }
+    )
+
+
+def test_s3_client_reuse():
+    expiration = datetime.now(tz=timezone.utc) + timedelta(hours=1)
+    token = _sts_token("key-1", expiration)
+
+    client = token.get_client()
+    assert token.get_client() is client
+    assert _sts_token("key-1", expiration).get_client() is client
+    assert _sts_token("key-2", expiration).get_client() is not client
+
+    expired = _sts_token("key-3", datetime.now(tz=timezone.utc))
+    assert expired.get_client() is not expired.get_client()
+
+
+def test_s3_client_endpoint(monkeypatch):
+    expiration = datetime.now(tz=timezone.utc) + timedelta(hours=1)
+    token = _sts_token("key-endpoint", expiration)
+    aws_client = token.get_client()
+
+    monkeypatch.setattr(
+        Env, "_current", Env.current.copy(update={"s3_endpoint_url": "http://127.0.0.1:9000"})
+    )
+    client = token.get_client()
+    assert client is not aws_client
+    assert client.meta.endpoint_url == "http://127.0.0.1:9000"
+
+
+class FakeGrantHttp:
+    def __init__(self, expiration):
+        self.expiration = expiration
+        self.paths = []
+
+    def get(self, path):
+        self.paths.append(path)
+        file_name = path.split("filename=")[-1]
+        return {
+            "cloudpath": f"s3://flow360-bucket/users/user-id/{mock_id}/{file_name}",
+            "userCredentials": {
+                "accessKeyId": f"key-{len(self.paths)}",
+                "expiration": self.expiration,
+                "secretAccessKey": "secret",
+                "sessionToken": "token",
+            },
+        }
+
+
+@pytest.fixture
+def credential_manager(monkeypatch):
+    manager = s3_utils._S3CredentialManager()
+    monkeypatch.setattr(s3_utils, "_s3_credentials", manager)
+    monkeypatch.setattr(manager, "_start_refresh_thread", lambda: None)
+    return manager
+
+
+def test_s3_credentials_shared_per_resource(monkeypatch, credential_manager):
+    fake_http = FakeGrantHttp(datetime.now(tz=timezone.utc) + timedelta(hours=1))
+    monkeypatch.setattr(s3_utils, "http", fake_http)
+
+    token = S3TransferType.CASE._get_s3_sts_token(mock_id, "results/total_forces_v2.csv", True)
+    other = S3TransferType.CASE._get_s3_sts_token(mock_id, "results/cfl_v2.csv", True)
+
+    assert len(fake_http.paths) == 1
+    assert other.shared
+    assert other.user_credential == token.user_credential
+    assert other.get_s3_key() == f"users/user-id/{mock_id}/results/cfl_v2.csv"
+
+    # uploads always use a dedicated grant
+    S3TransferType.CASE._get_s3_sts_token(mock_id, "results/cfl_v2.csv")
+    assert len(fake_http.paths) == 2
+
+    credential_manager.disable_sharing(S3TransferType.CASE, mock_id)
+    S3TransferType.CASE._get_s3_sts_token(mock_id, "results/bet_forces_v2.csv", True)
+    assert len(fake_http.paths) == 3
+
+
+def test_s3_credentials_refresh_before_expiration(monkeypatch, credential_manager):
+    fake_http = FakeGrantHttp(datetime.now(tz=timezone.utc) + timedelta(seconds=400))
+    monkeypatch.setattr(s3_utils, "http", fake_http)
+
+    token = S3TransferType.CASE._get_s3_sts_token(mock_id, "results/total_forces_v2.csv")
+    assert not token.is_expired()
+
+    fake_http.expiration = datetime.now(tz=timezone.utc) + timedelta(hours=1)
+    credential_manager.refresh_expiring()
+    assert len(fake_http.paths) == 2
+
+    refreshed = S3TransferType.CASE._get_s3_sts_token(mock_id, "results/total_forces_v2.csv")
+    assert refreshed.user_credential.access_key_id == "key-2"
+    assert len(fake_http.paths) == 2
+
+
+class FakeMultipartClient:
+    def __init__(self, parameters):
+        operation = SimpleNamespace(input_shape=SimpleNamespace(members=parameters))
+        self.meta = SimpleNamespace(
+            service_model=SimpleNamespace(operation_model=lambda name: operation)
+        )
+        self.calls = []
+
+    def create_multipart_upload(self, **kwargs):
+        self.calls.append(kwargs)
+        return {"UploadId": "upload-id"}
+
+    def complete_multipart_upload(self, **kwargs):
+        self.calls.append(kwargs)
+        return {"ChecksumCRC32": kwargs.get("ChecksumCRC32")}
+
+
+class FakeMultipartToken:
+    def __init__(self, client):
+        self.client = client
+
+    def get_client(self):
+        return self.client
+
+    def get_bucket(self):
+        return "bucket"
+
+    def get_s3_key(self):
+        return "key"
+
+
+@pytest.mark.parametrize("full_object", [True, False])
+def test_multipart_checksum_type_support(monkeypatch, full_object):
+    # botocore before 1.36 rejects the ChecksumType parameter
+    parameters = {"ChecksumAlgorithm": None}
+    if full_object:
+        parameters["ChecksumType"] = None
+    client = FakeMultipartClient(parameters)
+    monkeypatch.setattr(
+        S3TransferType,
+        "_get_s3_sts_token",
+        lambda self, *args, **kwargs: FakeMultipartToken(client),
+    )
+
+    transfer = S3TransferType.VOLUME_MESH
+    upload_id = transfer.create_multipart_upload(mock_id, "mesh.lb8.ugrid.zst")
+    transfer.complete_multipart_upload(
+        mock_id, "mesh.lb8.ugrid.zst", upload_id, [], checksum="DUoRhQ=="
+    )
+
+    create, complete = client.calls
+    assert create["ChecksumAlgorithm"] == "CRC32"
+    assert ("ChecksumType" in create) == full_object
+    assert ("ChecksumType" in complete) == full_object
+    assert ("ChecksumCRC32" in complete) == full_object
+
+
+def test_full_object_checksum_support_of_installed_botocore():
+    token = _sts_token("key-model", datetime.now(tz=timezone.utc) + timedelta(hours=1))
+    supported = s3_utils._supports_full_object_checksums(token.get_client())
+    assert supported == (tuple(int(v) for v in botocore.__version__.split(".")[:2]) >= (1, 36))
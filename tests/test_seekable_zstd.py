@@ -0,0 +1,54 @@
+import io
+import os
+
+import pytest
+import zstandard as zstd
+
+from flow360.component.seekable_zstd import (
+    SeekableZstdFile,
+    compress_frame,
+    read_seek_table,
+    seek_table,
+)
+from flow360.exceptions import Flow360ValueError
+
+
+@pytest.fixture
+def content():
+    return b"".join(os.urandom(512) + f"{i} 1 2 3\n".encode() * 100 for i in range(500))
+
+
+@pytest.fixture
+def seekable_file(tmp_path, content):
+    frame_size = 100 * 1024
+    frames = []
+    file_name = os.path.join(tmp_path, "mesh.cgns.zst")
+    with open(file_name, "wb") as fh:
+        for start in range(0, len(content), frame_size):
+            frame = compress_frame(content[start : start + frame_size])
+            fh.write(frame)
+            frames.append((len(frame), len(content[start : start + frame_size])))
+        fh.write(seek_table(frames))
+    return file_name
+
+
+def test_read_seek_table(seekable_file, content):
+    with open(seekable_file, "rb") as fh:
+        frames = read_seek_table(fh)
+    assert sum(size for _, size in frames) == len(content)
+
+    assert read_seek_table(io.BytesIO(zstd.ZstdCompressor().compress(content))) is None
+
+    with open(seekable_file, "rb") as fh:
+        truncated = io.BytesIO(fh.read()[100:])
+    with pytest.raises(Flow360ValueError):
+        read_seek_table(truncated)
+
+
+def test_random_access(seekable_file, content):
+    zstd_file = SeekableZstdFile(seekable_file)
+
+    assert zstd_file.size == len(content)
+    for offset, length in [(0, 10), (100 * 1024 - 5, 10), (123456, 300000), (len(content) - 3, 10)]:
+        assert zstd_file.read(offset, length) == content[offset : offset + length]
+    assert zstd_file.read(len(content), 10) == b""
@@ -0,0 +1,119 @@
+import gzip
+import io
+import os
+import random
+import tarfile
+
+import pytest
+
+from flow360.component.results import tar_index
+from flow360.component.results.case_results import ResultTarGZModel
+from flow360.component.results.tar_index import TarGzIndex
+from flow360.exceptions import Flow360ValueError
+
+
+@pytest.fixture
+def members():
+    return {
+        f"surfaces/surface_{i}.plt": os.urandom(20 * 1024) + b"0.0 1.0 2.0\n" * (i * 5000)
+        for i in range(20)
+    }
+
+
+def _tar(members):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w") as tar:
+        for name, data in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def archive(tmp_path, members, monkeypatch):
+    monkeypatch.setattr(tar_index, "_SPACING", 64 * 1024)
+    file_name = os.path.join(tmp_path, "surfaces.tar.gz")
+    with open(file_name, "wb") as fh:
+        fh.write(gzip.compress(_tar(members)))
+    return file_name
+
+
+def test_index_and_open_member(archive, members):
+    index = TarGzIndex.open(archive)
+
+    assert index.list_members() == list(members)
+    assert os.path.exists(TarGzIndex.index_path(archive))
+    names = list(members)
+    random.Random(0).shuffle(names)
+    for name in names:
+        assert index.open_member(name).read() == members[name]
+    with pytest.raises(Flow360ValueError):
+        index.open_member("missing.plt")
+
+
+def test_restart_points(archive, members, monkeypatch):
+    monkeypatch.setattr(tar_index, "_INDEXED_GZIP_AVAILABLE", False)
+    index = TarGzIndex.open(archive)
+    # pylint: disable=protected-access
+    snapshots = index._snapshots
+    assert len(snapshots) > 10
+
+    name = list(members)[-1]
+    member = index.members[-1]
+    start = max(s.out_offset for s in snapshots.values() if s.out_offset <= member.offset)
+    assert member.offset - start < 64 * 1024 + 1024 * 1024
+    assert index.open_member(name).read() == members[name]
+
+
+def test_indexed_gzip_restart_points(archive, members, monkeypatch):
+    pytest.importorskip("indexed_gzip")
+    monkeypatch.setattr(tar_index, "_INDEXED_GZIP_AVAILABLE", True)
+    TarGzIndex.open(archive)
+    assert os.path.exists(archive + tar_index._GZIP_INDEX_SUFFIX)
+
+    # restart points are imported in a new session instead of being rebuilt
+    loaded = TarGzIndex.load(archive)
+    # pylint: disable=protected-access
+    assert len(list(loaded._gzip_file().seek_points())) > 10
+    names = list(members)
+    random.Random(0).shuffle(names)
+    for name in names:
+        assert loaded.open_member(name).read() == members[name]
+
+
+def test_index_is_reused_until_archive_changes(archive, members):
+    TarGzIndex.open(archive)
+
+    loaded = TarGzIndex.load(archive)
+    assert loaded is not None
+    # restart points are rebuilt on demand in a new session
+    name = list(members)[7]
+    assert loaded.open_member(name).read() == members[name]
+
+    with open(archive, "wb") as fh:
+        fh.write(gzip.compress(_tar({"a.plt": b"a"})))
+    assert TarGzIndex.load(archive) is None
+    assert TarGzIndex.open(archive).list_members() == ["a.plt"]
+
+
+def test_concatenated_gzip_members(tmp_path, members):
+    data = _tar(members)
+    file_name = os.path.join(tmp_path, "volumes.tar.gz")
+    with open(file_name, "wb") as fh:
+        middle = len(data) // 2
+        fh.write(gzip.compress(data[:middle]) + gzip.compress(data[middle:]) + b"\0" * 512)
+
+    index = TarGzIndex.open(file_name)
+
+    assert index.list_members() == list(members)
+    for name, content in members.items():
+        assert index.open_member(name).read() == content
+
+
+def test_result_tar_gz_model(archive, members):
+    surfaces = ResultTarGZModel(remote_file_name="surfaces.tar.gz", local_file_name=archive)
+
+    assert surfaces.list_members() == list(members)
+    name = list(members)[3]
+    assert surfaces.open_member(name).read() == members[name]
@@ -0,0 +1,106 @@
+import io
+import os
+import tarfile
+
+import pytest
+
+from flow360.component.results.case_results import ResultTarGZModel
+from flow360.component.results.tar_stream import extract_tar_stream
+from flow360.exceptions import Flow360ValueError
+
+
+def _tar_gz(members):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+        for name, data in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def members():
+    return {
+        "surfaces/wing.plt": os.urandom(200 * 1024),
+        "surfaces/fuselage.plt": b"0.0 1.0 2.0\n" * 10000,
+        "surfaces/wing.csv": b"x,y,z\n0,1,2\n",
+    }
+
+
+def _read(file_name):
+    with open(file_name, "rb") as fh:
+        return fh.read()
+
+
+def test_extract_tar_stream(tmp_path, members):
+    extracted = extract_tar_stream(io.BytesIO(_tar_gz(members)), tmp_path)
+
+    assert extracted == [os.path.join(tmp_path, name) for name in members]
+    for name, data in members.items():
+        assert _read(os.path.join(tmp_path, name)) == data
+
+
+def test_extract_tar_stream_members(tmp_path, members):
+    extracted = extract_tar_stream(io.BytesIO(_tar_gz(members)), tmp_path, members="*.plt")
+
+    assert sorted(extracted) == sorted(
+        os.path.join(tmp_path, name) for name in members if name.endswith(".plt")
+    )
+    assert not os.path.exists(os.path.join(tmp_path, "surfaces/wing.csv"))
+
+
+def test_extract_tar_stream_overwrite(tmp_path, members):
+    wing = os.path.join(tmp_path, "surfaces/wing.plt")
+    os.makedirs(os.path.dirname(wing))
+    with open(wing, "wb") as fh:
+        fh.write(b"local")
+
+    extracted = extract_tar_stream(io.BytesIO(_tar_gz(members)), tmp_path, overwrite=False)
+    assert wing not in extracted
+    assert _read(wing) == b"local"
+
+    extract_tar_stream(io.BytesIO(_tar_gz(members)), tmp_path, overwrite=True)
+    assert _read(wing) == members["surfaces/wing.plt"]
+
+
+def test_extract_tar_stream_unsafe_members(tmp_path):
+    folder = os.path.join(tmp_path, "results")
+    with pytest.raises(Flow360ValueError):
+        extract_tar_stream(io.BytesIO(_tar_gz({"../evil.plt": b"evil"})), folder)
+    assert not os.path.exists(os.path.join(tmp_path, "evil.plt"))
+
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+        link = tarfile.TarInfo("link.plt")
+        link.type = tarfile.SYMTYPE
+        link.linkname = "/etc/passwd"
+        tar.addfile(link)
+    assert extract_tar_stream(io.BytesIO(buffer.getvalue()), folder) == []
+    assert not os.path.lexists(os.path.join(folder, "link.plt"))
+
+
+def test_result_tar_gz_model_extract(tmp_path, members):
+    archive = _tar_gz(members)
+    opened = []
+
+    def open_stream(file_name, **kwargs):
+        opened.append(file_name)
+        return io.BytesIO(archive), len(archive)
+
+    surfaces = ResultTarGZModel(remote_file_name="surfaces.tar.gz")
+    # pylint: disable=protected-access
+    surfaces._open_stream_method = open_stream
+
+    extracted = surfaces.download(to_folder=tmp_path, extract=True, members="*wing*")
+
+    assert opened == ["results/surfaces.tar.gz"]
+    assert sorted(extracted) == sorted(
+        os.path.join(tmp_path, name) for name in members if "wing" in name
+    )
+    assert not os.path.exists(os.path.join(tmp_path, "results/surfaces.tar.gz"))
+
+    with pytest.raises(Flow360ValueError):
+        surfaces.download(to_folder=tmp_path, members="*.plt")
+    with pytest.raises(Flow360ValueError):
+        surfaces.download(to_file="surfaces.tar.gz", extract=True)
@@ -0,0 +1,81 @@
+from flow360.cloud import transfer_policy
+from flow360.cloud.transfer_policy import (
+    MB,
+    S3_MAX_PARTS,
+    S3_MIN_PART_SIZE,
+    AdaptiveTransferPolicy,
+    min_part_size_for,
+    part_size_for,
+    transfer_config,
+)
+
+
+def test_part_size_for():
+    assert part_size_for(1 * MB) == 16 * MB
+    assert part_size_for(10 * 1024 * MB) == 16 * MB
+    assert part_size_for(100 * 1024 * MB) == 103 * MB
+    for file_size in [0, 1, 10 * MB, 100 * 1024 * MB, 1024 * 1024 * MB]:
+        assert part_size_for(file_size) >= S3_MIN_PART_SIZE
+        assert file_size / part_size_for(file_size) <= S3_MAX_PARTS / 10
+
+
+def test_transfer_config():
+    config = transfer_config(10 * MB)
+    assert config.multipart_threshold == 16 * MB
+    assert config.multipart_chunksize == 16 * MB
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+
+def test_part_size_follows_part_duration(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(transfer_policy.time, "monotonic", clock.monotonic)
+    policy = AdaptiveTransferPolicy(1024 * MB, target_part_seconds=4)
+    assert policy.part_size == 16 * MB
+
+    for _ in range(3):
+        clock.now += 0.1
+        policy.record(policy.part_size, 0.1)
+    assert policy.part_size == 64 * MB
+
+    for _ in range(10):
+        clock.now += 20
+        policy.record(policy.part_size, 20)
+    assert policy.part_size == S3_MIN_PART_SIZE
+
+
+def test_part_size_stays_under_part_limit():
+    file_size = 200 * 1024 * MB
+    policy = AdaptiveTransferPolicy(file_size, target_part_seconds=1)
+    for _ in range(20):
+        policy.record(policy.part_size, 100)
+    assert policy.part_size == min_part_size_for(file_size)
+    assert file_size / policy.part_size <= S3_MAX_PARTS
+
+
+def test_concurrency_climbs_throughput_curve(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(transfer_policy.time, "monotonic", clock.monotonic)
+    policy = AdaptiveTransferPolicy(1024 * MB, initial_concurrency=4, max_concurrency=16)
+    policy.start()
+
+    def run_window(throughput):
+        parts = max(policy.concurrency, 4)
+        for _ in range(parts):
+            clock.now += 16 * MB / throughput
+            policy.record(16 * MB, 2)
+
+    # throughput grows with concurrency up to 6 parts in flight, then saturates
+    concurrency = []
+    for _ in range(8):
+        run_window(min(policy.concurrency, 6) * 10 * MB)
+        concurrency.append(policy.concurrency)
+
+    assert max(concurrency) <= 8
+    assert all(value >= 5 for value in concurrency[2:])
@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+from flow360 import VolumeMesh
+from flow360.cloud import upload_registry
+from flow360.cloud.upload_registry import UploadRegistry, hash_file, new_content_hasher
+from flow360.component.compress_upload import zstd_compress_and_upload_chunks
+from flow360.component.resource_base import ResourceDraft
+from flow360.exceptions import Flow360WebNotFoundError
+
+from .mock_server import mock_response
+from .test_compress_upload import FakeMultipartResource
+from .utils import mock_id
+
+
+@pytest.fixture
+def registry_file(tmp_path, monkeypatch):
+    path = os.path.join(tmp_path, "upload_registry.json")
+    monkeypatch.setattr(upload_registry, "registry_file", path)
+    return path
+
+
+@pytest.fixture
+def mesh_file(tmp_path):
+    file_name = os.path.join(tmp_path, "mesh.lb8.ugrid")
+    with open(file_name, "wb") as fh:
+        fh.write(os.urandom(6 * 1024 * 1024))
+    return file_name
+
+
+def test_content_hash_computed_during_compression(mesh_file):
+    hasher = new_content_hasher()
+    zstd_compress_and_upload_chunks(
+        mesh_file, "upload-id", FakeMultipartResource(), "mesh.lb8.ugrid.zst", hasher=hasher
+    )
+    assert hasher.hexdigest() == hash_file(mesh_file)
+
+
+def test_registry_content_hash(tmp_path, registry_file, mesh_file, monkeypatch):
+    registry = UploadRegistry.load()
+    assert registry.content_hash(mesh_file) is None
+
+    content_hash = hash_file(mesh_file)
+    key = UploadRegistry.resource_key("VolumeMesh", content_hash, "release-23.3", None)
+    registry.register(mesh_file, content_hash, key, mock_id)
+
+    registry = UploadRegistry.load()
+    monkeypatch.setattr(upload_registry, "hash_file", lambda file_name: pytest.fail("read"))
+    assert registry.content_hash(mesh_file) == content_hash
+    assert registry.find(key) == mock_id
+    assert (
+        registry.find(UploadRegistry.resource_key("VolumeMesh", content_hash, "release-24.2", None))
+        is None
+    )
+    monkeypatch.undo()
+
+    # a copy of the file is only hashed because a registered file has the same size
+    copy = os.path.join(tmp_path, "copy.lb8.ugrid")
+    with open(mesh_file, "rb") as src, open(copy, "wb") as dst:
+        dst.write(src.read())
+    assert registry.content_hash(copy) == content_hash
+
+
+class DeletedVolumeMesh(VolumeMesh):
+    def get_info(self, force=False):
+        raise Flow360WebNotFoundError("Not found")
+
+
+def test_find_uploaded(registry_file, mock_response):
+    registry = UploadRegistry.load()
+    registry.resources = {"existing": mock_id, "deleted": mock_id}
+
+    mesh = ResourceDraft._find_uploaded(registry, "existing", VolumeMesh)
+    assert mesh.id == mock_id
+    assert ResourceDraft._find_uploaded(registry, "deleted", DeletedVolumeMesh) is None
+    assert UploadRegistry.load().resources == {"existing": mock_id}
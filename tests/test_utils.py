@@ -1,6 +1,8 @@
+import os
 from io import StringIO
 
 import pytest
+import zstandard as zstd
 
 from flow360 import Accounts
 from flow360.cli.dict_utils import merge_overwrite
@@ -8,6 +10,7 @@ from flow360.component.utils import (
     is_valid_uuid,
     shared_account_confirm_proceed,
     validate_type,
+    zstd_compress,
 )
 from flow360.component.volume_mesh import VolumeMeshMeta
 from flow360.exceptions import Flow360TypeError, Flow360ValueError
@@ -70,3 +73,44 @@ def test_valid_uuid():
         is_valid_uuid(None)
 
     is_valid_uuid(None, allow_none=True)
+
+
+class RecordingProgress:
+    def __init__(self):
+        self.total = None
+        self.calls = []
+
+    def __call__(self, bytes_chunk_transferred):
+        self.calls.append(bytes_chunk_transferred)
+
+
+@pytest.mark.parametrize("threads", [0, -1])
+def test_zstd_compress(tmp_path, threads):
+    file_name = os.path.join(tmp_path, "mesh.lb8.ugrid")
+    content = os.urandom(3 * 1024 * 1024) + b"0 1 2 3\n" * 1024 * 1024
+    with open(file_name, "wb") as fh:
+        fh.write(content)
+
+    progress = RecordingProgress()
+    output = zstd_compress(
+        file_name,
+        os.path.join(tmp_path, "mesh.lb8.ugrid.zst"),
+        threads=threads,
+        progress_callback=progress,
+        read_size=1024 * 1024,
+    )
+
+    with open(output, "rb") as fh:
+        assert zstd.ZstdDecompressor().decompress(fh.read()) == content
+    assert progress.total == len(content)
+    assert sum(progress.calls) == len(content)
+    # progress is throttled instead of reported for every read
+    assert len(progress.calls) < 11
+
+
+def test_zstd_compress_invalid_level(tmp_path):
+    file_name = os.path.join(tmp_path, "mesh.lb8.ugrid")
+    with open(file_name, "wb") as fh:
+        fh.write(b"data")
+    with pytest.raises(Flow360ValueError):
+        zstd_compress(file_name, compression_level=23)
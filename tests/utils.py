@@ -161,7 +161,15 @@ def s3_download_override():
         shutil.copy(os.path.join("data", remote_file_name), to_file)
         print(f"MOCK_DOWNLOAD: Saved to {to_file}")
 
+    def s3_mock_download_fileobj(
+        resource_id: str, remote_file_name: str, fileobj, log_error=True, use_cache=True
+    ):
+        with open(os.path.join("data", remote_file_name), "rb") as fh:
+            shutil.copyfileobj(fh, fileobj)
+        print(f"MOCK_DOWNLOAD: Loaded {remote_file_name}")
+
     S3TransferType.CASE.download_file = s3_mock_download
+    S3TransferType.CASE.download_fileobj = s3_mock_download_fileobj
 
 
 # for generating MOCK WEBAPI data: